@@ -0,0 +1,216 @@
+# backend/advisory.py
+# Gemini AI 코멘트 백그라운드 작업
+# - /analyze 는 지표 결과를 바로 반환하고 AI 코멘트는 작업 ID 로 따로 조회 (/advisory/{job_id})
+# - 작업 ID 는 (종목, 점수, 시그널, 수급, 애널리스트 의견, 모델) 해시 -> 같은 상황이면 모델을 다시 호출하지 않음
+# - Gemini 는 REST API 를 httpx 비동기 커넥션 풀로 호출 (작업은 이벤트 루프의 태스크, 스레드 점유 없음)
+# - 작업 상태는 ADVISORY_DIR 에 작업별 JSON 파일로도 남김 -> uvicorn 워커가 여럿이어도
+#   다른 워커가 만든 작업을 조회(롱 폴링은 파일 확인)하고, 같은 작업을 워커마다 다시 호출하지 않음
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+
+import httpx
+
+from timing import stage
+
+DEFAULT_MODEL = "models/gemini-2.0-flash"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+MAX_CONCURRENCY = 8         # 동시에 진행하는 Gemini 호출 수
+RESULT_TTL = 6 * 60 * 60    # 완료된 코멘트 보관 시간
+MAX_JOBS = 2048
+ADVISORY_DIR = os.getenv("ADVISORY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "advisory"))
+PENDING_TIMEOUT = 120       # 다른 워커의 pending 기록이 이보다 오래되면 그 워커가 중단된 것으로 보고 무시
+POLL_INTERVAL = 0.5         # 다른 워커가 맡은 작업을 롱 폴링할 때 파일 확인 간격
+PURGE_INTERVAL = 60         # 오래된 작업 파일 정리 간격
+JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+JOBS = {}   # job_id -> {"status": pending|done|error, "ai_message": str|None, "created": epoch, "event": asyncio.Event, "task": Task}
+_SLOTS = None
+_PURGED = 0.0
+
+
+class GeminiClient:
+    def __init__(self, base_url=GEMINI_BASE_URL, pool_size=16):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=httpx.Timeout(60, connect=5), limits=limits)
+
+    @staticmethod
+    def _check(res):
+        data = res.json()
+        if res.status_code != 200: raise RuntimeError(data.get("error", {}).get("message") or f"Gemini HTTP {res.status_code}")
+        return data
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def generate(self, api_key, model_name, prompt):
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        data = self._check(await self.http.post(f"/{model_name}:generateContent", headers={"x-goog-api-key": api_key}, json=body))
+        return "".join(part.get("text", "") for part in data["candidates"][0]["content"]["parts"])
+
+    async def list_models(self, api_key):
+        # generateContent 를 지원하는 모델 이름 목록 (전체 페이지)
+        models = []; page = None
+        while True:
+            params = {"pageSize": 1000, **({"pageToken": page} if page else {})}
+            data = self._check(await self.http.get("/models", headers={"x-goog-api-key": api_key}, params=params))
+            models += [m["name"] for m in data.get("models", []) if "generateContent" in m.get("supportedGenerationMethods", [])]
+            page = data.get("nextPageToken")
+            if not page: return models
+
+
+GEMINI = GeminiClient()
+
+
+def advisory_key(ticker, final_score, reasons, investor_trend, analyst_data, model_name):
+    payload = json.dumps([ticker, final_score, reasons, investor_trend, analyst_data, model_name], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def build_prompt(stock_name, ticker, final_score, reasons, investor_trend, analyst_data):
+    inv_str = "정보 없음"
+    if investor_trend:
+        inv_str = f"개인 {investor_trend['individual']}, 외인 {investor_trend['foreigner']}, 기관 {investor_trend['institution']}"
+
+    # 애널리스트 데이터 포맷팅
+    analyst_str = "정보 없음"
+    if analyst_data and analyst_data.get('upside') != "-":
+        analyst_str = f"투자의견 {analyst_data['recommendation']}, 상승여력 {analyst_data['upside']}"
+
+    return f"""
+                당신은 '저점 매수(Bottom Fishing)' 및 '기술적 반등'을 전문으로 분석하는 AI 애널리스트입니다.
+                현재 주가가 바닥권인지, 아니면 추가 하락 위험이 있는지 분석하여 3문장으로 요약해 주세요.
+
+                [분석 데이터]
+                1. 종목: {stock_name} ({ticker})
+                2. 저점 매수 점수: {final_score}점 (100점에 가까울수록 과매도 후 반등 가능성 높음)
+                3. 감지된 시그널: {', '.join(reasons) if reasons else '특이사항 없음'}
+                4. 수급 현황(일별): {inv_str}
+                5. 월가/증권사 의견: {analyst_str}
+
+                [분석 가이드]
+                - 시그널(RSI 과매도, 스토캐스틱 골든크로스 등)이 있다면 이를 근거로 반등 가능성을 언급하세요.
+                - 외인/기관의 수급이 들어오고 있다면 바닥 다지기 신호로 해석하세요.
+                - 점수가 낮다면 '아직 하락 추세가 강해 바닥을 확인하지 못했다'는 취지로 경고하세요.
+                - 말투는 전문적이고 간결하게 작성하세요.
+                """
+
+
+def _path(job_id):
+    return os.path.join(ADVISORY_DIR, f"{job_id}.json")
+
+
+def _save(job_id, job):
+    # 상태/코멘트만 기록 (API 키, 프롬프트는 남기지 않음)
+    try:
+        os.makedirs(ADVISORY_DIR, exist_ok=True)
+        tmp = f"{_path(job_id)}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({k: job[k] for k in ("status", "ai_message", "created")}, f, ensure_ascii=False)
+        os.replace(tmp, _path(job_id))
+    except OSError as e:
+        print(f"🚨 AI 작업 상태 저장 실패: {e}")
+
+
+def _load(job_id):
+    # 다른 워커가 남긴 작업 - 없거나, 만료됐거나, 멈춘 pending 이면 None
+    if not JOB_ID.fullmatch(job_id): return None
+    try:
+        with open(_path(job_id), encoding="utf-8") as f: job = json.load(f)
+    except (OSError, ValueError):
+        return None
+    age = time.time() - job["created"]
+    if age > (PENDING_TIMEOUT if job["status"] == "pending" else RESULT_TTL): return None
+    return job
+
+
+def _purge(now):
+    global _PURGED
+    expired = [k for k, j in JOBS.items() if j["status"] != "pending" and now - j["created"] > RESULT_TTL]
+    for k in expired: JOBS.pop(k, None)
+    # 그래도 많으면 오래된 완료 작업부터 정리
+    if len(JOBS) > MAX_JOBS:
+        done = sorted((j["created"], k) for k, j in JOBS.items() if j["status"] != "pending")
+        for _, k in done[:len(JOBS) - MAX_JOBS]: JOBS.pop(k, None)
+
+    if now - _PURGED < PURGE_INTERVAL: return
+    _PURGED = now
+    try:
+        names = os.listdir(ADVISORY_DIR)
+    except OSError:
+        return
+    for name in names:
+        try:
+            path = os.path.join(ADVISORY_DIR, name)
+            if now - os.path.getmtime(path) > RESULT_TTL: os.remove(path)
+        except OSError:
+            pass
+
+
+async def _run(job_id, job, api_key, model_name, prompt):
+    global _SLOTS
+    if _SLOTS is None: _SLOTS = asyncio.Semaphore(MAX_CONCURRENCY)
+    try:
+        async with _SLOTS:
+            with stage("ai"):
+                text = await GEMINI.generate(api_key, model_name, prompt)
+        job["ai_message"] = text.strip()
+        job["status"] = "done"
+    except Exception as e:
+        job["ai_message"] = str(e)
+        job["status"] = "error"
+    job["created"] = time.time()
+    _save(job_id, job)
+    job["event"].set()
+    job.pop("task", None)
+
+
+def submit_advisory(api_key, model_name, stock_name, ticker, final_score, reasons, investor_trend, analyst_data):
+    # (job_id, job) - 이미 같은 작업이 있으면 그대로 반환, 실패했던 작업만 다시 실행
+    # 이벤트 루프 안에서만 호출 (JOBS 는 루프 스레드에서만 변경되므로 잠금 불필요)
+    model_name = model_name or DEFAULT_MODEL
+    job_id = advisory_key(ticker, final_score, reasons, investor_trend, analyst_data, model_name)
+    now = time.time()
+    _purge(now)
+    # 다른 워커가 진행 중이거나 끝낸 작업도 그대로 사용
+    job = JOBS.get(job_id) or _load(job_id)
+    if job and job["status"] != "error": return job_id, job
+    job = JOBS[job_id] = {"status": "pending", "ai_message": None, "created": now, "event": asyncio.Event()}
+    _save(job_id, job)
+
+    prompt = build_prompt(stock_name, ticker, final_score, reasons, investor_trend, analyst_data)
+    # 태스크 참조를 작업에 보관 (완료 전에 GC 되지 않도록)
+    job["task"] = asyncio.create_task(_run(job_id, job, api_key, model_name, prompt))
+    return job_id, job
+
+
+def job_status(job_id):
+    # pending | done | error, 없는(정리된) 작업이면 None
+    job = JOBS.get(job_id) or _load(job_id)
+    return job["status"] if job else None
+
+
+async def get_advisory(job_id, wait=0):
+    # wait 초 동안 완료를 기다림 (롱 폴링), 없는 작업이면 None
+    job = JOBS.get(job_id)
+    if job is None: return await _wait_shared(job_id, wait)
+    if wait > 0 and job["status"] == "pending":
+        try:
+            await asyncio.wait_for(job["event"].wait(), wait)
+        except asyncio.TimeoutError:
+            pass
+    return job
+
+
+async def _wait_shared(job_id, wait):
+    # 다른 워커가 맡은 작업 -> 이벤트 대신 파일을 POLL_INTERVAL 마다 확인
+    deadline = time.monotonic() + wait
+    job = _load(job_id)
+    while job is not None and job["status"] == "pending" and time.monotonic() < deadline:
+        await asyncio.sleep(min(POLL_INTERVAL, deadline - time.monotonic()))
+        job = _load(job_id)
+    return job
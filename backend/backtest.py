@@ -0,0 +1,158 @@
+# backend/backtest.py
+# 채점 규칙 + ATR 목표가/손절가 전략 백테스트
+# - 구성요소 점수(T x 5)는 한 번만 계산하고, 가중치 조합(G x 5)과 행렬곱으로 전 봉/전 조합 점수를 동시에 산출
+# - 거래 결과(TP/SL/만기 청산)는 가중치와 무관하므로 봉마다 한 번만 계산
+# - 한 번에 한 포지션만 보유 (보유 중에 난 신호는 건너뜀), 최대 낙폭은 거래 수익률을 복리로 쌓은 곡선 기준
+# - 조합이 많으면 프로세스 풀로 나눠서 평가
+import itertools
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import indicators
+from scoring import COMPONENTS, compute_indicators, score_indicators
+
+# 전략별 (기준 주기, ATR 배수, 최대 보유 봉 수) - /analyze 의 strategies 와 같은 배수
+STRATEGIES = {
+    "scalp": ("60m", 1, 7),    # 60분봉 ATR x1, 하루(7봉) 안에 청산
+    "swing": ("1d", 2, 20),    # 일봉 ATR x2, 한 달(20봉) 안에 청산
+    "long": ("1wk", 3, 26),    # 주봉 ATR x3, 반년(26봉) 안에 청산
+}
+
+MAX_COMBINATIONS = 20000
+PARALLEL_MIN = 2000    # 이보다 적은 조합은 현재 프로세스에서 바로 계산
+CHUNK_SIZE = 1000
+
+_POOL = None
+
+
+def _pool():
+    global _POOL
+    if _POOL is None:
+        # 서버 프로세스에는 스레드가 많으므로 fork 대신 spawn
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 2, mp_context=mp.get_context("spawn"))
+    return _POOL
+
+
+def component_matrix(df):
+    # 봉별 구성요소 점수 S(T x 5, 무효는 0)와 유효 마스크 V(T x 5)
+    res = score_indicators(compute_indicators(df), {c: 1.0 for c in COMPONENTS})
+    S = np.column_stack([np.where(res["valid"][c], res["scores"][c], 0.0) for c in COMPONENTS])
+    V = np.column_stack([res["valid"][c] for c in COMPONENTS]).astype(float)
+    return S, V
+
+
+def trade_outcomes(df, mult, horizon):
+    # 봉 i 종가에 진입 -> 이후 horizon 봉 안에서 TP/SL 중 먼저 닿는 쪽으로 청산
+    # 같은 봉에서 둘 다 닿으면 보수적으로 SL, 둘 다 안 닿으면 만기 봉 종가에 청산
+    close = df['Close'].to_numpy(dtype=float)
+    high = df['High'].to_numpy(dtype=float)
+    low = df['Low'].to_numpy(dtype=float)
+    atr = indicators.atr(high, low, close, 14)
+
+    T = len(close)
+    # 가격은 0 아래로 내려가지 않으므로 손절가도 0 이상 (손실은 최대 -100%)
+    tp = close + atr * mult; sl = np.maximum(close - atr * mult, 0.0)
+    idx = np.arange(T)[:, None] + np.arange(1, horizon + 1)[None, :]
+    in_range = idx < T
+    idx = np.minimum(idx, T - 1)
+
+    hit_tp = (high[idx] >= tp[:, None]) & in_range
+    hit_sl = (low[idx] <= sl[:, None]) & in_range
+    first_tp = np.where(hit_tp.any(1), hit_tp.argmax(1), horizon)
+    first_sl = np.where(hit_sl.any(1), hit_sl.argmax(1), horizon)
+
+    win = first_tp < first_sl
+    loss = (first_sl <= first_tp) & (first_sl < horizon)
+    exit_px = np.where(win, tp, np.where(loss, sl, close[np.minimum(np.arange(T) + horizon, T - 1)]))
+    # 청산 봉 (이 봉 종가부터 다음 진입 가능)
+    exit_at = np.arange(T) + np.where(win, first_tp + 1, np.where(loss, first_sl + 1, horizon))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = exit_px / close - 1
+    # 만기 전에 데이터가 끝난 미확정 거래는 제외
+    done = win | loss | (np.arange(T) + horizon <= T - 1)
+    valid = done & np.isfinite(atr) & np.isfinite(ret)
+    return np.where(valid, ret, 0.0), win & valid, valid, exit_at
+
+
+def evaluate(S, V, ret, win, valid, exit_at, W, entry_score):
+    # W: (G x 5) 가중치 -> 조합별 거래 수, 적중률, 평균 수익률, 최대 낙폭
+    ws = S @ W.T
+    tot = (V * 100) @ W.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(tot > 0, np.trunc(ws / tot * 100), 50)
+
+    # 한 번에 한 포지션: 조합별로 직전 거래의 청산 봉 전에 난 신호는 건너뜀 (봉 순서대로, 조합 방향은 벡터 연산)
+    signal = (score >= entry_score) & valid[:, None]
+    entries = np.zeros_like(signal)
+    free = np.zeros(signal.shape[1], dtype=np.int64)
+    for t in range(len(signal)):
+        take = signal[t] & (free <= t)
+        entries[t] = take
+        free = np.where(take, exit_at[t], free)
+
+    trades = entries.sum(0)
+    n = np.maximum(trades, 1)
+    r = np.where(entries, ret[:, None], 0.0)
+    hit = (entries & win[:, None]).sum(0) / n
+    avg = r.sum(0) / n
+
+    # 겹치지 않는 거래 수익률을 복리로 쌓은 자산 곡선의 최대 낙폭 (0~1)
+    equity = np.cumprod(1 + r, axis=0)
+    peak = np.maximum.accumulate(np.maximum(equity, 1), axis=0)
+    mdd = (1 - equity / peak).max(0)
+    return trades, hit, avg, mdd
+
+
+def _evaluate_chunk(args):
+    return evaluate(*args)
+
+
+def sweep(S, V, ret, win, valid, exit_at, W, entry_score):
+    if len(W) < PARALLEL_MIN:
+        return evaluate(S, V, ret, win, valid, exit_at, W, entry_score)
+    chunks = [W[i:i + CHUNK_SIZE] for i in range(0, len(W), CHUNK_SIZE)]
+    parts = list(_pool().map(_evaluate_chunk, [(S, V, ret, win, valid, exit_at, w, entry_score) for w in chunks]))
+    return tuple(np.concatenate([p[i] for p in parts]) for i in range(4))
+
+
+def weight_grid(values):
+    # 5개 가중치의 모든 조합 (전부 0 인 조합 제외)
+    grid = np.array(list(itertools.product(values, repeat=len(COMPONENTS))), dtype=float)
+    return grid[grid.sum(1) > 0]
+
+
+def _summary(trades, hit, avg, mdd, i):
+    return {
+        "trades": int(trades[i]), "hit_rate": round(float(hit[i]) * 100, 2),
+        "avg_return": round(float(avg[i]) * 100, 3), "max_drawdown": round(float(mdd[i]) * 100, 2),
+    }
+
+
+def run_backtest(df, strategy, weights, entry_score=70, grid_values=None, top=10):
+    _, mult, horizon = STRATEGIES[strategy]
+    S, V = component_matrix(df)
+    ret, win, valid, exit_at = trade_outcomes(df, mult, horizon)
+
+    base_w = np.array([[weights[c] for c in COMPONENTS]], dtype=float)
+    base = _summary(*evaluate(S, V, ret, win, valid, exit_at, base_w, entry_score), 0)
+    result = {"bars": len(df), "entry_score": entry_score, "atr_mult": mult, "horizon": horizon, "weights": weights, **base}
+
+    if grid_values:
+        W = weight_grid(grid_values)
+        if len(W) > MAX_COMBINATIONS:
+            raise ValueError(f"가중치 조합이 너무 많습니다 ({len(W)}개, 최대 {MAX_COMBINATIONS}개)")
+        started = time.perf_counter()
+        trades, hit, avg, mdd = sweep(S, V, ret, win, valid, exit_at, W, entry_score)
+        # 거래가 없는 조합은 순위에서 제외하고 평균 수익률 순으로 정렬
+        order = [i for i in np.argsort(-avg, kind="stable") if trades[i] > 0][:top]
+        result["sweep"] = {
+            "combinations": len(W),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "top": [{"weights": dict(zip(COMPONENTS, W[i].tolist())), **_summary(trades, hit, avg, mdd, i)} for i in order],
+        }
+    return result
@@ -0,0 +1,108 @@
+# backend/bar_store.py
+# 프로세스 메모리 OHLCV 저장소 (디스크 캐시 앞단)
+# - DataFrame 대신 열 배열로 보관: 시각 int64(epoch ns, 원래 단위와 무관하게 ns 로 통일), 가격 float32(OHLC 한 블록), 거래량 int64
+#   -> 봉당 32바이트 (국내 전 종목 2년 일봉 ~2,500 x 490 봉이 약 40MB)
+# - 바이트 예산(OHLCV_MEMORY_MB)을 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+# - 꺼내는 배열/DataFrame 은 저장된 배열의 읽기 전용 뷰 (복사 없음, 호출부가 캐시를 고칠 수 없음)
+# - float32 가격(과 그걸로 계산한 값)을 응답에 원값으로 쓸 때는 trim_float 로 저장 정밀도 밖의 자릿수를 버림
+#   (187.23 -> 187.22999572753906 처럼 보이지 않게)
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MEMORY_BUDGET = int(float(os.getenv("OHLCV_MEMORY_MB", "256")) * 1024 * 1024)
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+PRICE_DIGITS = 7   # float32 유효 자릿수
+
+
+def trim_float(x):
+    # 유효 숫자 PRICE_DIGITS 자리로 반올림 (정수 부분은 그대로, NaN/inf 는 그대로)
+    x = float(x)
+    if x == 0 or not math.isfinite(x): return x
+    return round(x, max(0, PRICE_DIGITS - 1 - math.floor(math.log10(abs(x)))))
+
+
+def _readonly(a):
+    a.flags.writeable = False
+    return a
+
+
+class Bars:
+    __slots__ = ("ts", "prices", "volume", "tz", "meta")
+
+    def __init__(self, ts, prices, volume, tz, meta):
+        self.ts = _readonly(ts); self.prices = _readonly(prices); self.volume = _readonly(volume)
+        self.tz = tz; self.meta = meta
+
+    @classmethod
+    def from_frame(cls, df, meta):
+        # 시각 인덱스/열이 없거나 거래량에 결측이 있으면 None (정수 배열에 담을 수 없음 -> 디스크 캐시만 사용)
+        if not isinstance(df.index, pd.DatetimeIndex): return None
+        if any(c not in df.columns for c in (*PRICE_COLUMNS, "Volume")): return None
+        volume = df["Volume"].to_numpy(dtype=float)
+        if not np.isfinite(volume).all(): return None
+
+        prices = np.empty((len(PRICE_COLUMNS), len(df)), dtype=np.float32)
+        for row, c in zip(prices, PRICE_COLUMNS): row[:] = df[c].to_numpy(dtype=float)
+        tz = str(df.index.tz) if df.index.tz is not None else None
+        # 인덱스 단위(s/ms/us/ns)가 출처마다 달라서 ns 로 맞춰 저장 (pandas 2.x 이상)
+        ts = np.asarray(df.index.as_unit("ns").asi8, dtype=np.int64).copy()
+        return cls(ts, prices, volume.astype(np.int64), tz, meta)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.prices.nbytes + self.volume.nbytes
+
+    def columns(self):
+        # {열 이름: 읽기 전용 1차원 뷰}
+        return {**dict(zip(PRICE_COLUMNS, self.prices)), "Volume": self.volume}
+
+    def frame(self):
+        # 같은 배열을 그대로 쓰는 DataFrame (시각 인덱스만 새로 만듦)
+        index = pd.DatetimeIndex(self.ts.view("datetime64[ns]"))
+        index = index.tz_localize("UTC").tz_convert(self.tz) if self.tz else index
+        return pd.DataFrame(self.columns(), index=index, copy=False)
+
+
+class BarStore:
+    def __init__(self, budget=MEMORY_BUDGET):
+        self.budget = budget
+        self.nbytes = 0
+        self._data = OrderedDict()   # key -> Bars
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "evicted": 0}
+
+    def get(self, key):
+        with self._lock:
+            bars = self._data.get(key)
+            if bars is None:
+                self.stats["miss"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats["hit"] += 1
+            return bars
+
+    def put(self, key, df, meta):
+        # 저장한 Bars 반환 (담을 수 없거나 예산보다 크면 None)
+        bars = Bars.from_frame(df, meta) if df is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None: self.nbytes -= old.nbytes
+            if bars is None or bars.nbytes > self.budget: return None
+
+            self._data[key] = bars
+            self.nbytes += bars.nbytes
+            while self.nbytes > self.budget:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.stats["evicted"] += 1
+        return bars
+
+    def info(self):
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self.nbytes, "budget": self.budget, **self.stats}
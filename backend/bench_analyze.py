@@ -0,0 +1,425 @@
+# backend/bench_analyze.py
+# /analyze 오프라인 벤치마크
+# - yfinance(yf.download / Ticker.history / Ticker.info), KIS, Gemini 클라이언트를 녹화된 응답(fixtures)으로 대체
+#   업스트림별로 지정한 지연시간만큼 대기해서 네트워크 구간을 재현
+# - FastAPI 앱을 같은 프로세스 안에서 (ASGI) 동시 요청 N 개로 호출
+# - 단계별(fetch / indicators / scoring / ai) p50/p95/p99, 처리량, 단계별 최대 메모리 보고
+# - --baseline 과 비교해서 기준보다 느려진 단계가 있으면 exit 1 (회귀 검사)
+#
+# 사용법:
+#   python bench_analyze.py record 005930.KS 000660.KS AAPL     실제 yfinance 에서 시세/기업정보 녹화
+#   python bench_analyze.py synth 005930.KS 000660.KS AAPL      합성 시세로 fixtures 생성 (네트워크 없음)
+#   python bench_analyze.py run --requests 200 --concurrency 16 --memory 20 --save-baseline base.json
+#   python bench_analyze.py run --baseline base.json --threshold 0.2
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(HERE, "bench_fixtures")
+
+# /analyze 가 요청하는 주기와 기간 (get_period_by_interval 과 동일)
+INTERVALS = {"60m": "1mo", "1d": "2y", "1wk": "2y"}
+VIX = "^VIX"
+INFO_KEYS = ("recommendationKey", "targetMeanPrice", "targetLowPrice", "targetHighPrice", "sharesOutstanding")
+PERIOD_DAYS = {"5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827}
+
+# 업스트림별 기본 지연 (초)
+DEFAULT_LATENCY = {"yf": 0.15, "info": 0.3, "token": 0.2, "kis": 0.05, "gemini": 1.5}
+
+STAGES = ("fetch", "indicators", "scoring", "ai", "total")
+AI_TEXT = "벤치마크용 AI 코멘트입니다. 실제 모델은 호출하지 않았습니다. 지연시간만 재현합니다."
+
+
+def _safe(ticker):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+
+
+# ---------------------------------------------------------
+# fixtures 생성 (record / synth)
+# ---------------------------------------------------------
+def _write_fixture(path, ticker, frames, info):
+    os.makedirs(path, exist_ok=True)
+    for interval, df in frames.items():
+        df.to_parquet(os.path.join(path, f"{_safe(ticker)}_{interval}.parquet"))
+    if info is not None:
+        with open(os.path.join(path, f"{_safe(ticker)}_info.json"), "w", encoding="utf-8") as f:
+            json.dump({k: info.get(k) for k in INFO_KEYS}, f)
+
+
+def _write_manifest(path, tickers, source):
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"tickers": tickers, "source": source, "created_at": time.time()}, f, indent=2)
+
+
+def record(path, tickers):
+    import yfinance as yf
+
+    for ticker in tickers:
+        t = yf.Ticker(ticker)
+        frames = {iv: t.history(interval=iv, period=period, auto_adjust=True)[["Open", "High", "Low", "Close", "Volume"]] for iv, period in INTERVALS.items()}
+        _write_fixture(path, ticker, frames, t.info)
+        print(f"recorded {ticker}: " + ", ".join(f"{iv} {len(df)}" for iv, df in frames.items()))
+    vix = yf.Ticker(VIX).history(interval="1d", period="5d", auto_adjust=True)
+    _write_fixture(path, VIX, {"1d": vix[["Open", "High", "Low", "Close", "Volume"]]}, None)
+    _write_manifest(path, tickers, "record")
+
+
+def _synthetic(bars, freq, seed, start_price):
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    index = pd.date_range(end=pd.Timestamp.now(tz="Asia/Seoul").normalize(), periods=bars, freq=freq)
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.003, bars)), "High": close + spread * rng.random(bars),
+        "Low": close - spread * rng.random(bars), "Close": close,
+        "Volume": rng.integers(10_000, 2_000_000, bars).astype(float),
+    }, index=index)
+
+
+def synth(path, tickers):
+    # 2년 일봉 / 1개월 60분봉 / 2년 주봉 길이
+    for i, ticker in enumerate(tickers):
+        price = 70000.0 if ticker.endswith(".KS") else 180.0
+        frames = {"60m": _synthetic(150, "h", i, price), "1d": _synthetic(490, "B", i, price), "1wk": _synthetic(104, "W-MON", i, price)}
+        info = {"recommendationKey": "buy", "targetMeanPrice": price * 1.2, "targetLowPrice": price * 0.9,
+                "targetHighPrice": price * 1.5, "sharesOutstanding": 5_000_000_000 if ticker.endswith(".KS") else 15_000_000_000}
+        _write_fixture(path, ticker, frames, info)
+    _write_fixture(path, VIX, {"1d": _synthetic(5, "B", 99, 18.0)}, None)
+    _write_manifest(path, tickers, "synth")
+
+
+# ---------------------------------------------------------
+# 업스트림 대역 (stand-ins)
+# ---------------------------------------------------------
+class Fixtures:
+    def __init__(self, path):
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.tickers = self.manifest["tickers"]
+        self.frames = {}; self.infos = {}
+        for ticker in self.tickers + [VIX]:
+            for interval in INTERVALS:
+                file = os.path.join(path, f"{_safe(ticker)}_{interval}.parquet")
+                if os.path.exists(file): self.frames[(ticker, interval)] = self._rebase(pd.read_parquet(file))
+            file = os.path.join(path, f"{_safe(ticker)}_info.json")
+            if os.path.exists(file):
+                with open(file, encoding="utf-8") as f: self.infos[ticker] = json.load(f)
+
+    @staticmethod
+    def _rebase(df):
+        # 녹화 시점과 상관없이 마지막 봉이 이번 주에 오도록 주 단위로 이동 (요일은 유지)
+        # -> 캐시의 기간 자르기(_trim)가 오래된 fixtures 를 비워버리지 않음
+        if df.empty: return df
+        now = pd.Timestamp.now(tz=df.index.tz)
+        weeks = (now.normalize() - df.index[-1].normalize()).days // 7
+        df = df.copy()
+        df.index = df.index + pd.Timedelta(weeks=weeks)
+        return df
+
+
+class StandIns:
+    def __init__(self, fixtures, latency):
+        self.fx = fixtures; self.latency = latency
+        self.calls = {k: 0 for k in latency}
+
+    def wait(self, kind):
+        self.calls[kind] += 1
+        if self.latency[kind] > 0: time.sleep(self.latency[kind])
+
+    async def wait_async(self, kind):
+        self.calls[kind] += 1
+        if self.latency[kind] > 0: await asyncio.sleep(self.latency[kind])
+
+    def history(self, ticker, interval, period=None, start=None):
+        df = self.fx.frames.get((ticker, interval))
+        if df is None: return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+        if start is not None: return df[df.index >= pd.Timestamp(start)].copy()
+        days = PERIOD_DAYS.get(period)
+        return (df[df.index >= df.index[-1] - pd.Timedelta(days=days)] if days else df).copy()
+
+
+class FakeTicker:
+    def __init__(self, s, ticker):
+        self.s = s; self.ticker = ticker
+
+    def history(self, interval="1d", period=None, start=None, **kwargs):
+        self.s.wait("yf")
+        return self.s.history(self.ticker, interval, period, start)
+
+    @property
+    def info(self):
+        self.s.wait("info")
+        return dict(self.s.fx.infos.get(self.ticker, {}))
+
+
+def fake_yfinance(s):
+    def download(tickers, interval="1d", period=None, **kwargs):
+        s.wait("yf")
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        return pd.concat({t: s.history(t, interval, period) for t in tickers}, axis=1)
+    return types.SimpleNamespace(Ticker=lambda ticker: FakeTicker(s, ticker), download=download)
+
+
+class FakeGemini:
+    def __init__(self, s):
+        self.s = s
+
+    async def generate(self, api_key, model_name, prompt):
+        await self.s.wait_async("gemini")
+        return AI_TEXT
+
+    async def list_models(self, api_key):
+        return []
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeKISHttp:
+    def __init__(self, s):
+        self.s = s
+
+    async def post(self, url, json=None):
+        await self.s.wait_async("token")
+        return FakeResponse({"access_token": "bench-token", "expires_in": 86400})
+
+    async def get(self, url, headers=None, params=None):
+        await self.s.wait_async("kis")
+        ticker = params["fid_input_iscd"] + ".KS"
+        daily = self.s.fx.frames.get((ticker, "1d"))
+        if daily is None: return FakeResponse({"rt_cd": "1", "msg_cd": "EGW00000", "output": None})
+        if "inquire-price" in url:
+            return FakeResponse({"rt_cd": "0", "output": {"stck_prpr": str(int(daily["Close"].iloc[-1]))}})
+        return FakeResponse({"rt_cd": "0", "output": [{
+            "prsn_ntby_qty": "-125000", "frgn_ntby_qty": "98000", "orgn_ntby_qty": "27000",
+            "stck_bsop_date": daily.index[-1].strftime("%Y%m%d"),
+        }]})
+
+
+def _offline_get(*args, **kwargs):
+    import requests
+    raise requests.ConnectionError("offline benchmark")
+
+
+def load_app(s, cold):
+    # main 을 import 하기 전에 디스크 캐시/AI 작업 파일 위치를 임시 폴더로 돌리고 외부 다운로드(종목 마스터)를 막음
+    os.environ["OHLCV_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-ohlcv-")
+    os.environ["ADVISORY_DIR"] = tempfile.mkdtemp(prefix="bench-advisory-")
+    import requests
+    requests.get = _offline_get
+
+    import advisory
+    import main
+    import ohlcv_cache
+
+    main.yf = fake_yfinance(s)
+    main.GEMINI = advisory.GEMINI = FakeGemini(s)
+    main.KIS.http = FakeKISHttp(s)
+    main.apply_kis_master({**main.CODE_TO_NAME, **{t[:-3]: t for t in s.fx.tickers if t.endswith(".KS")}})
+
+    if cold:
+        # 캐시 TTL 0 -> 매 요청 업스트림 갱신 경로 (증분 수집) 측정
+        ohlcv_cache.INTERVAL_TTL = {}; ohlcv_cache.DEFAULT_TTL = 0
+        main.VIX_CACHE.ttl = 0; main.INFO_CACHE.ttl = 0
+    return main, advisory
+
+
+# ---------------------------------------------------------
+# 실행 / 집계
+# ---------------------------------------------------------
+class Collector:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.samples = {k: [] for k in STAGES}
+        self.peaks = {k: 0 for k in STAGES}
+
+    def __call__(self, name, seconds, peak, error=False):
+        if name not in self.samples: return
+        self.samples[name].append(seconds)
+        if peak is not None: self.peaks[name] = max(self.peaks[name], peak)
+
+
+def plan(tickers, n, ai, offset=0):
+    for i in range(offset, offset + n):
+        ticker = tickers[i % len(tickers)]
+        headers = {}
+        if ticker.endswith(".KS"): headers.update({"kis-appkey": "bench-appkey", "kis-secret": "bench-secret"})
+        if ai:
+            # 모델명을 요청마다 바꿔서 AI 작업 캐시에 걸리지 않게 함 (매 요청 AI 단계 측정)
+            headers.update({"gemini-api-key": "bench", "gemini-model": f"models/bench-{i}"})
+        yield f"/analyze/{quote(ticker, safe='')}", headers
+
+
+async def drive(app, requests_plan, concurrency, collector):
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one(client, path, headers):
+        nonlocal errors
+        async with sem:
+            started = time.perf_counter()
+            res = await client.get(path, headers=headers)
+            collector("total", time.perf_counter() - started, None)
+            if res.status_code != 200 or "error" in res.json(): errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await asyncio.gather(*(one(client, path, headers) for path, headers in requests_plan))
+    return errors
+
+
+async def wait_advisories(advisory, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not any(j["status"] == "pending" for j in list(advisory.JOBS.values())): return
+        await asyncio.sleep(0.05)
+
+
+def summarize(collector, n, concurrency, elapsed, errors):
+    stages = {}
+    for name in STAGES:
+        xs = np.array(collector.samples[name]) * 1000
+        if not len(xs): continue
+        p50, p95, p99 = np.percentile(xs, [50, 95, 99])
+        stages[name] = {"n": len(xs), "p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)}
+    return {
+        "requests": n, "concurrency": concurrency, "elapsed": round(elapsed, 3),
+        "throughput": round(n / elapsed, 2) if elapsed else 0.0, "errors": errors, "stages": stages,
+    }
+
+
+def print_report(result):
+    print(f"{'stage':<11}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'peak KiB':>11}")
+    for name, st in result["stages"].items():
+        peak = result.get("memory", {}).get(name)
+        peak = f"{peak / 1024:,.0f}" if peak else "-"
+        print(f"{name:<11}{st['n']:>6}{st['p50']:>11.2f}{st['p95']:>11.2f}{st['p99']:>11.2f}{peak:>11}")
+    print(f"throughput {result['throughput']} req/s ({result['requests']} requests, concurrency {result['concurrency']}, "
+          f"{result['elapsed']}s, errors {result['errors']})")
+    if "memory" in result: print(f"peak traced memory {result['memory']['process'] / 1024 / 1024:.1f} MiB")
+
+
+def compare(result, baseline, threshold, min_delta_ms):
+    # 단계별 p50/p95 가 기준 대비 threshold 비율 이상 + min_delta_ms 이상 느려지면 회귀
+    regressions = []
+    for name, base in baseline["stages"].items():
+        cur = result["stages"].get(name)
+        if cur is None: continue
+        for q in ("p50", "p95"):
+            if cur[q] > base[q] * (1 + threshold) and cur[q] - base[q] > min_delta_ms:
+                regressions.append(f"{name} {q}: {base[q]:.2f} ms -> {cur[q]:.2f} ms (+{(cur[q] / base[q] - 1) * 100:.0f}%)")
+    return regressions
+
+
+async def measure(main, advisory, s, args, collector, ai):
+    # 워밍업 (캐시/지연 import/LIVE 상태) - 집계에서 제외
+    warmup = args.warmup if args.warmup is not None else 2 * len(s.fx.tickers)
+    await drive(main.app, plan(s.fx.tickers, warmup, ai, offset=10**6), args.concurrency, collector)
+    await wait_advisories(advisory)
+    collector.reset()
+
+    started = time.perf_counter()
+    errors = await drive(main.app, plan(s.fx.tickers, args.requests, ai), args.concurrency, collector)
+    elapsed = time.perf_counter() - started
+    await wait_advisories(advisory)
+    result = summarize(collector, args.requests, args.concurrency, elapsed, errors)
+
+    if args.memory:
+        # tracemalloc 은 실행을 크게 느리게 하므로 지연시간 측정과 분리해서 순차 실행
+        collector.reset()
+        tracemalloc.start()
+        await drive(main.app, plan(s.fx.tickers, args.memory, ai, offset=2 * 10**6), 1, collector)
+        await wait_advisories(advisory)
+        result["memory"] = {**{k: v for k, v in collector.peaks.items() if v}, "process": tracemalloc.get_traced_memory()[1]}
+        tracemalloc.stop()
+    return result
+
+
+def run(args):
+    latency = dict(DEFAULT_LATENCY)
+    for part in filter(None, (args.latency or "").split(",")):
+        k, v = part.split("="); latency[k.strip()] = float(v)
+
+    s = StandIns(Fixtures(args.fixtures), latency)
+    main, advisory = load_app(s, args.cold)
+
+    import timing
+    collector = Collector()
+    timing.LISTENERS.append(collector)
+    ai = not args.no_ai
+
+    # 앱의 비동기 자원(세마포어, 잠금, AI 작업)은 루프에 묶이므로 전체를 하나의 이벤트 루프에서 실행
+    result = asyncio.run(measure(main, advisory, s, args, collector, ai))
+
+    result["latency"] = latency; result["cold"] = args.cold; result["upstream_calls"] = dict(s.calls)
+    print_report(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f: json.dump(result, f, indent=2)
+        print(f"baseline saved: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print("REGRESSION")
+            for line in regressions: print(f"  {line}")
+            return 1
+        print(f"OK (threshold {args.threshold * 100:.0f}%)")
+    return 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="/analyze offline benchmark")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    for name in ("record", "synth"):
+        p = sub.add_parser(name)
+        p.add_argument("tickers", nargs="+")
+        p.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+
+    p = sub.add_parser("run")
+    p.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--warmup", type=int, default=None)
+    p.add_argument("--latency", help="업스트림 지연 (초), 예: yf=0.2,kis=0.05,gemini=1")
+    p.add_argument("--cold", action="store_true", help="캐시 TTL 0 - 매 요청 업스트림 갱신")
+    p.add_argument("--no-ai", action="store_true")
+    p.add_argument("--memory", type=int, default=0, help="tracemalloc 으로 순차 실행할 요청 수 (0 이면 생략)")
+    p.add_argument("--save-baseline")
+    p.add_argument("--baseline")
+    p.add_argument("--threshold", type=float, default=0.2)
+    p.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.cmd == "record": return record(args.fixtures, args.tickers)
+    if args.cmd == "synth": return synth(args.fixtures, args.tickers)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli() or 0)
@@ -0,0 +1,60 @@
+# backend/bench_indicators.py
+# 지표 커널(indicators.compute) vs pandas_ta 비교
+# - 같은 입력에서 값이 같은지 확인 (ATR 포함 전체 지표, 다르면 exit 1)
+# - 2년 일봉 / 1개월 60분봉 길이의 합성 시세로 속도 비교
+# 사용법: python bench_indicators.py [--repeat 200]
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from scoring import compute_indicators, compute_indicators_ta
+
+# (이름, 봉 수, pandas 주기) - yfinance 2y 일봉 / 1mo 60분봉(하루 7봉) 기준
+SERIES = [("2y 1d", 490, "B"), ("1mo 60m", 150, "h")]
+
+
+def synthetic(bars, freq, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    high = close + spread * rng.random(bars)
+    low = close - spread * rng.random(bars)
+    volume = rng.integers(10_000, 2_000_000, bars).astype(float)
+    index = pd.date_range("2024-01-02", periods=bars, freq=freq)
+    return pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+
+def timed(fn, df, repeat):
+    fn(df)   # 워밍업
+    started = time.perf_counter()
+    for _ in range(repeat): fn(df)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    ok = True
+    for name, bars, freq in SERIES:
+        df = synthetic(bars, freq)
+        fast, ref = compute_indicators(df), compute_indicators_ta(df)
+        # 커널이 내는 모든 지표(ATR 포함)를 비교 - 기준값에 빠진 키도 불일치로 봄
+        bad = [k for k in indicators.KEYS if k not in ref or not np.allclose(fast[k], ref[k], rtol=1e-9, atol=1e-8, equal_nan=True)]
+        if bad: ok = False
+
+        t_ref = timed(compute_indicators_ta, df, args.repeat)
+        t_fast = timed(compute_indicators, df, args.repeat)
+        status = "OK" if not bad else f"MISMATCH {bad}"
+        print(f"{name:>8} ({bars} bars)  pandas_ta {t_ref:7.3f} ms  kernel {t_fast:7.3f} ms  x{t_ref / t_fast:5.1f}  {status}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# backend/compact.py
+# 조건부 응답(ETag / If-None-Match) + compact 응답
+# - ETag 는 응답을 만드는 데 쓴 데이터(봉 개수/마지막 봉, 스냅샷 버전, 요청 파라미터 등)의 해시
+#   -> 지표/점수/AI 계산 전에 비교해서 같으면 304 (본문 없음, 재계산 없음)
+# - compact=true 면 숫자를 표시용 문자열 대신 원값으로 내려줌 (배치/스크리닝 클라이언트용)
+#   Accept 에 application/msgpack 이 있고 msgpack 이 설치돼 있으면 msgpack,
+#   아니면 공백 없는 JSON (Accept-Encoding 에 gzip 이 있으면 gzip)
+import gzip
+import hashlib
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TYPE = "application/msgpack"
+GZIP_MIN_BYTES = 1024   # 이보다 작으면 압축 이득보다 CPU 가 더 듦
+
+
+def _default(o):
+    # numpy 스칼라 등 -> 파이썬 기본형
+    return o.item() if hasattr(o, "item") else str(o)
+
+
+def data_version(*parts):
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_default)
+    return f'W/"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+
+
+def frame_version(df):
+    # 봉 개수 + 마지막 봉 (시각, 값) - 새 봉이 생기거나 마지막 봉 시세가 바뀌면 달라짐
+    if df is None or df.empty: return None
+    return [len(df), str(df.index[-1]), df.iloc[-1].tolist()]
+
+
+def not_modified(request, tag):
+    # If-None-Match 가 tag 와 같으면 304 응답, 아니면 None (약한 비교)
+    header = request.headers.get("if-none-match")
+    if not header: return None
+    bare = tag[2:] if tag.startswith("W/") else tag
+    for t in header.split(","):
+        t = t.strip()
+        if t == "*" or (t[2:] if t.startswith("W/") else t) == bare:
+            return Response(status_code=304, headers={"ETag": tag})
+    return None
+
+
+def respond(request, content, tag=None, compact=False):
+    headers = {"ETag": tag} if tag else {}
+    if not compact: return JSONResponse(jsonable_encoder(content), headers=headers)
+
+    headers["Vary"] = "Accept, Accept-Encoding"
+    if msgpack is not None and MSGPACK_TYPE in request.headers.get("accept", ""):
+        return Response(msgpack.packb(content, default=_default), media_type=MSGPACK_TYPE, headers=headers)
+
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,63 @@
+# backend/executor.py
+# 블로킹 작업(yfinance 다운로드, 디스크 캐시, pandas/NumPy 계산)용 제한 실행기
+# - 이벤트 루프는 업스트림 대기만 하고, 블로킹 호출은 전용 스레드풀에서 실행
+# - 대기열(실행 중 + 대기 중)에 상한을 두고, 자리가 나길 admit_timeout 초 넘게 기다리면 Overloaded
+#   -> 요청이 무한정 쌓이지 않고 호출부가 503 으로 바로 돌려보낼 수 있음 (backpressure)
+# - 실행 시 호출한 쪽 contextvars(요청별 단계 시간 기록)를 그대로 넘김
+# - 동기 핸들러(스레드)에서는 submit(): 기다리지 않고 대기열이 가득 찼으면 바로 Overloaded
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BlockingExecutor:
+    def __init__(self, workers=32, max_pending=256, admit_timeout=2.0, name="blocking"):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.workers = workers; self.max_pending = max_pending; self.admit_timeout = admit_timeout
+        self.pending = 0
+        self.stats = {"submitted": 0, "rejected": 0}
+        self._slots = None
+        self._count = threading.Lock()   # pending 은 루프와 동기 핸들러 스레드 양쪽에서 바뀜
+
+    def saturated(self):
+        # 대기열이 이미 가득 찼는지 - 새 요청을 받기 전에 확인
+        return self.pending >= self.max_pending
+
+    async def run(self, fn, *args):
+        if self._slots is None: self._slots = asyncio.Semaphore(self.max_pending)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.admit_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise Overloaded(f"작업 대기열이 가득 찼습니다 ({self.max_pending}건)")
+
+        with self._count: self.pending += 1; self.stats["submitted"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, contextvars.copy_context().run, fn, *args)
+        finally:
+            self._done()
+            self._slots.release()
+
+    def submit(self, fn, *args):
+        # 동기 코드용 -> concurrent.futures.Future (대기열 계산/컨텍스트 전달은 run 과 같음)
+        with self._count:
+            if self.pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise Overloaded(f"작업 대기열이 가득 찼습니다 ({self.max_pending}건)")
+            self.pending += 1; self.stats["submitted"] += 1
+        try:
+            future = self.pool.submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            self._done()
+            raise
+        future.add_done_callback(lambda _: self._done())
+        return future
+
+    def _done(self):
+        with self._count: self.pending -= 1
@@ -0,0 +1,128 @@
+# backend/indicators.py
+# 채점용 지표 커널 (NumPy)
+# - 연속된 float64 배열 하나(지표 수 x 봉 수)를 미리 잡아두고 각 지표를 그 행에 바로 기록
+# - 이동창 계산은 sliding_window_view, 재귀식(EMA/RMA)만 순차 루프
+# - pandas_ta 기본 정의와 같은 값 (bench_indicators.py 로 비교)
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+KEYS = ("close", "sma5", "sma20", "sma60", "rsi", "stoch_k", "stoch_d", "macd", "macd_signal", "bb_lower", "bb_upper", "obv", "atr")
+
+EPS = np.finfo(float).eps
+
+
+def _windows(x, n, out, fn):
+    # out[n-1:] = fn(길이 n 창), 나머지는 NaN
+    out[:] = np.nan
+    if len(x) >= n: out[n - 1:] = fn(sliding_window_view(x, n), axis=1)
+    return out
+
+
+def _sma(x, n, out):
+    return _windows(x, n, out, np.mean)
+
+
+def _ema(x, n, out, start=0):
+    # pandas_ta ema: 처음 n 개 평균을 시드로 ewm(span=n, adjust=False)
+    out[:] = np.nan
+    if len(x) - start < n: return out
+    alpha = 2 / (n + 1)
+    first = start + n - 1
+    value = x[start:start + n].sum() / n
+    out[first] = value
+    vals = x.tolist()
+    for i in range(first + 1, len(vals)):
+        value = (1 - alpha) * value + alpha * vals[i]
+        out[i] = value
+    return out
+
+
+def _rma(x, n, out, start=0):
+    # pandas ewm(alpha=1/n, adjust=True, min_periods=n) - start 이전은 값 없음
+    out[:] = np.nan
+    decay = 1 - 1 / n
+    num = den = 0.0
+    vals = x.tolist()
+    for i in range(start, len(vals)):
+        num = vals[i] + decay * num
+        den = 1 + decay * den
+        if i - start >= n - 1: out[i] = num / den
+    return out
+
+
+def _sma_valid(x, n, out):
+    # 앞쪽 NaN 구간을 건너뛰고 유효값부터 SMA (pandas rolling 과 동일)
+    out[:] = np.nan
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid): _sma(x[valid[0]:], n, out[valid[0]:])
+    return out
+
+
+def _true_range(high, low, close):
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    if len(tr): tr[0] = np.nan
+    return tr
+
+
+def compute(high, low, close, volume):
+    # 입력은 같은 길이의 1차원 배열, NaN 이 없어야 함 -> {KEYS: 배열} (모두 하나의 블록에 대한 뷰)
+    close = np.ascontiguousarray(close, dtype=float)
+    high = np.ascontiguousarray(high, dtype=float)
+    low = np.ascontiguousarray(low, dtype=float)
+    volume = np.ascontiguousarray(volume, dtype=float)
+    n = len(close)
+
+    block = np.empty((len(KEYS), n))
+    out = dict(zip(KEYS, block))
+    out["close"][:] = close
+    if n == 0: return out
+
+    _sma(close, 5, out["sma5"]); _sma(close, 20, out["sma20"]); _sma(close, 60, out["sma60"])
+
+    diff = np.empty(n); diff[0] = np.nan; np.subtract(close[1:], close[:-1], out=diff[1:])
+
+    # RSI(14) - 상승/하락폭 각각 RMA
+    up = np.clip(diff, 0, None); down = np.clip(diff, None, 0)
+    up_avg = _rma(up, 14, np.empty(n), start=1)
+    down_avg = _rma(down, 14, np.empty(n), start=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        np.divide(100 * up_avg, up_avg + np.abs(down_avg), out=out["rsi"])
+
+    # Stoch(14, 3, 3)
+    hh = _windows(high, 14, np.empty(n), np.max)
+    ll = _windows(low, 14, np.empty(n), np.min)
+    rng = hh - ll
+    if (rng == 0).any(): rng = rng + EPS   # pandas_ta non_zero_range
+    raw = 100 * (close - ll) / rng
+    _sma_valid(raw, 3, out["stoch_k"])
+    _sma_valid(out["stoch_k"], 3, out["stoch_d"])
+
+    # MACD(12, 26, 9) - 시그널은 MACD 가 유효해진 뒤부터 EMA
+    fast = _ema(close, 12, np.empty(n)); slow = _ema(close, 26, np.empty(n))
+    np.subtract(fast, slow, out=out["macd"])
+    _ema(out["macd"], 9, out["macd_signal"], start=min(25, n))
+
+    # BB(20, 2) - 모표준편차
+    std = _windows(close, 20, np.empty(n), np.std)
+    np.subtract(out["sma20"], 2.0 * std, out=out["bb_lower"])
+    np.add(out["sma20"], 2.0 * std, out=out["bb_upper"])
+
+    # OBV - 첫 봉은 상승으로 취급
+    sign = np.sign(diff); sign[0] = 1
+    np.cumsum(sign * volume, out=out["obv"])
+
+    # ATR(14) - True Range 의 RMA
+    _rma(_true_range(high, low, close), 14, out["atr"], start=1)
+    return out
+
+
+def sma(x, n):
+    x = np.ascontiguousarray(x, dtype=float)
+    return _sma(x, n, np.empty(len(x)))
+
+
+def atr(high, low, close, n=14):
+    high = np.ascontiguousarray(high, dtype=float); low = np.ascontiguousarray(low, dtype=float)
+    close = np.ascontiguousarray(close, dtype=float)
+    return _rma(_true_range(high, low, close), n, np.empty(len(close)), start=1)
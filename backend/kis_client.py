@@ -0,0 +1,167 @@
+# backend/kis_client.py
+# 한국투자증권(KIS) Open API 클라이언트
+# - httpx 비동기 클라이언트 커넥션 풀 재사용 (요청마다 TCP/TLS 핸드셰이크 X, 대기 중 스레드 점유 X)
+# - 앱키(+시크릿) 해시별 접근 토큰 캐시 (만료 전까지 재사용, 동시 발급 요청은 1번만 전송)
+# - 앱키별 초당 호출 제한 (토큰 버킷)
+# - 앱키별 표(토큰/호출 제한/발급 잠금)는 최근 사용 순 MAX_KEYS 개까지 (요청 헤더의 임의 앱키로 메모리가 늘지 않게)
+# - 이벤트 루프 안에서만 사용 (잠금은 asyncio.Lock)
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+import httpx
+
+from timing import stage
+
+KIS_BASE_URL = "https://openapi.koreainvestment.com:9443"
+
+RATE_PER_SEC = 20          # 실전 계좌 기준 초당 20건
+HTTP_TIMEOUT = 5
+TOKEN_MARGIN = 60 * 60     # 만료 1시간 전부터는 새로 발급
+DEFAULT_TOKEN_LIFE = 24 * 60 * 60
+MAX_KEYS = 1024
+
+# 토큰 만료/무효 응답 코드 -> 캐시에서 제거 후 다음 요청에서 재발급
+TOKEN_ERROR_CODES = {"EGW00121", "EGW00123"}
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=None):
+        self.rate = rate; self.capacity = burst or rate
+        self.tokens = float(self.capacity); self.updated = time.monotonic()
+
+    async def acquire(self):
+        # 루프 스레드 하나에서만 호출되므로 await 사이 구간은 잠금 없이 안전
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class KISClient:
+    def __init__(self, base_url=KIS_BASE_URL, rate=RATE_PER_SEC, pool_size=32):
+        self.base_url = base_url
+        self.rate = rate
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=HTTP_TIMEOUT, limits=limits)
+        self.stats = {"token_hit": 0, "token_issued": 0, "requests": 0, "errors": 0}
+
+        self._tokens = OrderedDict()      # sha256(appkey:appsecret) -> (token, expire_epoch), 최근 사용 순
+        self._limiters = OrderedDict()
+        self._key_locks = OrderedDict()
+
+    @staticmethod
+    def _key(appkey, appsecret=""):
+        # 앱키 원문은 메모리에도 키로 남기지 않음
+        # 토큰 캐시는 시크릿까지 포함 -> 앱키만 아는 요청이 남의 토큰을 받아가지 못함
+        return hashlib.sha256(f"{appkey}:{appsecret}".encode()).hexdigest()
+
+    @staticmethod
+    def _remember(table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > MAX_KEYS: table.popitem(last=False)
+        return value
+
+    @classmethod
+    def _per_key(cls, table, key, factory):
+        item = table.get(key)
+        return cls._remember(table, key, item if item is not None else factory())
+
+    def _cached_token(self, key):
+        entry = self._tokens.get(key)
+        if entry is None: return None
+        if entry[1] <= time.time():
+            self._tokens.pop(key, None)   # 만료된 토큰은 바로 정리
+            return None
+        self._tokens.move_to_end(key)
+        return entry
+
+    async def get_token(self, appkey, appsecret, header_token=None):
+        # (token, expire) - expire 는 여유분을 뺀 사용 가능 시각, 클라이언트가 보낸 토큰을 쓰면 None
+        if header_token and len(header_token) > 10:
+            return header_token, None
+
+        key = self._key(appkey, appsecret)
+        entry = self._cached_token(key)
+        if entry:
+            self.stats["token_hit"] += 1
+            return entry
+
+        # 같은 앱키로 동시에 들어온 요청은 한 번만 발급 (KIS 토큰 발급은 1분 1회 제한)
+        async with self._per_key(self._key_locks, key, asyncio.Lock):
+            entry = self._cached_token(key)
+            if entry:
+                self.stats["token_hit"] += 1
+                return entry
+            try:
+                body = {"grant_type": "client_credentials", "appkey": appkey, "appsecret": appsecret}
+                with stage("kis_token"):
+                    res = await self.http.post("/oauth2/tokenP", json=body)
+                    data = res.json()
+                token = data.get("access_token")
+                if not token:
+                    print(f"Token Error: {data.get('error_description') or data}")
+                    return None, None
+                expire = int(time.time()) + int(data.get("expires_in", DEFAULT_TOKEN_LIFE)) - TOKEN_MARGIN
+                self._remember(self._tokens, key, (token, expire))
+                self.stats["token_issued"] += 1
+                return token, expire
+            except Exception as e:
+                print(f"Token Error: {e}")
+                return None, None
+
+    async def aclose(self):
+        # 서버 종료 시 연결 풀 정리 (lifespan)
+        await self.http.aclose()
+
+    def invalidate(self, appkey, appsecret):
+        self._tokens.pop(self._key(appkey, appsecret), None)
+
+    async def _get(self, path, tr_id, token, appkey, appsecret, params):
+        await self._per_key(self._limiters, self._key(appkey), lambda: RateLimiter(self.rate)).acquire()
+        headers = {"content-type": "application/json", "authorization": f"Bearer {token}", "appkey": appkey, "appsecret": appsecret, "tr_id": tr_id}
+        self.stats["requests"] += 1
+        with stage("kis_api"):
+            res = await self.http.get(path, headers=headers, params=params)
+            data = res.json()
+        if data.get("msg_cd") in TOKEN_ERROR_CODES: self.invalidate(appkey, appsecret)
+        return data
+
+    @staticmethod
+    def _stock_params(ticker):
+        return {"fid_cond_mrkt_div_code": "J", "fid_input_iscd": ticker.replace(".KS", "")}
+
+    # [KIS] 현재가 조회
+    async def get_price(self, ticker, token, appkey, appsecret):
+        try:
+            data = await self._get("/uapi/domestic-stock/v1/quotations/inquire-price", "FHKST01010100", token, appkey, appsecret, self._stock_params(ticker))
+            if data['rt_cd'] == '0': return float(data['output']['stck_prpr'])
+            return None
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"KIS Price Error: {e}")
+            return None
+
+    # [KIS] 투자자별 매매동향 (TR_ID: FHKST01010900)
+    async def get_investors(self, ticker, token, appkey, appsecret):
+        try:
+            data = await self._get("/uapi/domestic-stock/v1/quotations/inquire-investor", "FHKST01010900", token, appkey, appsecret, self._stock_params(ticker))
+            if data['rt_cd'] == '0' and data['output']:
+                todays = data['output'][0]
+                return {
+                    "individual": int(todays.get('prsn_ntby_qty', 0)),
+                    "foreigner": int(todays.get('frgn_ntby_qty', 0)),
+                    "institution": int(todays.get('orgn_ntby_qty', 0)),
+                    "date": todays.get('stck_bsop_date', '')
+                }
+            return None
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"KIS Investor Error: {e}")
+            return None
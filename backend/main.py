@@ -1,88 +1,197 @@
 # backend/main.py
-from fastapi import FastAPI, Query, Header
+import startup
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
+from fastapi.responses import PlainTextResponse, JSONResponse
 import pandas as pd
-import pandas_ta as ta
 import requests
-import google.generativeai as genai
 import time
 import zipfile
 import io
 import os
+import re
+import json
+import threading
+import asyncio
+import numpy as np
+from collections import OrderedDict
+from ohlcv_cache import OHLCVCache
+from bar_store import trim_float
+from search_index import TickerSearchIndex
+from indicators import atr as calc_atr, sma as calc_sma
+from scoring import DEFAULT_WEIGHTS, compute_indicators, latest_result, latest_values, support_resistance, trend_status
+from backtest import STRATEGIES, run_backtest
+from streaming import LiveIndicators
+from kis_client import KISClient
+from shared_cache import SharedCache
+from advisory import GEMINI, get_advisory, job_status, submit_advisory
+from executor import BlockingExecutor, Overloaded
+from resample import SOURCES, aggregate, derive_frames, plan_intervals
+from snapshot import UniverseSnapshot
+from compact import data_version, frame_version, not_modified, respond
+from timing import stage, begin, header
+import metrics
+import profiler
+
+# yfinance 는 임포트가 무거우므로 첫 사용 시점(또는 기동 후 warm-up)에 로드
+yf = startup.lazy_import("yfinance")
+startup.mark("imports")
 
 NAME_TO_CODE = {}
 CODE_TO_NAME = {}
 SEARCH_MAP = {}
+SEARCH_INDEX = TickerSearchIndex({})
+
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+MASTER_SNAPSHOT = os.path.join(CACHE_ROOT, "kis_master.json")
+MASTER_MAX_AGE = 24 * 60 * 60  # 스냅샷이 하루보다 오래되면 백그라운드에서 새로 받음 (기동 후에도 하루마다)
+MASTER_RETRY = 10 * 60         # 다운로드 실패(한 시장이라도) 시 다시 시도할 간격
+
+MASTER_URLS = {
+    "kospi": "https://new.real.download.dws.co.kr/common/master/kospi_code.mst.zip",
+    "kosdaq": "https://new.real.download.dws.co.kr/common/master/kosdaq_code.mst.zip"
+}
+
+def parse_kis_master(content):
+    # 라인별 try/except 대신 고정폭 레코드를 배열로 만들어 한 번에 잘라냄
+    lines = np.array(content.split(b'\n'))
+    lines = lines[np.char.str_len(lines) >= 30]
+    if len(lines) == 0: return {}
+    raw = lines.view(np.uint8).reshape(len(lines), lines.dtype.itemsize)
+    if raw.shape[1] < 61: raw = np.pad(raw, ((0, 0), (0, 61 - raw.shape[1])))
+
+    # 단축코드 (9자리) -> ASCII, 한글명 (21번째부터 40바이트) -> CP949
+    # 61번째 바이트까지만 잘라야 뒤에 붙은 쓰레기값이 안 들어옵니다.
+    # 디코딩 오류가 있는 라인은 건너뜀 (기존 라인별 try/except 와 동일) -> replace 로 풀고 대체 문자(U+FFFD)가 있는 행 제외
+    codes = np.char.strip(np.char.decode(np.ascontiguousarray(raw[:, 0:9]).view("S9").ravel(), "ascii", errors="replace"))
+    names = np.char.strip(np.char.decode(np.ascontiguousarray(raw[:, 21:61]).view("S40").ravel(), "cp949", errors="replace"))
+    decoded = (np.char.find(codes, "\ufffd") < 0) & (np.char.find(names, "\ufffd") < 0)
+
+    # 단축코드에서 'A'로 시작하는 경우 등을 처리 (보통 1번째부터)
+    codes_7 = np.char.decode(np.ascontiguousarray(raw[:, 1:7]).view("S6").ravel(), "ascii", errors="replace")
+    short_codes = np.where(np.char.str_len(codes) >= 7, codes_7, codes)
+
+    valid = decoded & (np.char.str_len(names) > 0) & (np.char.str_len(short_codes) > 0)
+    return dict(zip(short_codes[valid].tolist(), names[valid].tolist()))
+
+def apply_kis_master(code_to_name):
+    global NAME_TO_CODE, CODE_TO_NAME, SEARCH_MAP, SEARCH_INDEX
+    # 새 딕셔너리를 다 만든 뒤 한 번에 교체 -> 요청 처리 중에 반쯤 채워진 맵이 보이지 않음
+    name_to_code = {name: code for code, name in code_to_name.items()}
+    search_map = {name.upper().replace(" ", ""): code for name, code in name_to_code.items()}
+    search_index = TickerSearchIndex(code_to_name)
+    NAME_TO_CODE, CODE_TO_NAME, SEARCH_MAP, SEARCH_INDEX = name_to_code, dict(code_to_name), search_map, search_index
+
+def load_master_snapshot():
+    try:
+        with open(MASTER_SNAPSHOT, encoding="utf-8") as f:
+            snap = json.load(f)
+        apply_kis_master(snap["codes"])
+        print(f"✅ KIS 종목 마스터 스냅샷 로드 (총 {len(CODE_TO_NAME)}개 종목)")
+        return snap["saved_at"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"🚨 마스터 스냅샷 로드 실패: {e}")
+        return None
 
 def load_kis_master_data():
-    global NAME_TO_CODE, CODE_TO_NAME, SEARCH_MAP
-    print("⏳ KIS 종목 마스터 파일 다운로드 중... (서버 시작 시 1회)")
-    
-    urls = {
-        "kospi": "https://new.real.download.dws.co.kr/common/master/kospi_code.mst.zip",
-        "kosdaq": "https://new.real.download.dws.co.kr/common/master/kosdaq_code.mst.zip"
-    }
+    # 받은 시각 반환 (한 시장이라도 실패하면 None -> MASTER_RETRY 뒤 재시도)
+    # 두 시장이 모두 파싱된 경우에만 교체/저장, 일부만 받았으면 비어 있는 기동 직후에만 메모리에 반영 (파일은 저장 안 함)
+    print("⏳ KIS 종목 마스터 파일 다운로드 중... (백그라운드)")
 
-    try:
-        count = 0
-        for market, url in urls.items():
-            res = requests.get(url)
-            if res.status_code != 200:
-                print(f"❌ {market} 다운로드 실패")
-                continue
-                
+    code_to_name = {}; failed = []
+    for market, url in MASTER_URLS.items():
+        try:
+            res = requests.get(url, timeout=30)
+            if res.status_code != 200: raise RuntimeError(f"HTTP {res.status_code}")
             with zipfile.ZipFile(io.BytesIO(res.content)) as zf:
-                file_name = zf.namelist()[0] 
+                file_name = zf.namelist()[0]
                 with zf.open(file_name) as f:
-                    content = f.read()
-                    lines = content.split(b'\n')
-                    
-                    for line in lines:
-                        if len(line) < 30: continue
-                        
-                        try:
-                            # 단축코드 (9자리) -> ASCII 디코딩
-                            code_bytes = line[0:9]
-                            code = code_bytes.decode('ascii').strip()
-                            
-                            # 한글명 (21번째부터 40바이트 길이) -> CP949 디코딩
-                            # 61번째 바이트까지만 잘라야 뒤에 붙은 쓰레기값이 안 들어옵니다.
-                            name_bytes = line[21:61] 
-                            name = name_bytes.decode('cp949').strip()
-                            
-                            # 단축코드에서 'A'로 시작하는 경우 등을 처리 (보통 1번째부터)
-                            short_code = code[1:7] if len(code) >= 7 else code
-                        
-                            if name and short_code:
-                                NAME_TO_CODE[name] = short_code
-                                CODE_TO_NAME[short_code] = name
-                                
-                                search_key = name.upper().replace(" ", "")
-                                SEARCH_MAP[search_key] = short_code
-                                
-                                count += 1
-                                
-                        except Exception as parse_err:
-                            # 인코딩 에러 등이 나면 해당 라인은 건너뜀
-                            continue
-
-        print(f"✅ KIS 종목 마스터 로드 완료! (총 {len(NAME_TO_CODE)}개 종목)")
-        
-    except Exception as e:
-        print(f"🚨 마스터 파일 로드 실패: {e}")
-
-load_kis_master_data()
+                    parsed = parse_kis_master(f.read())
+            if not parsed: raise RuntimeError("종목 없음")
+            code_to_name.update(parsed)
+        except Exception as e:
+            print(f"❌ {market} 마스터 로드 실패: {e}")
+            failed.append(market)
+
+    if failed:
+        if code_to_name and not CODE_TO_NAME:
+            apply_kis_master(code_to_name)
+            print(f"⚠️ KIS 종목 마스터 일부만 반영 ({len(code_to_name)}개 종목, 실패: {', '.join(failed)})")
+        return None
 
-app = FastAPI()
+    apply_kis_master(code_to_name)
+    try:
+        saved_at = time.time()
+        os.makedirs(CACHE_ROOT, exist_ok=True)
+        with open(MASTER_SNAPSHOT + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"saved_at": saved_at, "codes": code_to_name}, f, ensure_ascii=False)
+        os.replace(MASTER_SNAPSHOT + ".tmp", MASTER_SNAPSHOT)
+    except OSError as e:
+        print(f"🚨 마스터 스냅샷 저장 실패: {e}")
+
+    print(f"✅ KIS 종목 마스터 로드 완료! (총 {len(NAME_TO_CODE)}개 종목)")
+    return saved_at
+
+def kis_master_loop(saved_at):
+    # 마지막으로 받은 지 MASTER_MAX_AGE 가 지나면 다시 받음 (신규 상장/종목명 변경 반영, 실패하면 MASTER_RETRY 뒤 재시도)
+    # 교체는 apply_kis_master 가 한 번에 하므로 요청 처리 중에 갱신돼도 안전
+    while True:
+        wait = MASTER_MAX_AGE - (time.time() - saved_at) if saved_at else 0
+        time.sleep(max(0.0, wait))
+        saved_at = load_kis_master_data() or time.time() - MASTER_MAX_AGE + MASTER_RETRY
+
+def init_kis_master():
+    # 로컬 스냅샷으로 즉시 기동하고, 없거나 오래됐으면 백그라운드에서 갱신 (네트워크 대기 없음) -> 이후 하루마다 갱신
+    saved_at = load_master_snapshot()
+    threading.Thread(target=kis_master_loop, args=(saved_at,), name="kis-master", daemon=True).start()
+
+@asynccontextmanager
+async def lifespan(app):
+    # 백그라운드 스레드는 임포트가 아니라 여기서 시작 (spawn 프로세스 풀이 main 을 다시 임포트해도 마스터 갱신/스냅샷이 늘지 않음)
+    init_kis_master()
+    startup.mark("kis_master")
+    # 여기까지 끝나면 요청을 받기 시작함 -> 무거운 모듈은 그 뒤에 백그라운드로 임포트
+    startup.mark("ready")
+    age = startup.report()["process_age"]
+    print(f"🚀 기동 완료 ({startup.PHASES['ready']:.2f}s" + (f", 프로세스 시작 후 {age:.2f}s" if age else "") + f", {'lazy' if startup.LAZY else 'eager'} imports)")
+    startup.warm_up()
+    SNAPSHOT.start()
+    yield
+    # 종료: 업스트림 연결 풀 정리 (KIS, Gemini)
+    await KIS.aclose()
+    await GEMINI.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id", "ETag"],
 )
 
+# 요청별 단계 시간 -> Server-Timing 헤더 + /metrics, x-profile 헤더가 맞으면 샘플링 프로파일
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    session = profiler.Session().start() if profiler.enabled(request.headers.get("x-profile")) else None
+    timings = begin(session)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        profile_id = session.stop() if session else None
+    elapsed = time.perf_counter() - started
+
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.observe_request(route, response.status_code, elapsed)
+    response.headers["Server-Timing"] = header({**timings, "total": elapsed})
+    if profile_id: response.headers["X-Profile-Id"] = profile_id
+    return response
+
 def get_ticker_symbol(keyword):
     keyword_clean = keyword.strip().upper().replace(" ", "")
     
@@ -103,82 +212,483 @@ def get_period_by_interval(interval):
     return "2y"
 
 
-# [KIS] 토큰 발급
-def get_kis_token(appkey, appsecret, header_token=None):
-    if header_token and len(header_token) > 10:
-        return header_token, False
-        
-    url = "https://openapi.koreainvestment.com:9443/oauth2/tokenP"
-    body = {"grant_type": "client_credentials", "appkey": appkey, "appsecret": appsecret}
+# ---------------------------------------------------------
+# [동시 수집] yfinance / KIS 호출을 한 번에 띄우고 가장 느린 호출만큼만 기다림
+# - KIS 는 이벤트 루프에서 비동기로, yfinance/디스크 캐시/지표 계산은 블로킹 실행기에서
+# - 실행기 대기열이 가득 차면 새 /analyze 는 바로 503 (스레드 수가 아니라 업스트림 처리량에 맞춰 제한)
+# ---------------------------------------------------------
+BLOCKING = BlockingExecutor(workers=32, max_pending=256, admit_timeout=2.0, name="fetch")
+
+# 소스별 타임아웃 (초) - 넘기면 해당 데이터 없이 진행
+FETCH_TIMEOUT = {"ohlcv": 15, "vix": 5, "info": 8, "kis": 5}
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+def download_ohlcv(ticker, interval, period=None, start=None):
+    # yf.download 는 종목별 전역 버퍼(shared._DFS)를 쓰기 때문에
+    # 같은 종목을 여러 주기로 동시에 받으면 결과가 섞일 수 있음 -> Ticker.history 사용
+    span = {"start": start} if start is not None else {"period": period}
+    with stage("yf_history"):
+        df = yf.Ticker(ticker).history(interval=interval, auto_adjust=True, **span)
+    if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+    return df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+
+# 같은 종목 재조회 시 디스크 캐시에서 읽고, 새로 생긴 봉만 받아서 이어붙임
+OHLCV_CACHE = OHLCVCache(download_ohlcv)
+
+def get_ohlcv(ticker, interval):
+    # 주봉/월봉은 일봉 캐시에서 집계 (같은 2년 구간이라 따로 받을 필요 없음)
+    src = SOURCES.get(interval)
+    if src and src[0] == "1d":
+        daily = OHLCV_CACHE.get(ticker, "1d", get_period_by_interval("1d"))
+        return None if daily is None or daily.empty else aggregate(daily, interval, ticker)
+    return OHLCV_CACHE.get(ticker, interval, get_period_by_interval(interval))
+
+# yf.download 멀티 티커 모드는 전역 버퍼를 공유하므로 일괄 다운로드끼리는 순서대로 실행
+BULK_DOWNLOAD_LOCK = threading.Lock()
+
+def download_many(tickers, interval, period):
+    # 여러 종목을 한 번의 요청으로 받아 {ticker: df} 로 분리
+    with BULK_DOWNLOAD_LOCK, stage("yf_download"):
+        raw = yf.download(tickers, interval=interval, period=period, auto_adjust=True, progress=False, group_by="ticker", threads=True)
+    frames = {}
+    for t in tickers:
+        try:
+            df = raw[t] if isinstance(raw.columns, pd.MultiIndex) else raw
+        except KeyError:
+            continue
+        # 멀티 티커 결과는 날짜를 합집합으로 맞추므로 휴장일 빈 행 제거
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].dropna(subset=["Close"])
+        if not df.empty: frames[t] = df
+    return frames
+
+# 시장 공통/기업정보 데이터는 요청 간 공유 (동시 요청은 업스트림 1회로 합침)
+# 기다리는 요청은 FETCH_TIMEOUT 만큼만 대기 (먼저 간 yfinance 호출이 멈춰도 실행기 스레드가 묶이지 않게)
+VIX_CACHE = SharedCache("vix", ttl=60, maxsize=4, wait=FETCH_TIMEOUT["vix"])
+INFO_CACHE = SharedCache("info", ttl=60 * 60, maxsize=4096, wait=FETCH_TIMEOUT["info"])  # 애널리스트 목표가/상장주식수
+
+def load_info(ticker):
+    with stage("yf_info"):
+        return yf.Ticker(ticker).info
+
+def fetch_info(ticker):
+    return INFO_CACHE.get_or_load(ticker, load_info, ticker)
+
+def fetch_vix():
+    return VIX_CACHE.get_or_load("^VIX", download_ohlcv, "^VIX", "1d", "5d")
+
+def _consume(task):
+    # 타임아웃으로 버려진 작업의 예외를 회수 (Task exception was never retrieved 경고 방지)
+    if not task.cancelled(): task.exception()
+
+def submit_fetch(fn, *args):
+    # (task, 제출 시각) - 타임아웃은 대기 시작이 아니라 제출 시점부터 계산
+    # 코루틴 함수(KIS)는 루프에서 바로, 나머지는 블로킹 실행기에서 실행 (요청 컨텍스트도 함께 전달)
+    coro = fn(*args) if asyncio.iscoroutinefunction(fn) else BLOCKING.run(fn, *args)
+    task = asyncio.ensure_future(coro)
+    task.add_done_callback(_consume)
+    return task, time.monotonic()
+
+async def wait_fetch(job, source, default=None, label=""):
+    task, started = job
+    remain = max(0.0, FETCH_TIMEOUT[source] - (time.monotonic() - started))
     try:
-        res = requests.post(url, json=body)
-        data = res.json()
-        new_token = data.get("access_token")
-        if new_token:
-            return new_token, True
-
+        return await asyncio.wait_for(asyncio.shield(task), remain)
+    except asyncio.TimeoutError:
+        print(f"⏱️ {label or source} 타임아웃 ({FETCH_TIMEOUT[source]}s) - 해당 데이터 없이 진행")
     except Exception as e:
-        print(f"Token Error: {e}")
-        return None, False
-    
-def get_kis_investors(ticker, token, appkey, appsecret):
-    url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/inquire-investor"
-    # TR_ID: FHKST01010900 (현물 투자자별 매매동향)
-    headers = {"content-type": "application/json", "authorization": f"Bearer {token}", "appkey": appkey, "appsecret": appsecret, "tr_id": "FHKST01010900"}
-    params = {"fid_cond_mrkt_div_code": "J", "fid_input_iscd": ticker.replace(".KS", "")}
-    
+        print(f"{label or source} Error: {e}")
+    return default
+
+
+# ---------------------------------------------------------
+# [실시간 지표] KIS 현재가가 들어오면 과거 봉은 캐시된 증분 상태를 쓰고 현재 봉만 갱신
+# ---------------------------------------------------------
+LIVE_STATES = OrderedDict()  # (ticker, interval) -> LiveIndicators, 최근 사용 순
+LIVE_STATES_MAX = 512
+LIVE_LOCK = threading.Lock()
+
+def live_indicators(ticker, interval, df):
+    key = (ticker, interval)
+    with LIVE_LOCK:
+        state = LIVE_STATES.get(key)
+    # 새 봉이 생겼거나 과거 봉이 바뀐 경우에만 전체 구간으로 다시 시드
+    if state is None or not state.matches(df):
+        state = LiveIndicators.seed(df)
+    with LIVE_LOCK:
+        LIVE_STATES[key] = state
+        LIVE_STATES.move_to_end(key)
+        while len(LIVE_STATES) > LIVE_STATES_MAX: LIVE_STATES.popitem(last=False)
+
+    last = df.iloc[-1]
+    return state.quote(float(last['High']), float(last['Low']), float(last['Close']), float(last['Volume']))
+
+
+# [KIS] 세션 풀 + 토큰 캐시 + 호출 제한
+KIS = KISClient()
+
+# 종목 자동완성 - /analyze 호출 전에 이름/코드를 확정하는 용도
+@app.get("/search")
+def search_ticker(q: str = Query(""), limit: int = Query(10, ge=1, le=50)):
+    return {"query": q, "results": SEARCH_INDEX.search(q, limit)}
+
+SCREEN_MAX_TICKERS = 500
+SCREEN_CHUNK = 100  # 일괄 다운로드 1회당 종목 수
+
+def load_frames(tickers, interval, period):
+    # 캐시에 있는 종목은 그대로 쓰고, 나머지만 묶어서 다운로드 -> {ticker: df}
+    frames = {}; missing = []
+    for t in tickers:
+        df = OHLCV_CACHE.peek(t, interval, period)
+        if df is not None: frames[t] = df
+        else: missing.append(t)
+
+    for i in range(0, len(missing), SCREEN_CHUNK):
+        chunk = missing[i:i + SCREEN_CHUNK]
+        try:
+            for t, df in download_many(chunk, interval, period).items():
+                frames[t] = OHLCV_CACHE.put(t, interval, period, df)
+        except Exception as e:
+            print(f"Bulk Download Error: {e}")
+    return frames
+
+# ---------------------------------------------------------
+# [전 종목 스냅샷] KIS 마스터 전 종목을 정해진 시각에 미리 채점 -> /rank, /analyze 기본 조건 응답
+# ---------------------------------------------------------
+def universe():
+    return {f"{code}.KS": name for code, name in CODE_TO_NAME.items()}
+
+def load_daily_frames(tickers):
+    return load_frames(tickers, "1d", get_period_by_interval("1d"))
+
+SNAPSHOT = UniverseSnapshot(universe, load_daily_frames)
+
+@app.get("/rank")
+def rank_stocks(
+    min_score: int = Query(0), max_score: int = Query(100),
+    signal: str = Query(None, description="사유 문구 포함 여부 (예: 골든크로스)"),
+    trend: str = Query(None, description="추세 상태 포함 여부 (예: 눌림목)"),
+    limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0),
+):
+    if SNAPSHOT.current is None: return {"error": "아직 생성된 스냅샷이 없습니다."}
+    return SNAPSHOT.rank(min_score, max_score, signal, trend, limit, offset)
+
+@app.get("/screen")
+def screen_stocks(
+    request: Request,
+    tickers: str = Query(..., description="쉼표로 구분한 종목 코드/이름 (최대 500개)"),
+    ma_interval: str = Query("1d"),
+    w_ma: float = Query(1.5), w_rsi: float = Query(1.0), w_macd: float = Query(1.0), w_stoch: float = Query(0.5), w_bb: float = Query(1.0),
+    compact: bool = Query(False, description="숫자를 원값으로 (msgpack/gzip 협상)"),
+):
+    keywords = [k.strip() for k in tickers.split(",") if k.strip()]
+    if not keywords: return {"error": "종목 목록이 비어 있습니다."}
+    if len(keywords) > SCREEN_MAX_TICKERS: return {"error": f"한 번에 최대 {SCREEN_MAX_TICKERS}개 종목까지 가능합니다."}
+
+    weights = {"ma": w_ma, "rsi": w_rsi, "macd": w_macd, "stoch": w_stoch, "bb": w_bb}
+    period = get_period_by_interval(ma_interval)
+    # 동기 핸들러(스레드풀)라서 루프 태스크 대신 실행기에 동기 제출 (대기열 상한/요청 컨텍스트는 run 과 같음)
     try:
-        res = requests.get(url, headers=headers, params=params)
-        data = res.json()
-        if data['rt_cd'] == '0' and data['output']:
-            todays = data['output'][0]
-            return {
-                "individual": int(todays.get('prsn_ntby_qty', 0)),
-                "foreigner": int(todays.get('frgn_ntby_qty', 0)),
-                "institution": int(todays.get('orgn_ntby_qty', 0)),
-                "date": todays.get('stck_bsop_date', '')
-            }
-        return None
-    except Exception as e:
-        print(f"KIS Investor Error: {e}")
-        return None
+        vix_future = BLOCKING.submit(fetch_vix)
+    except Overloaded as e:
+        return JSONResponse(status_code=503, headers={"Retry-After": "2"}, content={"error": str(e)})
+
+    symbols = {}; failed = []
+    for kw in keywords:
+        t = get_ticker_symbol(kw)
+        if re.search("[가-힣]", t): failed.append(kw)
+        else: symbols.setdefault(t, kw)
 
-# [KIS] 현재가 조회
-def get_kis_price(ticker, token, appkey, appsecret):
-    url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/inquire-price"
-    headers = {"content-type": "application/json", "authorization": f"Bearer {token}", "appkey": appkey, "appsecret": appsecret, "tr_id": "FHKST01010100"}
-    params = {"fid_cond_mrkt_div_code": "J", "fid_input_iscd": ticker.replace(".KS", "")}
+    frames = load_frames(list(symbols), ma_interval, period)
+
+    # VIX 는 시장 공통 데이터이므로 종목별이 아니라 1회만 조회
     try:
-        res = requests.get(url, headers=headers, params=params)
-        data = res.json()
-        if data['rt_cd'] == '0': return float(data['output']['stck_prpr'])
-        return None
-    except: return None
+        vix_df = vix_future.result(timeout=FETCH_TIMEOUT["vix"])
+    except Exception:
+        vix_df = None
+
+    # 종목별 마지막 봉/VIX/가중치가 그대로면 채점 없이 304
+    tag = data_version("screen", keywords, symbols, ma_interval, weights, compact, {t: frame_version(df) for t, df in frames.items()}, frame_version(vix_df))
+    unchanged = not_modified(request, tag)
+    if unchanged: return unchanged
+
+    results = []
+    for t, kw in symbols.items():
+        df = frames.get(t)
+        if df is None or len(df) < 2:
+            failed.append(kw); continue
+        try:
+            ind = compute_indicators(df)
+            score, reasons, indicators = latest_result(ind, weights)
+            if compact: indicators = latest_values(ind)
+        except Exception as e:
+            print(f"Screen Score Error ({t}): {e}")
+            failed.append(kw); continue
+
+        name = CODE_TO_NAME.get(t.replace(".KS", ""), t) if t.endswith(".KS") else t
+        results.append({"ticker": t, "name": name, "price": raw_number(df['Close'].iloc[-1]), "score": score, "reasons": reasons, "indicators": indicators})
+
+    results.sort(key=lambda r: r["score"], reverse=True)
+    for rank, r in enumerate(results, 1): r["rank"] = rank
+
+    content = {
+        "count": len(results), "results": results, "failed": failed,
+        "weights": weights, "interval": ma_interval, "vix": vix_view(vix_df, raw=compact),
+    }
+    return respond(request, content, tag, compact)
+
+# 가중치/ATR 전략 백테스트 - grid 지정 시 5개 가중치 전체 조합을 탐색
+@app.get("/backtest/{keyword}")
+def backtest_stock(
+    keyword: str,
+    strategy: str = Query("swing", description="scalp(60분봉) / swing(일봉) / long(주봉)"),
+    entry_score: int = Query(70, ge=0, le=100),
+    w_ma: float = Query(1.5), w_rsi: float = Query(1.0), w_macd: float = Query(1.0), w_stoch: float = Query(0.5), w_bb: float = Query(1.0),
+    grid: str = Query(None, description="가중치 후보값 (예: 0,0.5,1,1.5,2)"),
+    top: int = Query(10, ge=1, le=100),
+):
+    if strategy not in STRATEGIES: return {"error": f"지원하지 않는 전략입니다. ({', '.join(STRATEGIES)})"}
+    ticker = get_ticker_symbol(keyword)
+    if re.search("[가-힣]", ticker):
+        return {"error": f"'{keyword}'에 대한 종목 코드를 찾을 수 없습니다. 정확한 회사명이나 코드를 입력해주세요."}
+
+    try:
+        grid_values = sorted({float(v) for v in grid.split(",") if v.strip()}) if grid else None
+    except ValueError:
+        return {"error": "grid 는 쉼표로 구분한 숫자여야 합니다."}
+
+    interval = STRATEGIES[strategy][0]
+    try:
+        df = get_ohlcv(ticker, interval)
+        if df is None or len(df) < 30: return {"error": "데이터 부족"}
+
+        weights = {"ma": w_ma, "rsi": w_rsi, "macd": w_macd, "stoch": w_stoch, "bb": w_bb}
+        result = run_backtest(df, strategy, weights, entry_score, grid_values, top)
+        return {"ticker": ticker, "strategy": strategy, "interval": interval, **result}
+    except Exception as e:
+        print(f"Backtest Error: {e}")
+        return {"error": str(e)}
+
+# 기동 단계별 시간 / 지연 임포트 시간 / warm-up 상태
+@app.get("/startup")
+def startup_report():
+    return startup.report()
+
+# 캐시 적중률/업스트림 호출 현황
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "vix": VIX_CACHE.stats(), "info": INFO_CACHE.stats(),
+        "ohlcv": dict(OHLCV_CACHE.stats), "bars": OHLCV_CACHE.memory.info(), "snapshot": SNAPSHOT.info(), "kis": dict(KIS.stats),
+        "executor": {**BLOCKING.stats, "pending": BLOCKING.pending, "max_pending": BLOCKING.max_pending},
+    }
+
+# Prometheus 메트릭 (단계/업스트림 지연 히스토그램, 오류 수, 캐시 적중률)
+@app.get("/metrics")
+def metrics_endpoint():
+    caches = {"vix": VIX_CACHE.stats(), "info": INFO_CACHE.stats()}
+    counters = {"ohlcv_cache": dict(OHLCV_CACHE.stats), "bar_store": dict(OHLCV_CACHE.memory.stats), "kis_client": dict(KIS.stats), "executor": dict(BLOCKING.stats)}
+    return PlainTextResponse(metrics.render(caches, counters), media_type="text/plain; version=0.0.4")
+
+# 샘플링 프로파일 결과 (collapsed stack) - 응답 헤더 X-Profile-Id 로 조회
+@app.get("/debug/profile/{profile_id}")
+def profile_result(profile_id: str, x_profile: str = Header(None)):
+    if not profiler.enabled(x_profile): return {"error": "프로파일러가 비활성화되어 있습니다."}
+    text = profiler.get(profile_id)
+    if text is None: return {"error": "프로파일을 찾을 수 없습니다."}
+    return PlainTextResponse(text)
+
+# AI 코멘트 조회 - wait 초 동안 완료를 기다렸다가 반환 (롱 폴링)
+@app.get("/advisory/{job_id}")
+async def advisory_status(job_id: str, wait: float = Query(0, ge=0, le=30)):
+    job = await get_advisory(job_id, wait)
+    if job is None: return {"error": "AI 분석 작업을 찾을 수 없습니다. 다시 분석해주세요."}
+    return {"job_id": job_id, "status": job["status"], "ai_message": job["ai_message"]}
 
 @app.get("/models")
-def get_gemini_models(gemini_api_key: str = Header(None)):
+async def get_gemini_models(gemini_api_key: str = Header(None)):
     if not gemini_api_key:
         return {"error": "API Key가 필요합니다."}
     try:
-        genai.configure(api_key=gemini_api_key)
-        models = []
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                models.append(m.name)
-        return {"models": models}
+        return {"models": await GEMINI.list_models(gemini_api_key)}
     except Exception as e:
         return {"error": str(e)}
     
+# ---------------------------------------------------------
+# [응답 항목] /analyze 와 스냅샷 응답 공용
+# ---------------------------------------------------------
+def raw_number(n):
+    # 응답용 원값 (float32 저장 정밀도 밖의 자릿수는 버림)
+    n = float(n)
+    return trim_float(n) if np.isfinite(n) else None
+
+def price_formatter(is_korean, raw=False):
+    # raw: compact 응답용 원값 (표시 문자열 대신 숫자)
+    if raw: return raw_number
+    return (lambda n: f"{int(n):,}") if is_korean else (lambda n: f"{n:.2f}")
+
+def analyst_view(info, last_price, is_korean, raw=False):
+    empty = None if raw else "-"
+    analyst_data = {"recommendation": "-", "target_mean": empty, "target_low": empty, "target_high": empty, "upside": empty}
+    try:
+        rec_key = info.get('recommendationKey', 'none')
+        t_mean = info.get('targetMeanPrice', None)
+        
+        rec_map = {"buy": "매수", "strong_buy": "강력매수", "hold": "중립", "sell": "매도", "underperform": "비중축소", "none": "-"}
+        analyst_data['recommendation'] = rec_map.get(rec_key, rec_key.upper())
+        
+        if t_mean and raw:
+            analyst_data.update(target_mean=t_mean, target_low=info.get('targetLowPrice'), target_high=info.get('targetHighPrice'),
+                                upside=raw_number((t_mean - last_price) / last_price * 100))
+        elif t_mean:
+            analyst_data['target_mean'] = f"{t_mean:,.0f}" if is_korean else f"{t_mean:.2f}"
+            analyst_data['target_low'] = f"{info.get('targetLowPrice', 0):,.0f}" if is_korean else f"{info.get('targetLowPrice', 0):.2f}"
+            analyst_data['target_high'] = f"{info.get('targetHighPrice', 0):,.0f}" if is_korean else f"{info.get('targetHighPrice', 0):.2f}"
+            
+            upside = ((t_mean - last_price) / last_price) * 100
+            analyst_data['upside'] = f"{upside:.2f}%"
+    except: pass
+    return analyst_data
+
+def strategies_view(last_price, atr_1d, atr_60m, atr_1wk, fmt):
+    return {
+        "atr": fmt(atr_1d),
+        "scalp": {"tp": fmt(last_price + atr_60m), "sl": fmt(last_price - atr_60m)},
+        "swing": {"tp": fmt(last_price + atr_1d*2), "sl": fmt(last_price - atr_1d*2)},
+        "long": {"tp": fmt(last_price + atr_1wk*3), "sl": fmt(last_price - atr_1wk*3)}
+    }
+
+def sr_view(df, last_price, ma20_last, fmt, raw=False):
+    try:
+        support, resistance, position = support_resistance(df, last_price, ma20_last)
+        return {"support": fmt(support), "resistance": fmt(resistance), "position": position}
+    except:
+        return {"support": None if raw else "-", "resistance": None if raw else "-", "position": 50}
+
+def vix_view(vix_df, raw=False):
+    try:
+        vix_val = float(vix_df['Close'].iloc[-1])
+        vix_msg = "공포" if vix_val >= 20 else "평온"
+    except: vix_val=0; vix_msg="-"
+    return {"score": raw_number(vix_val) if raw else f"{vix_val:.2f}", "msg": vix_msg}
+
+def turnover_view(vol, info, raw=False):
+    # 회전율
+    try:
+        shares = info.get('sharesOutstanding', 1)
+        tr = (vol/shares)*100
+        t_msg = "활발" if tr > 1 else "조용"
+    except: tr=0; t_msg="-"; vol=0; shares=0
+    if raw: return {"rate": raw_number(tr), "msg": t_msg, "volume": raw_number(vol), "shares": raw_number(shares)}
+    return {"rate": f"{tr:.2f}", "msg": t_msg, "volume": f"{vol:,.0f}", "shares": f"{shares:,.0f}"}
+
+# 응답에 쓰는 기업정보 항목 (ETag 계산용)
+INFO_FIELDS = ("recommendationKey", "targetMeanPrice", "targetLowPrice", "targetHighPrice", "sharesOutstanding")
+
+def info_version(info):
+    return [info.get(k) for k in INFO_FIELDS] if info else None
+
+def advisory_view(gemini_api_key, gemini_model, stock_name, ticker, final_score, reasons, investor_trend, analyst_data):
+    # (ai_message, ai_job) - 키가 없으면 (None, None)
+    if not gemini_api_key: return None, None
+    job_id, job = submit_advisory(gemini_api_key, gemini_model, stock_name, ticker, final_score, reasons, investor_trend, analyst_data)
+    return job["ai_message"], {"id": job_id, "status": job["status"]}
+
+# 데이터 버전 -> 그 데이터로 제출한 AI 작업 ID (304 판단 시 AI 작업 상태까지 ETag 에 반영)
+ADVISORY_BY_VERSION = OrderedDict()
+ADVISORY_BY_VERSION_MAX = 4096
+
+def result_tag(version, ai_job):
+    # 응답 ETag = 데이터 버전 + AI 작업 (작업이 끝나거나 실패하면 ETag 가 바뀌어 새 응답을 받음)
+    return data_version(version, ai_job["id"] if ai_job else None, ai_job["status"] if ai_job else None)
+
+def check_not_modified(request, version, gemini_api_key):
+    # 304 응답 또는 None - 이벤트 루프에서만 호출 (ADVISORY_BY_VERSION 잠금 불필요)
+    ai_job = None
+    if gemini_api_key:
+        job_id = ADVISORY_BY_VERSION.get(version)
+        status = job_status(job_id) if job_id else None
+        # 작업이 없거나 실패했으면 다시 제출해야 하므로 304 로 끝내지 않음
+        if status in (None, "error"): return None
+        ai_job = {"id": job_id, "status": status}
+    return not_modified(request, result_tag(version, ai_job))
+
+def remember_advisory(version, ai_job):
+    if ai_job is None: return
+    ADVISORY_BY_VERSION[version] = ai_job["id"]
+    ADVISORY_BY_VERSION.move_to_end(version)
+    while len(ADVISORY_BY_VERSION) > ADVISORY_BY_VERSION_MAX: ADVISORY_BY_VERSION.popitem(last=False)
+
+def compute_signals(ticker, data_store, main_interval, real_time_applied, last_price, weights):
+    # 지표/점수 계산 (CPU 작업이므로 블로킹 실행기에서 실행)
+    with stage("indicators"):
+        # 실시간 시세가 반영된 경우 현재 봉만 증분 계산 (과거 전체 재계산 없음)
+        live = {iv: live_indicators(ticker, iv, df) for iv, df in data_store.items()} if real_time_applied else None
+        sig = live[main_interval] if live else compute_indicators(data_store[main_interval])
+
+        # ATR
+        def last_atr(interval):
+            if live: return live[interval]["atr"][-1]
+            df = data_store[interval]
+            return calc_atr(df['High'], df['Low'], df['Close'], 14)[-1]
+        atr_1d = last_atr("1d") if len(data_store["1d"]) > 14 else last_price*0.02
+        atr_60m = last_atr("60m") if "60m" in data_store else atr_1d*0.25
+        atr_1wk = last_atr("1wk") if "1wk" in data_store else atr_1d*2.5
+
+    with stage("scoring"):
+        final_score, reasons, indicators = latest_result(sig, weights)
+    return final_score, reasons, indicators, latest_values(sig), sig["sma20"][-1], (atr_1d, atr_60m, atr_1wk)
+
+async def analyze_from_snapshot(request, version, entry, stock_name, is_korean, gemini_api_key, gemini_model, compact):
+    # 일봉/주봉 부분(점수, 지표, 추세, 스윙/장기 ATR)은 스냅샷 값, 나머지는 요청 시점에 조회
+    # 단타 ATR 은 일반 경로와 같이 60분봉으로 계산 (60분봉이 없을 때만 일봉 ATR 의 1/4)
+    ticker = entry["ticker"]; last_price = entry["price"]
+    with stage("fetch"):
+        hourly_job = submit_fetch(OHLCV_CACHE.get, ticker, "60m", get_period_by_interval("60m"))
+        vix_job = submit_fetch(fetch_vix)
+        info_job = submit_fetch(fetch_info, ticker)
+        hourly = await wait_fetch(hourly_job, "ohlcv", label="OHLCV 60m")
+        info = await wait_fetch(info_job, "info", label="Ticker Info")
+        vix_df = await wait_fetch(vix_job, "vix", label="VIX")
+
+    data_tag = data_version("analyze", ticker, version, compact, bool(gemini_api_key), gemini_model,
+                            frame_version(hourly), info_version(info), frame_version(vix_df))
+    unchanged = check_not_modified(request, data_tag, gemini_api_key)
+    if unchanged: return unchanged
+
+    fmt = price_formatter(is_korean, raw=compact)
+    analyst_data = analyst_view(info, last_price, is_korean)
+    atr_1d, atr_1wk = entry["atr"]["1d"], entry["atr"]["1wk"]
+    atr_60m = calc_atr(hourly['High'], hourly['Low'], hourly['Close'], 14)[-1] if hourly is not None and not hourly.empty else atr_1d*0.25
+    sr = entry["sr"]
+    ai_comment, ai_job = advisory_view(gemini_api_key, gemini_model, stock_name, ticker, entry["score"], entry["reasons"], None, analyst_data)
+
+    content = {
+        "ticker": ticker, "name": stock_name, "price": fmt(last_price), "currency": "KRW" if is_korean else "USD",
+        "score": entry["score"], "reasons": entry["reasons"], "indicators": entry.get("values") if compact else entry["indicators"],
+        "strategies": strategies_view(last_price, atr_1d, atr_60m, atr_1wk, fmt),
+        "turnover": turnover_view(entry["volume"], info, raw=compact), "real_time": False, "vix": vix_view(vix_df, raw=compact),
+        "trend_status": entry["trend_status"], "ai_message": ai_comment, "ai_job": ai_job,
+        "analyst": analyst_view(info, last_price, is_korean, raw=True) if compact else analyst_data, "investors": None,
+        "auth_info": {"token": None, "expire": None},
+        "sr": {"support": fmt(sr[0]), "resistance": fmt(sr[1]), "position": sr[2]} if sr and None not in sr
+              else {"support": None if compact else "-", "resistance": None if compact else "-", "position": 50},
+        "snapshot": {"version": version, "bar": entry["bar"]},
+    }
+    remember_advisory(data_tag, ai_job)
+    return respond(request, content, result_tag(data_tag, ai_job), compact)
+
 @app.get("/analyze/{keyword}")
-def analyze_stock(
+async def analyze_stock(
+    request: Request,
     keyword: str,
     ma_interval: str = Query("1d"), 
     w_ma: float = Query(1.5), w_rsi: float = Query(1.0), w_macd: float = Query(1.0), w_stoch: float = Query(0.5), w_bb: float = Query(1.0),
     kis_appkey: str = Header(None), kis_secret: str = Header(None), gemini_api_key: str = Header(None), gemini_model: str = Header("models/gemini-2.0-flash"),
     kis_access_token: str = Header(None),
+    compact: bool = Query(False, description="숫자를 원값으로 (msgpack/gzip 협상)"),
 ):
     ticker = get_ticker_symbol(keyword)
-    import re
     
     is_korean = ticker.endswith(".KS")
     if re.search("[가-힣]", ticker):
@@ -192,323 +702,118 @@ def analyze_stock(
         elif keyword in NAME_TO_CODE:
             stock_name = keyword
     
+    # 실행기 대기열이 이미 가득 찼으면 더 쌓지 않고 바로 돌려보냄 (backpressure)
+    if BLOCKING.saturated():
+        return JSONResponse(status_code=503, headers={"Retry-After": "2"}, content={"error": "요청이 많아 잠시 후 다시 시도해주세요."})
+
+    # 기본 조건(일봉, 기본 가중치, KIS 실시간 시세 없음)이고 스냅샷이 일봉 캐시 TTL 안이면 미리 채점한 값 사용
+    weights = {"ma": w_ma, "rsi": w_rsi, "macd": w_macd, "stoch": w_stoch, "bb": w_bb}
+    if ma_interval == "1d" and weights == DEFAULT_WEIGHTS and not (kis_appkey and kis_secret):
+        found = SNAPSHOT.lookup(ticker)
+        if found: return await analyze_from_snapshot(request, *found, stock_name, is_korean, gemini_api_key, gemini_model, compact)
+
     req_intervals = list(set(["60m", "1d", "1wk", ma_interval]))
+    # 주봉 등 상위 주기는 따로 받지 않고 일봉/분봉에서 집계
+    fetch_intervals, derived = plan_intervals(req_intervals, get_period_by_interval)
     data_store = {}
 
     try:
-        # 1. 데이터 수집
-        for interval in req_intervals:
-            period = get_period_by_interval(interval)
-            df = yf.download(ticker, interval=interval, period=period, auto_adjust=True, progress=False)
-            if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-            if not df.empty: data_store[interval] = df
-        
-        if "1d" not in data_store: return {"error": "데이터 부족"}
-
-        # 2. 실시간 시세 (KIS)
-        real_time_applied = False
-        investor_trend = None
-        new_issued_token = None
-        token_expire_time = None
-        
-        if ticker.endswith(".KS") and kis_appkey and kis_secret:
-            token, is_new = get_kis_token(kis_appkey, kis_secret, kis_access_token)
-            
-            if token:
-                if is_new:
-                    new_issued_token = token
-                    token_expire_time = int(time.time()) + (23 * 60 * 60)
-                    
-                cp = get_kis_price(ticker, token, kis_appkey, kis_secret)
+        with stage("fetch"):
+            # 1. 데이터 수집 (시세/VIX/기업정보/KIS 토큰 동시 요청)
+            use_kis = bool(ticker.endswith(".KS") and kis_appkey and kis_secret)
+            ohlcv_jobs = {iv: submit_fetch(OHLCV_CACHE.get, ticker, iv, get_period_by_interval(iv)) for iv in fetch_intervals}
+            vix_job = submit_fetch(fetch_vix)
+            info_job = submit_fetch(fetch_info, ticker)
+            token_job = submit_fetch(KIS.get_token, kis_appkey, kis_secret, kis_access_token) if use_kis else None
+
+            # 2. 실시간 시세 (KIS) - 토큰이 나오는 즉시 현재가/수급을 병렬로 요청
+            real_time_applied = False
+            investor_trend = None
+            new_issued_token = None
+            token_expire_time = None
+            price_job = investor_job = None
+
+            if token_job:
+                token, expire = await wait_fetch(token_job, "kis", label="KIS Token") or (None, None)
+
+                if token:
+                    # 서버 캐시 토큰도 클라이언트에 내려줘서 다음 요청부터 헤더로 재사용
+                    if expire:
+                        new_issued_token = token
+                        token_expire_time = expire
+
+                    # 현재가/수급은 같은 keep-alive 세션으로 함께 요청
+                    price_job = submit_fetch(KIS.get_price, ticker, token, kis_appkey, kis_secret)
+                    investor_job = submit_fetch(KIS.get_investors, ticker, token, kis_appkey, kis_secret)
+
+            for interval, job in ohlcv_jobs.items():
+                df = await wait_fetch(job, "ohlcv", label=f"OHLCV {interval}")
+                if df is not None and not df.empty: data_store[interval] = df
+
+            if "1d" not in data_store: return {"error": "데이터 부족"}
+
+            if price_job:
+                cp = await wait_fetch(price_job, "kis", label="KIS Price")
                 if cp:
-                    for k in data_store:
-                        data_store[k].iloc[-1, data_store[k].columns.get_loc('Close')] = cp
+                    # 캐시 데이터는 읽기 전용 뷰 -> 종가 열만 복사해서 마지막 값 교체
+                    for k, df in data_store.items():
+                        close = df['Close'].to_numpy(copy=True); close[-1] = cp
+                        data_store[k] = df.assign(Close=close)
                     real_time_applied = True
-                investor_trend = get_kis_investors(ticker, token, kis_appkey, kis_secret)
-
-        main_df = data_store.get(ma_interval, data_store["1d"]).copy()
+            if investor_job:
+                investor_trend = await wait_fetch(investor_job, "kis", label="KIS Investor")
+
+            # 파생 주기 집계 - 현재가 반영 후에 만들어서 모든 주기의 마지막 봉이 같은 시세를 가리킴
+            if derived: data_store.update(await BLOCKING.run(derive_frames, data_store, derived, ticker))
+
+            # 기업정보(.info)는 애널리스트 목표가/상장주식수에 함께 사용 (1회만 조회)
+            info = await wait_fetch(info_job, "info", label="Ticker Info")
+            vix_df = await wait_fetch(vix_job, "vix", label="VIX")
+        # 응답에 쓰이는 데이터와 AI 작업 상태가 그대로면 지표/점수/AI 계산 없이 304 (작업이 끝났거나 실패했으면 새로 계산)
+        data_tag = data_version("analyze", ticker, ma_interval, weights, compact, bool(gemini_api_key), gemini_model,
+                                {iv: frame_version(df) for iv, df in data_store.items()}, info_version(info), frame_version(vix_df),
+                                investor_trend, new_issued_token, token_expire_time)
+        unchanged = check_not_modified(request, data_tag, gemini_api_key)
+        if unchanged: return unchanged
+
+        main_interval = ma_interval if ma_interval in data_store else "1d"
+        main_df = data_store[main_interval]
         last_price = main_df['Close'].iloc[-1]
-        analyst_data = {"recommendation": "-", "target_mean": "-", "target_low": "-", "target_high": "-", "upside": "-"}
-        try:
-            info = yf.Ticker(ticker).info
-            rec_key = info.get('recommendationKey', 'none')
-            t_mean = info.get('targetMeanPrice', None)
-            
-            rec_map = {"buy": "매수", "strong_buy": "강력매수", "hold": "중립", "sell": "매도", "underperform": "비중축소", "none": "-"}
-            analyst_data['recommendation'] = rec_map.get(rec_key, rec_key.upper())
-            
-            if t_mean:
-                analyst_data['target_mean'] = f"{t_mean:,.0f}" if is_korean else f"{t_mean:.2f}"
-                analyst_data['target_low'] = f"{info.get('targetLowPrice', 0):,.0f}" if is_korean else f"{info.get('targetLowPrice', 0):.2f}"
-                analyst_data['target_high'] = f"{info.get('targetHighPrice', 0):,.0f}" if is_korean else f"{info.get('targetHighPrice', 0):.2f}"
-                
-                upside = ((t_mean - last_price) / last_price) * 100
-                analyst_data['upside'] = f"{upside:.2f}%"
-        except: pass
+        analyst_data = analyst_view(info, last_price, is_korean)
 
         # ---------------------------------------------------------
         # [점수 산출]
         # ---------------------------------------------------------
-        ws_sum = 0; tot_w = 0; reasons = []; indicators = {}
-        def add_sc(s, w, r, k, v): nonlocal ws_sum, tot_w; ws_sum+=s*w; tot_w+=100*w; reasons.append(r) if r else None; indicators[k]=v
-
-        # 1. MA (이평선) - 수정됨: 이름표를 "MA_Cross"로 통일
-        try:
-            if len(main_df) >= 20: main_df.ta.sma(length=20, append=True)
-            if len(main_df) >= 60: main_df.ta.sma(length=60, append=True)
-            
-            ma20 = main_df['SMA_20'].iloc[-1]
-            ma60 = main_df['SMA_60'].iloc[-1]
-            
-            # 이격도 계산 (현재가 / 20일선 * 100)
-            disparity = (last_price / ma20) * 100
-            
-            ma_score = 50
-            ma_msg = None
-            
-            # [전략] 20일선 근처(98~102%)에 붙어있거나, 살짝 아래(95~98%)일 때 매수 기회
-            if 95 <= disparity <= 103:
-                ma_score = 90
-                ma_msg = "이평선 지지/눌림목"
-                # 만약 골든크로스(5>20) 초기라면 가산점
-                if len(main_df) >= 5:
-                    main_df.ta.sma(length=5, append=True)
-                    ma5 = main_df['SMA_5'].iloc[-1]
-                    p5 = main_df['SMA_5'].iloc[-2]; p20 = main_df['SMA_20'].iloc[-2]
-                    if p5 < p20 and ma5 > ma20:
-                        ma_score = 100
-                        ma_msg = "이평선 골든크로스"
-                        reasons.append("★ 골든크로스 발생")
-
-            # 너무 높음 (110% 이상) -> 과열 (감점)
-            elif disparity >= 110:
-                ma_score = 20
-                ma_msg = "단기 과열 (이격 과대)"
-            
-            # 너무 낮음 (90% 이하) -> 역배열 심화 (주의)
-            elif disparity <= 90:
-                ma_score = 40
-                ma_msg = "역배열 하락세"
-
-            add_sc(ma_score, w_ma, ma_msg, "MA_Pos", f"이격도 {int(disparity)}%")
-        except: add_sc(50, w_ma, None, "MA_Pos", "계산중")
-
-        # 2. RSI
-        try:
-            rsi = main_df.ta.rsi(length=14, append=False).iloc[-1]
-            rsi_score = 100 - rsi
-            msg = "RSI 과매도" if rsi <= 30 else "RSI 과매수" if rsi >= 70 else None
-            add_sc(rsi_score, w_rsi, msg, "RSI", f"{rsi:.2f}")
-        except: indicators["RSI"] = "-"
-
-        # 3. Stoch
-        try:
-            # K=14, D=3, Slow D=3
-            stoch = main_df.ta.stoch(k=14, d=3, append=False)
-            curr_k = stoch.iloc[-1, 0]  # 현재 %K
-            curr_d = stoch.iloc[-1, 1]  # 현재 %D
-            prev_k = stoch.iloc[-2, 0]  # 전일 %K
-            prev_d = stoch.iloc[-2, 1]  # 전일 %D
-            
-            stoch_score = 100 - curr_k
-            stoch_msg = None
-
-            if curr_k <= 20 and prev_k < prev_d and curr_k > curr_d:
-                stoch_score = 100  # 강력 매수
-                stoch_msg = "Stoch 과매도 골든크로스"
-                reasons.append(stoch_msg)
-            
-            elif curr_k >= 80 and prev_k > prev_d and curr_k < curr_d:
-                stoch_score = 0  # 강력 매도
-                stoch_msg = "Stoch 과매수 데드크로스"
-                reasons.append(stoch_msg)
-
-            curr_price = main_df['Close'].iloc[-1]
-            prev_price = main_df['Close'].iloc[-2]
-            
-            if curr_price < prev_price and curr_k > prev_k:
-                stoch_score += 20
-                div_msg = "상승 다이버전스 감지"
-                reasons.append(div_msg)
-                stoch_msg = f"{stoch_msg}, {div_msg}" if stoch_msg else div_msg
-
-            final_stoch_score = max(0, min(100, stoch_score))
-            
-            add_sc(final_stoch_score, w_stoch, None, "Stoch", f"K{curr_k:.1f}/D{curr_d:.1f}")
-
-        except Exception as e: 
-            indicators["Stoch"] = "-"
-            print(f"Stoch Error: {e}")
-
-        # 4. MACD
-        try:
-            macd = main_df.ta.macd(fast=12, slow=26, signal=9)
-            curr_m = macd.iloc[-1, 0]; curr_s = macd.iloc[-1, 2] # MACD, Signal
-            prev_m = macd.iloc[-2, 0]; prev_s = macd.iloc[-2, 2]
-            
-            m_score = 50
-            m_msg = None
-            
-            # [전략] 0선 아래(바닥권)에서 골든크로스 발생 시 최고점
-            if curr_m < 0 and curr_s < 0:
-                if prev_m < prev_s and curr_m > curr_s: # 골든크로스
-                    m_score = 100
-                    m_msg = "바닥권 추세 전환 (MACD Golden)"
-                    reasons.append("★ MACD 바닥권 반등")
-                elif curr_m > curr_s: # 상승 지속
-                    m_score = 80
-                    m_msg = "바닥권 상승 시도"
-                else:
-                    m_score = 20 # 하락 지속
-            
-            # 0선 위(상승장)에서는 점수를 조금 낮게 (이미 올랐으므로)
-            elif curr_m > 0:
-                if curr_m > curr_s: m_score = 60 # 상승 지속 (But 비쌈)
-                else: m_score = 0 # 하락 반전 (매도)
-
-            add_sc(m_score, w_macd, m_msg, "MACD", f"{curr_m:.2f}")
-        except: indicators["MACD"]="-"
-
-        # 5. BB
-        try:
-            bb = main_df.ta.bbands(length=20, std=2.0, append=False)
-            l = bb.iloc[-1, 0]; u = bb.iloc[-1, 2]
-            pb = (last_price - l) / (u - l) if (u - l) != 0 else 0.5
-            bb_score = (1 - pb) * 100
-            bb_score = max(0, min(100, bb_score))
-            msg = "볼린저 하단" if pb < 0.1 else "볼린저 상단" if pb > 0.9 else None
-            add_sc(bb_score, w_bb, msg, "BB", f"위치 {int(pb*100)}%")
-        except: indicators["BB"] = "-"
-
-        # 6. OBV (안전장치 추가)
-        try:
-            obv_val = main_df.ta.obv(append=False).iloc[-1]
-            indicators['OBV'] = f"{obv_val:,.0f}"
-        except:
-            indicators['OBV'] = "-"
-
-        final_score = int((ws_sum/tot_w)*100) if tot_w > 0 else 50
+        final_score, reasons, indicators, values, ma20_last, (atr_1d, atr_60m, atr_1wk) = await BLOCKING.run(
+            compute_signals, ticker, data_store, main_interval, real_time_applied, last_price, weights)
 
         # ---------------------------------------------------------
-        # 기타 (ATR, VIX, Trend, AI)
+        # 기타 (VIX, Trend, AI)
         # ---------------------------------------------------------
-        # ATR
-        atr_1d = data_store["1d"].ta.atr(length=14, append=False).iloc[-1] if len(data_store["1d"]) > 14 else last_price*0.02
-        atr_60m = data_store["60m"].ta.atr(length=14, append=False).iloc[-1] if "60m" in data_store else atr_1d*0.25
-        atr_1wk = data_store["1wk"].ta.atr(length=14, append=False).iloc[-1] if "1wk" in data_store else atr_1d*2.5
-        
-        def fmt(n): return f"{int(n):,}" if is_korean else f"{n:.2f}"
-        strategies = {
-            "atr": fmt(atr_1d),
-            "scalp": {"tp": fmt(last_price + atr_60m), "sl": fmt(last_price - atr_60m)},
-            "swing": {"tp": fmt(last_price + atr_1d*2), "sl": fmt(last_price - atr_1d*2)},
-            "long": {"tp": fmt(last_price + atr_1wk*3), "sl": fmt(last_price - atr_1wk*3)}
-        }
-        
-        try:
-            # 1. 지지선 (Support): 최근 20일(영업일 기준 한달) 중 최저가
-            # 의미: "이 가격 깨지면 바닥 뚫린 것" (손절 라인)
-            recent_low = main_df['Low'].tail(20).min()
-            
-            # 2. 저항선 (Resistance): 20일 이동평균선
-            # 의미: "하락 추세에서 반등 시 1차 목표치"
-            # 만약 현재가가 20일선보다 위에 있다면? -> 최근 20일 최고가를 저항선으로 잡음
-            ma20_val = main_df['SMA_20'].iloc[-1] if 'SMA_20' in main_df else main_df['Close'].mean()
-            recent_high = main_df['High'].tail(20).max()
-            
-            if last_price < ma20_val:
-                resistance_price = ma20_val # 아직 역배열이면 20일선이 저항
-            else:
-                resistance_price = recent_high # 정배열이면 전고점이 저항
-
-            # 현재가 위치 비율 (지지선 ~ 저항선 사이 어디쯤인지)
-            # 0%에 가까울수록 지지선(바닥) 근처, 100%에 가까울수록 저항선(천장) 근처
-            position_score = (last_price - recent_low) / (resistance_price - recent_low) * 100
-            
-            sr_data = {
-                "support": fmt(recent_low),
-                "resistance": fmt(resistance_price),
-                "position": int(position_score)
-            }
-        except:
-            sr_data = {"support": "-", "resistance": "-", "position": 50}
+        fmt = price_formatter(is_korean, raw=compact)
+        strategies = strategies_view(last_price, atr_1d, atr_60m, atr_1wk, fmt)
         
-        # VIX
-        try:
-            vix_df = yf.download("^VIX", period="5d", progress=False, auto_adjust=True)
-            if isinstance(vix_df.columns, pd.MultiIndex): vix_df.columns = vix_df.columns.get_level_values(0)
-            vix_val = float(vix_df['Close'].iloc[-1])
-            vix_msg = "공포" if vix_val >= 20 else "평온"
-        except: vix_val=0; vix_msg="-"
-
-        # Trend Status
-        trend_status = {"msg": "-", "color": "gray", "weekly": "-", "daily": "-"}
-        if "1wk" in data_store:
-            df_w = data_store["1wk"]
-            ma20_d = main_df['SMA_20'].iloc[-1] if 'SMA_20' in main_df else last_price
-            ma20_w = df_w.ta.sma(length=20, append=False).iloc[-1] if len(df_w)>20 else last_price
-            is_d_up = last_price > ma20_d; is_w_up = last_price > ma20_w
-            if is_w_up and is_d_up: trend_status={"msg":"🚀 대세 상승", "color":"red", "weekly":"상승", "daily":"상승"}
-            elif is_w_up and not is_d_up: trend_status={"msg":"🌊 눌림목", "color":"blue", "weekly":"상승", "daily":"하락"}
-            elif not is_w_up and is_d_up: trend_status={"msg":"⚠️ 반등", "color":"yellow", "weekly":"하락", "daily":"상승"}
-            else: trend_status={"msg":"📉 하락", "color":"gray", "weekly":"하락", "daily":"하락"}
-
-        # 회전율
-        try:
-            vol = main_df['Volume'].iloc[-1]
-            info = yf.Ticker(ticker).info
-            shares = info.get('sharesOutstanding', 1)
-            tr = (vol/shares)*100
-            t_msg = "활발" if tr > 1 else "조용"
-        except: tr=0; t_msg="-"; vol=0; shares=0
-
-        # AI Advice
-        ai_comment = None
-        if gemini_api_key:
-            try:
-                genai.configure(api_key=gemini_api_key)
-                inv_str = "정보 없음"
-                if investor_trend:
-                    inv_str = f"개인 {investor_trend['individual']}, 외인 {investor_trend['foreigner']}, 기관 {investor_trend['institution']}"
-
-                # 애널리스트 데이터 포맷팅
-                analyst_str = "정보 없음"
-                if analyst_data and analyst_data.get('upside') != "-":
-                    analyst_str = f"투자의견 {analyst_data['recommendation']}, 상승여력 {analyst_data['upside']}"
-                    
-                prompt = f"""
-                당신은 '저점 매수(Bottom Fishing)' 및 '기술적 반등'을 전문으로 분석하는 AI 애널리스트입니다.
-                현재 주가가 바닥권인지, 아니면 추가 하락 위험이 있는지 분석하여 3문장으로 요약해 주세요.
-
-                [분석 데이터]
-                1. 종목: {stock_name} ({ticker})
-                2. 저점 매수 점수: {final_score}점 (100점에 가까울수록 과매도 후 반등 가능성 높음)
-                3. 감지된 시그널: {', '.join(reasons) if reasons else '특이사항 없음'}
-                4. 수급 현황(일별): {inv_str}
-                5. 월가/증권사 의견: {analyst_str}
-
-                [분석 가이드]
-                - 시그널(RSI 과매도, 스토캐스틱 골든크로스 등)이 있다면 이를 근거로 반등 가능성을 언급하세요.
-                - 외인/기관의 수급이 들어오고 있다면 바닥 다지기 신호로 해석하세요.
-                - 점수가 낮다면 '아직 하락 추세가 강해 바닥을 확인하지 못했다'는 취지로 경고하세요.
-                - 말투는 전문적이고 간결하게 작성하세요.
-                """
-                model_name = gemini_model if gemini_model else "models/gemini-2.0-flash"
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                ai_comment = response.text.strip()
-            except Exception as e: ai_comment = str(e)
-
-        return {
+        sr_data = sr_view(main_df, last_price, ma20_last, fmt, raw=compact)
+        vix = vix_view(vix_df, raw=compact)
+        trend = trend_status(last_price, ma20_last, data_store["1wk"]['Close'] if "1wk" in data_store else None)
+        turnover = turnover_view(main_df['Volume'].iloc[-1], info, raw=compact)
+
+        # AI Advice - 백그라운드 작업으로 넘기고 결과는 /advisory/{job_id} 로 조회
+        ai_comment, ai_job = advisory_view(gemini_api_key, gemini_model, stock_name, ticker, final_score, reasons, investor_trend, analyst_data)
+
+        content = {
             "ticker": ticker, "name": stock_name, "price": fmt(last_price), "currency": "KRW" if is_korean else "USD",
-            "score": final_score, "reasons": reasons, "indicators": indicators, "strategies": strategies,
-            "turnover": {"rate": f"{tr:.2f}", "msg": t_msg, "volume": f"{vol:,.0f}", "shares": f"{shares:,.0f}"},
-            "real_time": real_time_applied, "vix": {"score": f"{vix_val:.2f}", "msg": vix_msg},
-            "trend_status": trend_status, "ai_message": ai_comment,
-            "analyst": analyst_data, "investors": investor_trend,
+            "score": final_score, "reasons": reasons, "indicators": values if compact else indicators, "strategies": strategies,
+            "turnover": turnover, "real_time": real_time_applied, "vix": vix,
+            "trend_status": trend, "ai_message": ai_comment, "ai_job": ai_job,
+            "analyst": analyst_view(info, last_price, is_korean, raw=True) if compact else analyst_data, "investors": investor_trend,
             "auth_info": { "token": new_issued_token, "expire": token_expire_time }, "sr": sr_data,
         }
+        remember_advisory(data_tag, ai_job)
+        return respond(request, content, result_tag(data_tag, ai_job), compact)
 
+    except Overloaded as e:
+        return JSONResponse(status_code=503, headers={"Retry-After": "2"}, content={"error": str(e)})
     except Exception as e:
         print(f"Error: {e}")
         return {"error": str(e)}
@@ -0,0 +1,104 @@
+# backend/metrics.py
+# Prometheus 텍스트 형식 메트릭 (/metrics)
+# - 단계/업스트림 호출 시간 히스토그램 (timing.stage 리스너로 수집)
+# - 업스트림 오류 수, 요청 수/지연, 캐시 적중률
+# - 외부 의존성 없이 필요한 만큼만 구현 (Counter / Histogram)
+import threading
+
+import timing
+
+# 초 단위 버킷 - 캐시 적중(ms) ~ Gemini 호출(수 초)까지
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PREFIX = "stock"
+
+
+def _labels(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name; self.help = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock: self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock: items = sorted(self.values.items())
+        lines += [f"{self.name}{_labels(k)} {v}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=BUCKETS):
+        self.name = name; self.help = help_text; self.buckets = buckets
+        self.series = {}   # labels -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            s = self.series.get(key)
+            if s is None: s = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b: s[i] += 1
+            s[-2] += value; s[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock: items = sorted((k, list(s)) for k, s in self.series.items())
+        for key, s in items:
+            for b, c in zip(self.buckets, s):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', b),))} {c}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {s[-1]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {s[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(key)} {s[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(f"{PREFIX}_stage_seconds", "Duration of analyze stages and upstream calls")
+STAGE_ERRORS = Counter(f"{PREFIX}_stage_errors_total", "Stages/upstream calls that raised")
+REQUEST_SECONDS = Histogram(f"{PREFIX}_request_seconds", "HTTP request latency by route")
+REQUESTS = Counter(f"{PREFIX}_requests_total", "HTTP requests by route and status")
+
+
+def _on_stage(name, seconds, peak, error):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    if error: STAGE_ERRORS.inc(stage=name)
+
+
+timing.LISTENERS.append(_on_stage)
+
+
+def observe_request(route, status, seconds):
+    REQUEST_SECONDS.observe(seconds, route=route)
+    REQUESTS.inc(route=route, status=status)
+
+
+def _gauge(name, help_text, samples):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines += [f"{name}{_labels(tuple(sorted(labels.items())))} {value}" for labels, value in samples]
+    return lines
+
+
+def render(caches, counters):
+    # caches: {이름: SharedCache.stats()}, counters: {이름: {항목: 누적값}} (OHLCV 캐시, KIS 클라이언트 등)
+    lines = []
+    for metric in (STAGE_SECONDS, STAGE_ERRORS, REQUEST_SECONDS, REQUESTS): lines += metric.render()
+    lines += _gauge(f"{PREFIX}_cache_hit_ratio", "Shared cache hit ratio (hits + coalesced) / lookups",
+                    [({"cache": name}, st["hit_ratio"]) for name, st in caches.items()])
+    lines += _gauge(f"{PREFIX}_cache_entries", "Shared cache entries", [({"cache": name}, st["size"]) for name, st in caches.items()])
+    samples = [({"cache": name, "result": r}, st[r]) for name, st in caches.items() for r in ("hits", "misses", "coalesced", "errors")]
+    lines += [f"# HELP {PREFIX}_cache_lookups_total Shared cache lookups by result", f"# TYPE {PREFIX}_cache_lookups_total counter"]
+    lines += [f"{PREFIX}_cache_lookups_total{_labels(tuple(sorted(l.items())))} {v}" for l, v in samples]
+    for name, values in counters.items():
+        metric = f"{PREFIX}_{name}_total"
+        lines += [f"# HELP {metric} {name} counters", f"# TYPE {metric} counter"]
+        lines += [f"{metric}{_labels((('result', k),))} {v}" for k, v in sorted(values.items())]
+    return "\n".join(lines) + "\n"
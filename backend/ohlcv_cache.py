@@ -0,0 +1,162 @@
+# backend/ohlcv_cache.py
+# (ticker, interval) 단위 OHLCV 디스크 캐시 (Parquet)
+# - 주기별 TTL 안에서는 파일만 읽어서 반환
+# - TTL 이 지나면 마지막 캐시 시점 이후 봉만 받아서 이어붙임 (증분 갱신)
+# - 앞단에 메모리 저장소(BarStore)를 둠: 읽은/저장한 데이터는 압축 열 배열로 보관하고 다음부터 파일을 읽지 않음
+#   (반환하는 DataFrame 은 읽기 전용 뷰 -> 값을 바꿀 땐 호출부에서 복사)
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from bar_store import BarStore
+
+CACHE_DIR = os.getenv("OHLCV_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ohlcv"))
+
+# 주기별 TTL (초) - 짧은 봉일수록 자주 갱신
+INTERVAL_TTL = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 300, "30m": 600,
+    "60m": 900, "90m": 900, "1h": 900,
+    "1d": 30 * 60, "5d": 3 * 3600, "1wk": 3 * 3600, "1mo": 12 * 3600, "3mo": 24 * 3600,
+}
+DEFAULT_TTL = 30 * 60
+
+# 수정주가(auto_adjust)는 배당/분할 때 과거 봉까지 바뀌므로 하루 한 번은 전체를 다시 받음
+FULL_REFRESH_SEC = 24 * 3600
+
+# 증분으로 받은 봉과 캐시의 겹치는 봉 종가가 이 비율 이상 다르면 수정주가 변경으로 보고 전체 재수집
+ADJUST_TOLERANCE = 0.005
+
+PERIOD_DAYS = {"5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827}
+
+
+class OHLCVCache:
+    def __init__(self, fetch, cache_dir=CACHE_DIR, memory=None):
+        # fetch(ticker, interval, period=None, start=None) -> DataFrame
+        self.fetch = fetch
+        self.cache_dir = cache_dir
+        self.memory = memory if memory is not None else BarStore()
+        self.stats = {"hit": 0, "miss": 0, "incremental": 0, "full": 0, "stale": 0}
+        self._locks = {}   # (ticker, interval) -> [Lock, 사용 중인 요청 수]
+        self._locks_guard = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self, key):
+        # 키별 잠금 - 쓰는 요청이 없어지면 바로 지움 (요청된 적 있는 모든 종목/주기만큼 잠금이 쌓이지 않게)
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]: yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0: del self._locks[key]
+
+    def _path(self, ticker, interval):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        base = os.path.join(self.cache_dir, f"{safe}_{interval}")
+        return base + ".parquet", base + ".json"
+
+    def _load(self, ticker, interval):
+        bars = self.memory.get((ticker, interval))
+        if bars is not None: return bars.frame(), bars.meta
+
+        data_path, meta_path = self._path(ticker, interval)
+        try:
+            with open(meta_path) as f: meta = json.load(f)
+            df = pd.read_parquet(data_path)
+        except Exception:
+            return None, None
+        bars = self.memory.put((ticker, interval), df, meta)
+        return (bars.frame() if bars is not None else df), meta
+
+    def _save(self, ticker, interval, df, meta):
+        data_path, meta_path = self._path(ticker, interval)
+        # 다른 요청이 읽는 중에도 깨진 파일이 보이지 않도록 임시 파일에 쓴 뒤 교체
+        df.to_parquet(data_path + ".tmp")
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path + ".tmp", "w") as f: json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        # 메모리에 담긴 경우 그 뷰를 반환 -> 처음 받은 요청과 이후 캐시 적중 요청이 같은 형태의 데이터를 받음
+        bars = self.memory.put((ticker, interval), df, meta)
+        return bars.frame() if bars is not None else df
+
+    def _trim(self, df, period):
+        days = PERIOD_DAYS.get(period)
+        if not days or df.empty: return df
+        cutoff = pd.Timestamp.now(tz=df.index.tz) - pd.Timedelta(days=days)
+        return df[df.index >= cutoff]
+
+    def _merge(self, ticker, interval, cached):
+        # 마지막 2개 봉부터 다시 받음: 마지막 봉은 미완성일 수 있어 덮어쓰고, 그 앞 봉으로 수정주가 변경 여부 확인
+        start = cached.index[-2] if len(cached) >= 2 else cached.index[-1]
+        new = self.fetch(ticker, interval, start=start)
+        if new is None or new.empty: return cached
+
+        if start in new.index:
+            old_c = float(cached.loc[start, "Close"]); new_c = float(new.loc[start, "Close"])
+            if old_c and abs(new_c - old_c) / abs(old_c) > ADJUST_TOLERANCE:
+                return None
+
+        return pd.concat([cached[cached.index < new.index[0]], new])
+
+    def peek(self, ticker, interval, period):
+        # TTL 안의 캐시만 반환 (없으면 None, 다운로드하지 않음) - 일괄 다운로드 전 선별용
+        # 적중/미적중 모두 집계 (미적중은 호출부가 일괄 다운로드 후 put)
+        cached, meta = self._load(ticker, interval)
+        fresh = (cached is not None and not cached.empty and meta.get("period") == period
+                 and time.time() - meta["fetched_at"] < INTERVAL_TTL.get(interval, DEFAULT_TTL))
+        self.stats["hit" if fresh else "miss"] += 1
+        return cached if fresh else None
+
+    def put(self, ticker, interval, period, df):
+        # 외부에서 받은 전체 구간 데이터를 그대로 저장 (예: 멀티 티커 일괄 다운로드) -> 캐시에 담긴 형태로 반환
+        if df is None or df.empty: return df
+        now = time.time()
+        with self._locked((ticker, interval)):
+            self.stats["full"] += 1
+            return self._save(ticker, interval, df, {"period": period, "fetched_at": now, "full_at": now})
+
+    def get(self, ticker, interval, period):
+        with self._locked((ticker, interval)):
+            cached, meta = self._load(ticker, interval)
+            now = time.time()
+
+            if cached is not None and meta.get("period") == period and not cached.empty:
+                if now - meta["fetched_at"] < INTERVAL_TTL.get(interval, DEFAULT_TTL):
+                    self.stats["hit"] += 1
+                    return cached
+
+                if now - meta["full_at"] < FULL_REFRESH_SEC:
+                    try:
+                        merged = self._merge(ticker, interval, cached)
+                    except Exception as e:
+                        # 갱신 실패 시 오래된 캐시라도 반환
+                        print(f"OHLCV 증분 갱신 실패 ({ticker} {interval}): {e}")
+                        self.stats["stale"] += 1
+                        return cached
+
+                    if merged is not None:
+                        self.stats["incremental"] += 1
+                        merged = self._trim(merged, period)
+                        return self._save(ticker, interval, merged, {**meta, "fetched_at": now})
+
+            self.stats["miss"] += 1
+            try:
+                df = self.fetch(ticker, interval, period=period)
+            except Exception:
+                if cached is not None and not cached.empty:
+                    self.stats["stale"] += 1
+                    return cached
+                raise
+
+            if df is not None and not df.empty:
+                self.stats["full"] += 1
+                df = self._save(ticker, interval, df, {"period": period, "fetched_at": now, "full_at": now})
+            return df
@@ -0,0 +1,77 @@
+# backend/profiler.py
+# 요청 단위 샘플링 프로파일러 (opt-in)
+# - PROFILE_TOKEN 환경변수가 설정된 서버에서 같은 값의 x-profile 헤더를 보낸 요청만 프로파일링
+# - 요청을 처리하는 스레드(엔드포인트 + 업스트림 호출 스레드)의 스택을 주기적으로 샘플링
+#   -> timing.stage 안에 있는 동안만 해당 스레드를 샘플 대상으로 등록
+#   이벤트 루프 스레드의 단계(KIS/Gemini 대기 등 async 구간)는 다른 요청의 프레임이 섞이므로 등록하지 않음
+#   (실행기로 넘긴 블로킹 작업과 동기 엔드포인트 스레드만 샘플링)
+# - 결과는 collapsed stack 형식 (flamegraph.pl / speedscope 에 바로 입력 가능)
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+MAX_PROFILES = 32
+MAX_DEPTH = 64
+
+PROFILES = OrderedDict()   # profile_id -> collapsed stack 텍스트 (최근 MAX_PROFILES 개)
+_LOCK = threading.Lock()
+
+
+def enabled(token):
+    return bool(PROFILE_TOKEN) and token == PROFILE_TOKEN
+
+
+class Session:
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:16]
+        self.threads = Counter()   # thread id -> 진행 중인 stage 수
+        self.stacks = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name=f"profile-{self.id}", daemon=True)
+
+    def enter(self):
+        with self._lock: self.threads[threading.get_ident()] += 1
+
+    def exit(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads[ident] -= 1
+            if self.threads[ident] <= 0: del self.threads[ident]
+
+    def _loop(self):
+        while not self._stop.wait(INTERVAL):
+            with self._lock: idents = list(self.threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None: continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        text = "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+        with _LOCK:
+            PROFILES[self.id] = text
+            while len(PROFILES) > MAX_PROFILES: PROFILES.popitem(last=False)
+        return self.id
+
+
+def get(profile_id):
+    with _LOCK: return PROFILES.get(profile_id)
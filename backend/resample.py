@@ -0,0 +1,65 @@
+# backend/resample.py
+# 상위 주기 봉을 하위 주기 봉에서 직접 만듦 (업스트림 다운로드 횟수 감소 + 주기 간 값 일치)
+# - 주봉/월봉 <- 일봉, 90분/30분/15분/5분봉 <- 더 짧은 분봉, 1h <- 60m (같은 봉)
+# - 거래소 시간대 기준으로 집계: 주봉은 월요일 시작(W-MON, 왼쪽 라벨), 분봉은 장 시작 시각 기준으로 구간을 자름
+#   (KRX 09:00 KST, 미국 09:30 ET) -> yfinance 가 주는 봉 경계와 같음
+# - 휴장일/장외 시간 구간은 봉이 없으므로 빈 구간은 버림
+import pandas as pd
+
+# 목표 주기 -> (원천 주기, pandas 규칙)
+SOURCES = {
+    "1wk": ("1d", "W-MON"),
+    "1mo": ("1d", "MS"),
+    "1h": ("60m", None),
+    "90m": ("30m", "90min"),
+    "30m": ("15m", "30min"),
+    "15m": ("5m", "15min"),
+    "5m": ("1m", "5min"),
+}
+
+# 거래소별 (시간대, 장 시작 시각)
+SESSIONS = {"KRX": ("Asia/Seoul", pd.Timedelta(hours=9)), "US": ("America/New_York", pd.Timedelta(hours=9, minutes=30))}
+
+AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# yfinance 조회 기간 길이 (원천 기간이 목표 기간을 덮어야 파생 가능)
+PERIOD_ORDER = ["5d", "1mo", "3mo", "6mo", "1y", "2y", "5y"]
+
+
+def session(ticker):
+    return SESSIONS["KRX"] if ticker.endswith((".KS", ".KQ")) else SESSIONS["US"]
+
+
+def plan_intervals(intervals, period_of):
+    # (다운로드할 주기 목록, {파생 주기: 원천 주기}) - 원천을 어차피 받는 경우에만 파생
+    wanted = set(intervals)
+    candidates = {}
+    for iv in intervals:
+        src = SOURCES.get(iv)
+        if not src or src[0] not in wanted: continue
+        if PERIOD_ORDER.index(period_of(src[0])) >= PERIOD_ORDER.index(period_of(iv)):
+            candidates[iv] = src[0]
+    # 원천 자체가 파생 대상이면 그 주기는 그냥 받음 (파생의 파생은 만들지 않음)
+    derived = {iv: src for iv, src in candidates.items() if src not in candidates}
+    return [iv for iv in intervals if iv not in derived], derived
+
+
+def aggregate(df, interval, ticker):
+    rule = SOURCES[interval][1]
+    if rule is None: return df
+    tz, open_at = session(ticker)
+    index = df.index.tz_localize(tz) if df.index.tz is None else df.index.tz_convert(tz)
+    frame = df.set_axis(index)
+
+    if rule.endswith("min"):
+        # 하루 길이를 나누어떨어지는 분봉만 지원 -> 매일 같은 시각에 구간이 시작
+        bins = frame.resample(rule, label="left", closed="left", origin="start_day", offset=open_at)
+    else:
+        bins = frame.resample(rule, label="left", closed="left")
+    out = bins.agg({c: AGG[c] for c in frame.columns if c in AGG})
+    return out.dropna(subset=["Close"])
+
+
+def derive_frames(frames, derived, ticker):
+    # {파생 주기: DataFrame} - 원천이 없으면 건너뜀
+    return {iv: aggregate(frames[src], iv, ticker) for iv, src in derived.items() if src in frames}
@@ -0,0 +1,221 @@
+# backend/scoring.py
+# 점수 산출 엔진 (벡터화)
+# - 기존 analyze_stock 의 마지막 봉 채점 로직(MA 이격도, RSI, Stoch, MACD, %B)을
+#   모든 봉에 대해 NumPy 배열 연산 한 번으로 계산
+# - 마지막 봉 결과는 기존 /analyze 응답과 동일 (점수/사유 순서/표시 문자열)
+# - 스크리닝, 백테스트, 점수 히스토리 차트에서 공용으로 사용
+import numpy as np
+import pandas as pd
+
+import indicators
+from bar_store import trim_float
+from startup import lazy_import
+
+# 결측 데이터 fallback 에서만 쓰므로 처음 필요할 때 임포트
+ta = lazy_import("pandas_ta")
+
+DEFAULT_WEIGHTS = {"ma": 1.5, "rsi": 1.0, "macd": 1.0, "stoch": 0.5, "bb": 1.0}
+
+# 가중합 순서 - 기존 add_sc 호출 순서와 같아야 부동소수 합계가 동일
+COMPONENTS = ("ma", "rsi", "stoch", "macd", "bb")
+
+INDICATOR_KEYS = ("close", "sma5", "sma20", "sma60", "rsi", "stoch_k", "stoch_d", "macd", "macd_signal", "bb_lower", "bb_upper", "obv")
+
+
+def compute_indicators(df):
+    # 채점에 필요한 지표를 float64 배열 dict 로 반환 (데이터가 부족하면 NaN, ATR 포함 - 두 경로 모두 indicators.KEYS 전부)
+    # 결측 봉이 섞여 있으면 pandas 의 NaN 처리 규칙을 그대로 따르도록 pandas_ta 경로 사용
+    cols = [df[c].to_numpy(dtype=float) for c in ('High', 'Low', 'Close', 'Volume')]
+    if not all(np.isfinite(c).all() for c in cols): return compute_indicators_ta(df)
+    return indicators.compute(*cols)
+
+
+def compute_indicators_ta(df):
+    # pandas_ta 로 지표별 계산 (결측 데이터 fallback, bench_indicators.py 의 기준값)
+    n = len(df)
+    close, high, low, volume = df['Close'], df['High'], df['Low'], df['Volume']
+
+    def col(res, i=None):
+        if res is None: return np.full(n, np.nan)
+        if i is not None: res = res.iloc[:, i]
+        return res.to_numpy(dtype=float)
+
+    stoch = ta.stoch(high, low, close, k=14, d=3)
+    macd = ta.macd(close, fast=12, slow=26, signal=9)
+    bb = ta.bbands(close, length=20, std=2.0)
+    return {
+        "close": close.to_numpy(dtype=float),
+        "sma5": col(ta.sma(close, length=5)),
+        "sma20": col(ta.sma(close, length=20)),
+        "sma60": col(ta.sma(close, length=60)),
+        "rsi": col(ta.rsi(close, length=14)),
+        "stoch_k": col(stoch, 0), "stoch_d": col(stoch, 1),
+        "macd": col(macd, 0), "macd_signal": col(macd, 2),
+        "bb_lower": col(bb, 0), "bb_upper": col(bb, 2),
+        "obv": col(ta.obv(close, volume)),
+        "atr": col(ta.atr(high, low, close, length=14)),
+    }
+
+
+def _prev(a):
+    return np.concatenate(([np.nan], a[:-1]))
+
+
+def score_indicators(ind, weights):
+    # 봉별 구성요소 점수/유효 여부/시그널 플래그와 최종 점수 계산
+    c = ind["close"]; pc = _prev(c)
+    sma5, sma20, sma60 = ind["sma5"], ind["sma20"], ind["sma60"]
+    k, d = ind["stoch_k"], ind["stoch_d"]; pk, pd_ = _prev(k), _prev(d)
+    m, s = ind["macd"], ind["macd_signal"]; pm, ps = _prev(m), _prev(s)
+    l, u = ind["bb_lower"], ind["bb_upper"]
+    n = len(c)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 1. MA - 20일선 이격도 (60일선이 없을 만큼 짧으면 중립 50점)
+        disparity = c / sma20 * 100
+        ma_band = (disparity >= 95) & (disparity <= 103)
+        ma_golden = ma_band & (_prev(sma5) < _prev(sma20)) & (sma5 > sma20)
+        ma_hot = disparity >= 110
+        ma_low = disparity <= 90
+        ma_ready = ~np.isnan(sma60)
+        ma = np.full(n, 50.0)
+        ma[ma_band] = 90; ma[ma_golden] = 100; ma[ma_hot] = 20; ma[ma_low] = 40
+        ma[~ma_ready] = 50
+
+        # 2. RSI - 100 - RSI
+        rsi = ind["rsi"]
+        rsi_score = 100 - rsi
+
+        # 3. Stoch - 100 - K, 과매도 골든크로스 100 / 과매수 데드크로스 0, 상승 다이버전스 +20
+        st_golden = (k <= 20) & (pk < pd_) & (k > d)
+        st_dead = ~st_golden & (k >= 80) & (pk > pd_) & (k < d)
+        st_div = (c < pc) & (k > pk)
+        st = 100 - k
+        st[st_golden] = 100; st[st_dead] = 0
+        st = np.clip(st + np.where(st_div, 20, 0), 0, 100)
+
+        # 4. MACD - 0선 아래 골든크로스 100 / 상승 80 / 하락 20, 0선 위 상승 60 / 하락 0
+        below = (m < 0) & (s < 0)
+        above = ~below & (m > 0)
+        mc_golden = below & (pm < ps) & (m > s)
+        mc_rising = below & ~mc_golden & (m > s)
+        mc = np.full(n, 50.0)
+        mc[below] = 20; mc[mc_rising] = 80; mc[mc_golden] = 100
+        mc[above] = 0; mc[above & (m > s)] = 60
+
+        # 5. BB - (1 - %B) * 100
+        width = u - l
+        pb = np.where(width != 0, (c - l) / width, 0.5)
+        bb = np.clip((1 - pb) * 100, 0, 100)
+
+    scores = {"ma": ma, "rsi": rsi_score, "stoch": st, "macd": mc, "bb": bb}
+    valid = {
+        "ma": np.ones(n, dtype=bool),
+        "rsi": ~np.isnan(rsi),
+        "stoch": ~(np.isnan(k) | np.isnan(d) | np.isnan(pk) | np.isnan(pd_) | np.isnan(pc)),
+        "macd": ~(np.isnan(m) | np.isnan(s) | np.isnan(pm) | np.isnan(ps)),
+        "bb": ~(np.isnan(l) | np.isnan(u)),
+    }
+
+    ws_sum = np.zeros(n); tot_w = np.zeros(n)
+    for comp in COMPONENTS:
+        w = weights[comp]
+        ws_sum = np.where(valid[comp], ws_sum + scores[comp] * w, ws_sum)
+        tot_w = np.where(valid[comp], tot_w + 100 * w, tot_w)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = (ws_sum / tot_w) * 100
+        final = np.where((tot_w > 0) & np.isfinite(pct), np.trunc(pct), 50).astype(int)
+
+    flags = {
+        "ma_band": ma_band & ma_ready & ~ma_golden, "ma_golden": ma_golden & ma_ready,
+        "ma_hot": ma_hot & ma_ready, "ma_low": ma_low & ma_ready,
+        "rsi_oversold": rsi <= 30, "rsi_overbought": rsi >= 70,
+        "stoch_golden": st_golden, "stoch_dead": st_dead, "stoch_divergence": st_div,
+        "macd_golden": mc_golden, "macd_rising": mc_rising,
+        "bb_lower": pb < 0.1, "bb_upper": pb > 0.9,
+    }
+    for key in ("rsi", "stoch", "macd", "bb"):
+        for f in [f for f in flags if f.startswith(key)]: flags[f] = flags[f] & valid[key]
+
+    return {"score": final, "scores": scores, "valid": valid, "flags": flags, "disparity": disparity, "pb": pb}
+
+
+def score_history(df, weights=DEFAULT_WEIGHTS):
+    # 모든 봉의 점수/구성요소 점수/시그널 플래그를 DataFrame 으로 반환
+    res = score_indicators(compute_indicators(df), weights)
+    cols = {"score": res["score"]}
+    for comp in COMPONENTS:
+        cols[f"{comp}_score"] = np.where(res["valid"][comp], res["scores"][comp], np.nan)
+    cols.update(res["flags"])
+    return pd.DataFrame(cols, index=df.index)
+
+
+# 시그널 -> 사유 문구 (기존 응답과 같은 순서)
+REASON_TEXT = [
+    ("ma_golden", ["★ 골든크로스 발생", "이평선 골든크로스"]),
+    ("ma_band", ["이평선 지지/눌림목"]),
+    ("ma_hot", ["단기 과열 (이격 과대)"]),
+    ("ma_low", ["역배열 하락세"]),
+    ("rsi_oversold", ["RSI 과매도"]),
+    ("rsi_overbought", ["RSI 과매수"]),
+    ("stoch_golden", ["Stoch 과매도 골든크로스"]),
+    ("stoch_dead", ["Stoch 과매수 데드크로스"]),
+    ("stoch_divergence", ["상승 다이버전스 감지"]),
+    ("macd_golden", ["★ MACD 바닥권 반등", "바닥권 추세 전환 (MACD Golden)"]),
+    ("macd_rising", ["바닥권 상승 시도"]),
+    ("bb_lower", ["볼린저 하단"]),
+    ("bb_upper", ["볼린저 상단"]),
+]
+
+
+def latest_result(ind, weights):
+    # 마지막 봉 기준 (final_score, reasons, indicators) - /analyze 응답 형식
+    res = score_indicators(ind, weights)
+    flags, valid = res["flags"], res["valid"]
+    reasons = [text for flag, texts in REASON_TEXT if flags[flag][-1] for text in texts]
+
+    indicators = {}
+    disparity = res["disparity"][-1]
+    indicators["MA_Pos"] = f"이격도 {int(disparity)}%" if not np.isnan(ind["sma60"][-1]) and not np.isnan(disparity) else "계산중"
+    indicators["RSI"] = f"{ind['rsi'][-1]:.2f}" if valid["rsi"][-1] else "-"
+    indicators["Stoch"] = f"K{ind['stoch_k'][-1]:.1f}/D{ind['stoch_d'][-1]:.1f}" if valid["stoch"][-1] else "-"
+    indicators["MACD"] = f"{ind['macd'][-1]:.2f}" if valid["macd"][-1] else "-"
+    indicators["BB"] = f"위치 {int(res['pb'][-1] * 100)}%" if valid["bb"][-1] else "-"
+    indicators["OBV"] = f"{ind['obv'][-1]:,.0f}" if not np.isnan(ind["obv"][-1]) else "-"
+
+    return int(res["score"][-1]), reasons, indicators
+
+
+def latest_values(ind):
+    # 마지막 봉 지표 원값 (compact 응답용, 계산 전이면 None, float32 가격에서 온 자릿수는 버림)
+    last = {k: float(ind[k][-1]) for k in INDICATOR_KEYS}
+    return {k: trim_float(v) if np.isfinite(v) else None for k, v in last.items()}
+
+
+# 주봉/일봉 20선 대비 현재가 위치 -> 추세 상태 (/analyze, 전 종목 스냅샷 공용)
+TREND_STATES = {
+    (True, True): {"msg": "🚀 대세 상승", "color": "red", "weekly": "상승", "daily": "상승"},
+    (True, False): {"msg": "🌊 눌림목", "color": "blue", "weekly": "상승", "daily": "하락"},
+    (False, True): {"msg": "⚠️ 반등", "color": "yellow", "weekly": "하락", "daily": "상승"},
+    (False, False): {"msg": "📉 하락", "color": "gray", "weekly": "하락", "daily": "하락"},
+}
+TREND_UNKNOWN = {"msg": "-", "color": "gray", "weekly": "-", "daily": "-"}
+
+
+def trend_status(last_price, ma20_d, weekly_close):
+    # weekly_close: 주봉 종가 (없으면 None)
+    if weekly_close is None: return dict(TREND_UNKNOWN)
+    if np.isnan(ma20_d): ma20_d = last_price
+    ma20_w = indicators.sma(weekly_close, 20)[-1] if len(weekly_close) > 20 else last_price
+    return dict(TREND_STATES[(bool(last_price > ma20_w), bool(last_price > ma20_d))])
+
+
+def support_resistance(df, last_price, ma20_last):
+    # (지지선, 저항선, 위치 %) - 0% 에 가까울수록 지지선(바닥), 100% 에 가까울수록 저항선(천장) 근처
+    # 지지선: 최근 20봉 최저가 (깨지면 손절 라인)
+    # 저항선: 현재가가 20선 아래(역배열)면 20선, 위(정배열)면 최근 20봉 최고가
+    recent_low = df['Low'].tail(20).min()
+    ma20_val = ma20_last if not np.isnan(ma20_last) else df['Close'].mean()
+    resistance = ma20_val if last_price < ma20_val else df['High'].tail(20).max()
+    position = (last_price - recent_low) / (resistance - recent_low) * 100
+    return recent_low, resistance, int(position)
@@ -0,0 +1,70 @@
+# backend/search_index.py
+# KIS 종목 마스터 기반 검색 인덱스 (자동완성용)
+# - 정렬된 키 배열 + 이분 탐색으로 접두어 검색
+# - 1/2-gram 역색인으로 한글 부분 일치 검색 ("전자" -> 삼성전자, LG전자 ...)
+import bisect
+
+# 접두어 후보가 너무 많을 때(예: "삼") 정렬 비용을 제한
+MAX_PREFIX_CANDIDATES = 300
+
+RANK_LABEL = {0: "exact", 1: "prefix", 2: "partial"}
+
+
+def normalize(text):
+    return text.strip().upper().replace(" ", "")
+
+
+def _grams(key, n):
+    return {key[j:j + n] for j in range(len(key) - n + 1)}
+
+
+class TickerSearchIndex:
+    def __init__(self, code_to_name):
+        self.entries = [(normalize(name), code, name) for code, name in code_to_name.items()]
+
+        by_name = sorted((key, i) for i, (key, _, _) in enumerate(self.entries))
+        by_code = sorted((code, i) for i, (_, code, _) in enumerate(self.entries))
+        self.name_keys = [k for k, _ in by_name]; self.name_ids = [i for _, i in by_name]
+        self.code_keys = [k for k, _ in by_code]; self.code_ids = [i for _, i in by_code]
+
+        self.grams = {}
+        for i, (key, _, _) in enumerate(self.entries):
+            for g in _grams(key, 1) | _grams(key, 2):
+                self.grams.setdefault(g, set()).add(i)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix(self, keys, ids, q):
+        lo = bisect.bisect_left(keys, q)
+        hi = bisect.bisect_left(keys, q + "\uffff", lo)
+        return ids[lo:min(hi, lo + MAX_PREFIX_CANDIDATES)]
+
+    def _partial(self, q):
+        n = 2 if len(q) >= 2 else 1
+        postings = [self.grams.get(g) for g in _grams(q, n)]
+        if not postings or any(p is None for p in postings): return set()
+        postings.sort(key=len)
+        hits = set(postings[0]).intersection(*postings[1:])
+        # n-gram 교집합은 후보일 뿐이므로 실제 포함 여부를 확인
+        return {i for i in hits if q in self.entries[i][0]}
+
+    def search(self, query, limit=10):
+        q = normalize(query)
+        if not q: return []
+
+        ranks = {}
+        def mark(ids, rank):
+            for i in ids:
+                if ranks.get(i, 9) > rank: ranks[i] = rank
+
+        mark(self._partial(q), 2)
+        mark(self._prefix(self.name_keys, self.name_ids, q), 1)
+        if q.isdigit(): mark(self._prefix(self.code_keys, self.code_ids, q), 1)
+        mark([i for i in ranks if self.entries[i][0] == q or self.entries[i][1] == q], 0)
+
+        best = sorted(ranks, key=lambda i: (ranks[i], len(self.entries[i][0]), self.entries[i][0]))[:limit]
+        return [
+            {"code": self.entries[i][1], "name": self.entries[i][2], "ticker": f"{self.entries[i][1]}.KS", "match": RANK_LABEL[ranks[i]]}
+            for i in best
+        ]
@@ -0,0 +1,68 @@
+# backend/shared_cache.py
+# 요청 간 공유 캐시 (TTL + LRU) + 단일 비행(single-flight)
+# - 같은 키를 동시에 요청하면 업스트림 호출은 1번만 하고 나머지는 그 결과를 같이 받음
+# - VIX, yfinance .info(애널리스트 목표가/상장주식수) 등 여러 요청이 똑같이 쓰는 데이터용
+# - 기다리는 쪽은 최대 wait 초만 기다림 (먼저 간 호출이 멈춰도 뒤따른 스레드가 모두 묶이지 않게) -> TimeoutError
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+
+class SharedCache:
+    def __init__(self, name, ttl, maxsize=1024, wait=None):
+        self.name = name; self.ttl = ttl; self.maxsize = maxsize; self.wait = wait
+        self._data = OrderedDict()   # key -> (expire, value)
+        self._inflight = {}          # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0; self.misses = 0; self.coalesced = 0; self.errors = 0; self.timeouts = 0
+
+    def get_or_load(self, key, fn, *args):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        # 이미 같은 키를 가져오는 중이면 그 결과를 기다림
+        if not leader:
+            try:
+                return future.result(timeout=self.wait)
+            except FutureTimeout:
+                with self._lock: self.timeouts += 1
+                raise TimeoutError(f"{self.name} 조회 대기 시간 초과 ({self.wait}s)") from None
+
+        try:
+            value = fn(*args)
+        except BaseException as e:
+            # 실패는 캐시하지 않음 (다음 요청에서 다시 시도)
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize: self._data.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data), "hits": self.hits, "misses": self.misses,
+            "coalesced": self.coalesced, "errors": self.errors, "timeouts": self.timeouts,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,244 @@
+# backend/snapshot.py
+# 전 종목 점수 스냅샷 (KIS 마스터 CODE_TO_NAME 전체, 일봉 기본 가중치)
+# - 평일 장중 SNAPSHOT_INTRADAY_MIN 분마다 + 장 마감 후(16:10 KST, 일봉 확정 뒤) 1회 실행
+# - 다운로드는 서버 프로세스에서 (OHLCV 캐시 공유), 채점은 프로세스 풀에서 종목 묶음 단위로
+#   -> 다음 묶음을 받는 동안 앞 묶음 채점이 다른 코어에서 진행
+# - 결과는 버전(생성 시각)별 JSON 파일로 남기고 최신 버전을 메모리에 올림 -> /rank, /analyze 는 조회만 함
+# - 휴장일은 따로 거르지 않음 (같은 일봉으로 다시 채점될 뿐)
+# - uvicorn 워커가 여럿이면 SNAPSHOT_DIR 의 잠금 파일(flock)을 잡은 한 프로세스만 스케줄러,
+#   나머지는 새 버전 파일을 읽어 오기만 함 (스케줄러 프로세스가 끝나면 잠금이 풀려 다른 워커가 이어받음)
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+try:
+    import fcntl
+except ImportError:   # Windows: 잠금 없이 프로세스마다 스케줄러 (단일 워커로 실행)
+    fcntl = None
+
+from bar_store import trim_float
+from indicators import atr
+from ohlcv_cache import INTERVAL_TTL
+from resample import aggregate
+from scoring import DEFAULT_WEIGHTS, compute_indicators, latest_result, latest_values, support_resistance, trend_status
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "snapshots"))
+ENABLED = os.getenv("UNIVERSE_SNAPSHOT", "1") != "0"
+WORKERS = int(os.getenv("SNAPSHOT_WORKERS", "0")) or os.cpu_count() or 1
+INTRADAY_MIN = int(os.getenv("SNAPSHOT_INTRADAY_MIN", "30"))   # 0 이면 장 마감 후에만
+# /analyze 가 스냅샷을 쓰는 최대 경과 시간 (초) - 일봉 캐시 TTL 과 같게 (직접 조회해도 이만큼은 오래된 봉일 수 있음)
+MAX_AGE = int(os.getenv("SNAPSHOT_MAX_AGE", str(INTERVAL_TTL["1d"])))
+KEEP = 8        # 보관할 버전 파일 수
+CHUNK = 100     # 다운로드/채점 묶음 크기
+LOCK_FILE = ".scheduler.lock"
+FOLLOW_POLL = 60            # 스케줄러가 아닌 워커가 새 버전 파일/잠금을 확인하는 간격 (초)
+UNIVERSE_RETRY = (5, 300)   # 종목 목록(KIS 마스터)이 아직 비어 있을 때 재시도 간격 (처음, 최대, 2배씩)
+
+KRX_TZ = ZoneInfo("Asia/Seoul")
+MARKET_OPEN = (9, 0)
+MARKET_CLOSE = (15, 30)
+CLOSE_RUN = (16, 10)
+
+
+def _num(x):
+    # JSON 에 NaN 을 쓰지 않도록 None 으로 (float32 가격에서 온 자릿수는 버림)
+    x = float(x)
+    return trim_float(x) if math.isfinite(x) else None
+
+
+# ---------------------------------------------------------
+# 채점 (프로세스 풀 워커에서 실행 -> 모듈 최상위 함수여야 pickle 가능)
+# ---------------------------------------------------------
+def score_entry(ticker, name, df):
+    ind = compute_indicators(df)
+    score, reasons, view = latest_result(ind, DEFAULT_WEIGHTS)
+    last_price = trim_float(df['Close'].iloc[-1]); ma20 = float(ind["sma20"][-1])
+
+    # /analyze 와 같은 규칙: 주봉은 일봉에서 집계, ATR 이 없으면 현재가/일봉 ATR 비율로 대신함
+    weekly = aggregate(df, "1wk", ticker)
+    atr_1d = float(atr(df['High'], df['Low'], df['Close'], 14)[-1]) if len(df) > 14 else last_price * 0.02
+    atr_1wk = float(atr(weekly['High'], weekly['Low'], weekly['Close'], 14)[-1]) if not weekly.empty else math.nan
+    if not math.isfinite(atr_1wk): atr_1wk = atr_1d * 2.5
+    try:
+        sr = [_num(v) for v in support_resistance(df, last_price, ma20)]
+    except Exception:
+        sr = None
+
+    return {
+        "ticker": ticker, "name": name, "price": last_price, "score": score, "reasons": reasons, "indicators": view,
+        "values": latest_values(ind), "trend_status": trend_status(last_price, ma20, weekly['Close'] if not weekly.empty else None),
+        "atr": {"1d": _num(atr_1d), "1wk": _num(atr_1wk)}, "sr": sr,
+        "volume": _num(df['Volume'].iloc[-1]), "bar": df.index[-1].isoformat(),
+    }
+
+
+def score_frames(frames, names):
+    entries = []
+    for ticker, df in frames.items():
+        if df is None or len(df) < 2: continue
+        try:
+            entries.append(score_entry(ticker, names.get(ticker, ticker), df))
+        except Exception as e:
+            print(f"Snapshot Score Error ({ticker}): {e}")
+    return entries
+
+
+def next_run(now, step=INTRADAY_MIN):
+    # now: KST 시각 -> 다음 실행 시각 (평일 장 시작 step 분 뒤부터 마감까지 step 분 간격 + 마감 후 1회)
+    for d in range(8):
+        day = (now + timedelta(days=d)).date()
+        if day.weekday() >= 5: continue
+        def at(h, m): return datetime(day.year, day.month, day.day, h, m, tzinfo=KRX_TZ)
+        slots = []
+        if step > 0:
+            t = at(*MARKET_OPEN) + timedelta(minutes=step)
+            while t <= at(*MARKET_CLOSE): slots.append(t); t += timedelta(minutes=step)
+        slots.append(at(*CLOSE_RUN))
+        for t in slots:
+            if t > now: return t
+
+
+class UniverseSnapshot:
+    def __init__(self, universe, load_frames, directory=SNAPSHOT_DIR, workers=WORKERS):
+        # universe() -> {ticker: 종목명}, load_frames(tickers) -> {ticker: 일봉 DataFrame}
+        self.universe = universe; self.load_frames = load_frames
+        self.directory = directory; self.workers = workers
+        self.current = None   # {"version", "created", "seconds", "count", "entries": {ticker: entry}, "ranked": [entry...]}
+        self.status = {"running": False, "last_error": None, "next_run": None, "role": None}
+        self._run_lock = threading.Lock()
+        self._lock_file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _files(self):
+        return sorted(f for f in os.listdir(self.directory) if f.startswith("universe-") and f.endswith(".json"))
+
+    def _activate(self, snap):
+        # 조회용 색인을 만든 뒤 한 번에 교체 (조회 중에 반쯤 바뀐 스냅샷이 보이지 않음)
+        ranked = sorted(snap["entries"], key=lambda e: (-e["score"], e["ticker"]))
+        self.current = {**{k: v for k, v in snap.items() if k != "entries"},
+                        "entries": {e["ticker"]: e for e in ranked}, "ranked": ranked}
+
+    def load_latest(self):
+        for name in reversed(self._files()):
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f: self._activate(json.load(f))
+                print(f"✅ 전 종목 스냅샷 로드 ({self.current['version']}, {self.current['count']}개 종목)")
+                return self.current
+            except Exception as e:
+                print(f"🚨 스냅샷 로드 실패 ({name}): {e}")
+        return None
+
+    def _publish(self, entries, started):
+        version = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(started))
+        snap = {"version": version, "created": started, "seconds": round(time.time() - started, 2),
+                "count": len(entries), "entries": entries}
+        path = os.path.join(self.directory, f"universe-{version}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f: json.dump(snap, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        for old in self._files()[:-KEEP]:
+            try: os.remove(os.path.join(self.directory, old))
+            except OSError: pass
+        self._activate(snap)
+
+    def run(self):
+        # 이미 실행 중이면 건너뜀 -> 생성한 스냅샷 (종목 목록이 비어 있으면 None)
+        if not self._run_lock.acquire(blocking=False): return None
+        self.status["running"] = True
+        try:
+            names = self.universe()
+            if not names: return None
+            started = time.time(); tickers = list(names)
+            entries = []; jobs = []
+            # spawn: 서버 프로세스의 스레드/잠금 상태를 물려받지 않음
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                for i in range(0, len(tickers), CHUNK):
+                    frames = self.load_frames(tickers[i:i + CHUNK])
+                    if frames: jobs.append(pool.submit(score_frames, frames, {t: names[t] for t in frames}))
+                for job in jobs: entries += job.result()
+            self._publish(entries, started)
+            print(f"✅ 전 종목 스냅샷 생성 ({self.current['version']}, {len(entries)}/{len(tickers)}개 종목, {self.current['seconds']}s)")
+            return self.current
+        finally:
+            self.status["running"] = False
+            self._run_lock.release()
+
+    def _safe_run(self):
+        try:
+            self.run(); self.status["last_error"] = None
+        except Exception as e:
+            self.status["last_error"] = str(e)
+            print(f"🚨 전 종목 스냅샷 실패: {e}")
+
+    def acquire_scheduler(self):
+        # 다른 프로세스가 스케줄러면 False (잠금은 이 프로세스가 끝날 때까지 유지)
+        if fcntl is None: return True
+        if self._lock_file is None: self._lock_file = open(os.path.join(self.directory, LOCK_FILE), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def refresh(self):
+        # 다른 워커가 만든 더 새 버전 파일이 있으면 읽어 옴
+        files = self._files()
+        if files and (self.current is None or files[-1] != f"universe-{self.current['version']}.json"): self.load_latest()
+
+    def _run_when_ready(self):
+        # 기동 직후에는 KIS 마스터를 받는 중이라 종목 목록이 비어 있을 수 있음 -> 다음 정기 실행까지 기다리지 않고 짧게 재시도
+        delay, cap = UNIVERSE_RETRY
+        while not self.universe():
+            self.status["next_run"] = (datetime.now(KRX_TZ) + timedelta(seconds=delay)).isoformat()
+            time.sleep(delay); delay = min(delay * 2, cap)
+        self._safe_run()
+
+    def _loop(self):
+        self.status["role"] = "follower"
+        while not self.acquire_scheduler():
+            time.sleep(FOLLOW_POLL)
+            self.refresh()
+        self.status["role"] = "scheduler"
+        self.refresh()
+
+        # 기동 시 최신 스냅샷이 없거나 오래됐으면 바로 한 번 실행
+        age = self.age()
+        if age is None or age > MAX_AGE: self._run_when_ready()
+        while True:
+            at = next_run(datetime.now(KRX_TZ))
+            self.status["next_run"] = at.isoformat()
+            time.sleep(max(0.0, (at - datetime.now(KRX_TZ)).total_seconds()))
+            self._run_when_ready()
+
+    def start(self):
+        self.load_latest()
+        if ENABLED: threading.Thread(target=self._loop, name="universe-snapshot", daemon=True).start()
+
+    def age(self):
+        return time.time() - self.current["created"] if self.current else None
+
+    def lookup(self, ticker, max_age=MAX_AGE):
+        # (버전, 종목 결과) - 스냅샷이 없거나 max_age 보다 오래됐거나 종목이 없으면 None
+        snap = self.current
+        if snap is None or time.time() - snap["created"] > max_age: return None
+        entry = snap["entries"].get(ticker)
+        return (snap["version"], entry) if entry else None
+
+    def rank(self, min_score=0, max_score=100, signal=None, trend=None, limit=50, offset=0):
+        # 점수 내림차순 목록에서 조건에 맞는 종목 (signal/trend 는 사유/추세 문구 부분 일치)
+        snap = self.current
+        rows = [e for e in snap["ranked"]
+                if min_score <= e["score"] <= max_score
+                and (not signal or any(signal in r for r in e["reasons"]))
+                and (not trend or trend in e["trend_status"]["msg"])]
+        return {"version": snap["version"], "created": snap["created"], "universe": snap["count"],
+                "total": len(rows), "items": rows[offset:offset + limit]}
+
+    def info(self):
+        snap = self.current
+        return {"version": snap["version"] if snap else None, "count": snap["count"] if snap else 0, "age": self.age(), **self.status}
@@ -0,0 +1,147 @@
+# backend/startup.py
+# 기동 시간 단축 + 기동/임포트 시간 보고
+# - 무거운 모듈(yfinance, pandas_ta)은 처음 쓰는 순간 임포트 (LAZY_IMPORTS=0 이면 즉시 임포트)
+# - 서버가 요청을 받기 시작한 뒤 백그라운드 스레드에서 미리 임포트해 둠 (warm-up)
+# - 단계별 기동 시간과 모듈별 임포트 시간을 기록 -> /startup, 기동 로그
+#
+# 임포트 시간 회귀 검사 (python -X importtime 으로 main 을 새 프로세스에서 임포트):
+#   python startup.py --save-baseline startup_base.json
+#   python startup.py --baseline startup_base.json --threshold 0.3
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+LAZY = os.getenv("LAZY_IMPORTS", "1") != "0"
+
+# 서버 기동 후 미리 임포트할 모듈
+WARM_MODULES = ("yfinance", "pandas_ta")
+
+_T0 = time.perf_counter()
+PHASES = {}     # 단계 -> 모듈 임포트 시작부터 걸린 시간 (초)
+IMPORTS = {}    # 지연 임포트한 모듈 -> 임포트 시간 (초)
+WARM = {"status": "idle", "seconds": None}
+
+
+def _process_age():
+    # 프로세스 시작부터 지금까지 (초) - /proc 이 없으면 None
+    try:
+        with open("/proc/self/stat") as f: start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f: uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+
+def mark(phase):
+    PHASES[phase] = round(time.perf_counter() - _T0, 4)
+
+
+def load(name):
+    # 동시 임포트는 파이썬 임포트 잠금이 직렬화 (먼저 시작한 쪽 시간만 기록됨)
+    module = sys.modules.get(name)
+    if module is not None: return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORTS.setdefault(name, round(time.perf_counter() - started, 4))
+    return module
+
+
+class LazyModule:
+    # 속성에 처음 접근할 때 실제 모듈을 임포트
+    def __init__(self, name):
+        self._name = name; self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None: self._module = load(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name) if LAZY else load(name)
+
+
+def _warm(names):
+    WARM["status"] = "running"
+    started = time.perf_counter()
+    for name in names:
+        try:
+            load(name)
+        except Exception as e:
+            print(f"🚨 warm-up 임포트 실패 ({name}): {e}")
+    WARM.update(status="done", seconds=round(time.perf_counter() - started, 4))
+    print(f"🔥 warm-up 완료 ({', '.join(f'{n} {IMPORTS.get(n, 0):.2f}s' for n in names)})")
+
+
+def warm_up(names=WARM_MODULES):
+    if not LAZY: return
+    threading.Thread(target=_warm, args=(names,), name="warm-up", daemon=True).start()
+
+
+def report():
+    return {
+        "mode": "lazy" if LAZY else "eager",
+        "process_age": _process_age(),
+        "phases": dict(PHASES), "imports": dict(IMPORTS), "warm_up": dict(WARM),
+    }
+
+
+# ---------------------------------------------------------
+# 임포트 시간 측정 (CLI)
+# ---------------------------------------------------------
+def measure_imports(lazy=True):
+    # 새 프로세스에서 main 을 임포트 -> (전체 시간, {최상위 모듈: 누적 임포트 시간})
+    env = {**os.environ, "LAZY_IMPORTS": "1" if lazy else "0"}
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0: raise RuntimeError(proc.stderr[-2000:])
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 들여쓰기가 없는 줄이 최상위 임포트
+        if not name.startswith("  "): modules[name.strip()] = int(cumulative) / 1e6
+    return wall, modules
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="main 임포트 시간 측정")
+    parser.add_argument("--eager", action="store_true", help="LAZY_IMPORTS=0 으로 측정")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    # 디스크 캐시 영향을 줄이려고 여러 번 재서 가장 빠른 값 사용
+    runs = [measure_imports(lazy=not args.eager) for _ in range(args.repeat)]
+    wall = min(r[0] for r in runs)
+    modules = {name: min(r[1].get(name, 0.0) for r in runs) for name in runs[0][1]}
+    total = sum(modules.values())
+
+    for name, sec in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{sec * 1000:9.1f} ms  {name}")
+    print(f"import total {total * 1000:.1f} ms, process wall {wall * 1000:.1f} ms ({'eager' if args.eager else 'lazy'})")
+    result = {"mode": "eager" if args.eager else "lazy", "import_total": total, "wall": wall, "modules": modules}
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f: json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f: base = json.load(f)
+        if total > base["import_total"] * (1 + args.threshold):
+            print(f"REGRESSION import total {base['import_total'] * 1000:.1f} ms -> {total * 1000:.1f} ms")
+            return 1
+        print(f"OK (threshold {args.threshold * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,240 @@
+# backend/streaming.py
+# 실시간 시세용 증분 지표 (봉 하나당 O(1))
+# - push(): 완성된 봉을 상태에 반영
+# - peek(): 진행 중인 마지막 봉 값으로 지표를 계산만 하고 상태는 그대로 둠
+#   -> 같은 봉에 시세가 여러 번 들어와도 과거 전체를 다시 계산하지 않음
+# - 정의는 pandas_ta 기본값과 동일 (EMA 는 SMA 시드, RSI/ATR 은 RMA, BB 는 모표준편차)
+import math
+import sys
+from collections import deque
+
+import numpy as np
+
+NAN = float("nan")
+
+
+class SMA:
+    def __init__(self, length):
+        self.n = length; self.q = deque(); self.sum = 0.0
+
+    def _sum_prev(self):
+        # 새 값과 합쳐질 직전 n-1 개의 합
+        return self.sum - self.q[0] if len(self.q) == self.n else self.sum
+
+    def peek(self, x):
+        if math.isnan(x) or len(self.q) < self.n - 1: return NAN
+        return (self._sum_prev() + x) / self.n
+
+    def push(self, x):
+        if math.isnan(x): return NAN
+        v = self.peek(x)
+        if len(self.q) == self.n: self.sum -= self.q.popleft()
+        self.q.append(x); self.sum += x
+        return v
+
+
+class EMA:
+    # 처음 n 개 평균으로 시작한 뒤 alpha = 2/(n+1) (pandas ewm adjust=False)
+    def __init__(self, length):
+        self.n = length; self.alpha = 2 / (length + 1); self.count = 0; self.seed = 0.0; self.value = NAN
+
+    def peek(self, x):
+        if math.isnan(x) or self.count < self.n - 1: return NAN
+        if self.count == self.n - 1: return (self.seed + x) / self.n
+        return (1 - self.alpha) * self.value + self.alpha * x
+
+    def push(self, x):
+        if math.isnan(x): return NAN
+        v = self.peek(x)
+        self.count += 1
+        if self.count < self.n: self.seed += x
+        else: self.value = v
+        return v
+
+
+class RMA:
+    # Wilder 평활 (pandas ewm alpha=1/n, adjust=True, min_periods=n)
+    def __init__(self, length):
+        self.n = length; self.decay = 1 - 1 / length; self.count = 0; self.num = 0.0; self.den = 0.0
+
+    def _next(self, x):
+        return x + self.decay * self.num, 1 + self.decay * self.den
+
+    def peek(self, x):
+        if math.isnan(x) or self.count < self.n - 1: return NAN
+        num, den = self._next(x)
+        return num / den
+
+    def push(self, x):
+        if math.isnan(x): return NAN
+        v = self.peek(x)
+        self.num, self.den = self._next(x); self.count += 1
+        return v
+
+
+class RollingExtreme:
+    # 단조 덱으로 최근 n 개의 최댓값(또는 최솟값)
+    def __init__(self, length, is_max):
+        self.n = length; self.is_max = is_max; self.q = deque(); self.t = 0
+
+    def _better(self, a, b):
+        return a >= b if self.is_max else a <= b
+
+    def peek(self, x):
+        if self.t < self.n - 1: return NAN
+        # 새 봉 기준 창은 [t-n+1, t] -> 덱 맨 앞 하나만 만료될 수 있음
+        front = None
+        for j in range(min(2, len(self.q))):
+            if self.q[j][0] > self.t - self.n:
+                front = self.q[j][1]; break
+        return x if front is None or self._better(x, front) else front
+
+    def push(self, x):
+        v = self.peek(x)
+        while self.q and self.q[0][0] <= self.t - self.n: self.q.popleft()
+        while self.q and self._better(x, self.q[-1][1]): self.q.pop()
+        self.q.append((self.t, x)); self.t += 1
+        return v
+
+
+class RSI:
+    def __init__(self, length=14):
+        self.up = RMA(length); self.down = RMA(length); self.prev = NAN
+
+    def _calc(self, up, down):
+        if math.isnan(up) or math.isnan(down): return NAN
+        return 100 * up / (up + abs(down)) if up + abs(down) else NAN
+
+    def peek(self, c):
+        diff = c - self.prev
+        return self._calc(self.up.peek(max(diff, 0.0)), self.down.peek(min(diff, 0.0))) if not math.isnan(diff) else NAN
+
+    def push(self, c):
+        diff = c - self.prev; self.prev = c
+        if math.isnan(diff): return NAN
+        return self._calc(self.up.push(max(diff, 0.0)), self.down.push(min(diff, 0.0)))
+
+
+class Stoch:
+    def __init__(self, k=14, d=3, smooth_k=3):
+        self.hh = RollingExtreme(k, True); self.ll = RollingExtreme(k, False)
+        self.k = SMA(smooth_k); self.d = SMA(d)
+
+    @staticmethod
+    def _raw(c, hh, ll):
+        rng = hh - ll
+        return 100 * (c - ll) / (rng if rng else sys.float_info.epsilon)
+
+    def peek(self, h, l, c):
+        k = self.k.peek(self._raw(c, self.hh.peek(h), self.ll.peek(l)))
+        return k, self.d.peek(k)
+
+    def push(self, h, l, c):
+        k = self.k.push(self._raw(c, self.hh.push(h), self.ll.push(l)))
+        return k, self.d.push(k)
+
+
+class MACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast); self.slow = EMA(slow); self.signal = EMA(signal)
+
+    def peek(self, c):
+        m = self.fast.peek(c) - self.slow.peek(c)
+        return m, self.signal.peek(m)
+
+    def push(self, c):
+        m = self.fast.push(c) - self.slow.push(c)
+        return m, self.signal.push(m)
+
+
+class BBands:
+    def __init__(self, length=20, std=2.0):
+        self.mid = SMA(length); self.sq = SMA(length); self.std = std
+
+    def _bands(self, mean, mean_sq):
+        if math.isnan(mean): return NAN, NAN
+        sd = math.sqrt(max(mean_sq - mean * mean, 0.0))
+        return mean - self.std * sd, mean + self.std * sd
+
+    def peek(self, c):
+        return self._bands(self.mid.peek(c), self.sq.peek(c * c))
+
+    def push(self, c):
+        return self._bands(self.mid.push(c), self.sq.push(c * c))
+
+
+class OBV:
+    def __init__(self):
+        self.value = 0.0; self.prev = NAN
+
+    def peek(self, c, v):
+        # 첫 봉은 상승으로 취급 (pandas_ta signed_series initial=1)
+        sign = 1.0 if math.isnan(self.prev) else float((c > self.prev) - (c < self.prev))
+        return self.value + sign * v
+
+    def push(self, c, v):
+        self.value = self.peek(c, v); self.prev = c
+        return self.value
+
+
+class ATR:
+    def __init__(self, length=14):
+        self.rma = RMA(length); self.prev = NAN
+
+    def _tr(self, h, l):
+        if math.isnan(self.prev): return NAN
+        return max(h - l, abs(h - self.prev), abs(l - self.prev))
+
+    def peek(self, h, l, c):
+        return self.rma.peek(self._tr(h, l))
+
+    def push(self, h, l, c):
+        v = self.rma.push(self._tr(h, l)); self.prev = c
+        return v
+
+
+class LiveIndicators:
+    # 과거 봉으로 시드한 뒤 마지막(진행 중) 봉만 시세로 갱신
+    # quote() 는 scoring.score_indicators 에 바로 넣을 수 있는 [직전 봉, 현재 봉] 2칸 배열 dict 반환
+    def __init__(self):
+        self.sma5 = SMA(5); self.sma20 = SMA(20); self.sma60 = SMA(60)
+        self.rsi = RSI(14); self.stoch = Stoch(14, 3, 3); self.macd = MACD(12, 26, 9)
+        self.bb = BBands(20, 2.0); self.obv = OBV(); self.atr = ATR(14)
+        self.last = None; self.length = 0; self.anchor = None
+
+    def _values(self, step, h, l, c, v):
+        k, d = step(self.stoch)(h, l, c)
+        m, s = step(self.macd)(c)
+        lower, upper = step(self.bb)(c)
+        return {
+            "close": c, "sma5": step(self.sma5)(c), "sma20": step(self.sma20)(c), "sma60": step(self.sma60)(c),
+            "rsi": step(self.rsi)(c), "stoch_k": k, "stoch_d": d, "macd": m, "macd_signal": s,
+            "bb_lower": lower, "bb_upper": upper, "obv": step(self.obv)(c, v), "atr": step(self.atr)(h, l, c),
+        }
+
+    def push(self, h, l, c, v):
+        self.last = self._values(lambda ind: ind.push, h, l, c, v)
+        self.length += 1
+        return self.last
+
+    def peek(self, h, l, c, v):
+        return self._values(lambda ind: ind.peek, h, l, c, v)
+
+    @classmethod
+    def seed(cls, df):
+        # 마지막 봉을 제외한 완성 봉으로 상태를 만듦
+        state = cls()
+        cols = [df[c].to_numpy(dtype=float) for c in ("High", "Low", "Close", "Volume")]
+        for h, l, c, v in zip(*(col[:-1].tolist() for col in cols)):
+            state.push(h, l, c, v)
+        state.anchor = (df.index[-2], cols[2][-2]) if len(df) >= 2 else None
+        return state
+
+    def matches(self, df):
+        # 완성 봉 구간이 그대로인지 (새 봉이 생기거나 수정주가로 과거가 바뀌면 다시 시드)
+        return len(df) == self.length + 1 and len(df) >= 2 and self.anchor == (df.index[-2], float(df['Close'].iloc[-2]))
+
+    def quote(self, h, l, c, v):
+        curr = self.peek(h, l, c, v)
+        prev = self.last or {k: NAN for k in curr}
+        return {k: np.array([prev[k], curr[k]], dtype=float) for k in curr}
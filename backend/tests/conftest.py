@@ -0,0 +1,26 @@
+# backend/tests/conftest.py
+# backend/ 모듈을 패키지 없이 바로 임포트 (서버와 같은 방식: backend 디렉터리에서 실행)
+# app_env: bench_analyze 의 대역(합성 시세, 가짜 KIS/Gemini)으로 띄운 main 앱 (네트워크 없음)
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 모듈 상수로 읽는 저장 위치는 테스트 모듈이 임포트되기 전에 임시 폴더로
+for _var in ("SNAPSHOT_DIR", "ADVISORY_DIR"):
+    os.environ[_var] = tempfile.mkdtemp(prefix=f"test-{_var.lower()}-")
+
+import bench_analyze  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app_env(tmp_path_factory):
+    fixtures = str(tmp_path_factory.mktemp("fixtures"))
+    bench_analyze.synth(fixtures, ["005930.KS", "AAPL"])
+    latency = {k: 0.0 for k in bench_analyze.DEFAULT_LATENCY}
+    s = bench_analyze.StandIns(bench_analyze.Fixtures(fixtures), latency)
+    main, advisory = bench_analyze.load_app(s, cold=False)
+    main.SNAPSHOT.current = None
+    return main, advisory, s
@@ -0,0 +1,59 @@
+# backend/tests/test_advisory.py
+# AI 코멘트 작업 - 다른 워커(프로세스)가 만든 작업을 작업 파일로 조회/재사용
+import asyncio
+import os
+
+import pytest
+
+import advisory
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    # 같은 ADVISORY_DIR 을 쓰는 워커 (JOBS 를 바꿔 끼우면 다른 프로세스처럼 보임)
+    monkeypatch.setattr(advisory, "ADVISORY_DIR", str(tmp_path))
+    monkeypatch.setattr(advisory, "JOBS", {})
+    monkeypatch.setattr(advisory, "POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(advisory, "_PURGED", 0.0)
+    seen = []
+
+    async def generate(api_key, model_name, prompt):
+        seen.append(model_name)
+        await asyncio.sleep(0.1)
+        return " 코멘트 "
+
+    monkeypatch.setattr(advisory.GEMINI, "generate", generate)
+    return seen
+
+
+def _submit():
+    return advisory.submit_advisory("key", "models/x", "삼성전자", "005930.KS", 70, ["RSI"], None, None)
+
+
+def test_other_worker_sees_pending_then_done(calls):
+    async def scenario():
+        job_id, _ = _submit()
+        mine, advisory.JOBS = advisory.JOBS, {}     # 이후는 다른 워커
+        pending = advisory.job_status(job_id)
+        again, _ = _submit()                        # 진행 중인 작업을 다시 호출하지 않음
+        polled = await advisory.get_advisory(job_id, wait=5)
+        advisory.JOBS = mine
+        return job_id, pending, again, polled
+
+    job_id, pending, again, polled = asyncio.run(scenario())
+    assert pending == "pending" and again == job_id
+    assert polled["status"] == "done" and polled["ai_message"] == "코멘트"
+    assert calls == ["models/x"]
+
+
+def test_unknown_stale_and_expired_jobs(calls):
+    assert asyncio.run(advisory.get_advisory("../../etc/passwd")) is None
+
+    job_id = "0" * 32
+    advisory._save(job_id, {"status": "pending", "ai_message": None, "created": 0})
+    assert advisory.job_status(job_id) is None      # 중단된 워커가 남긴 pending
+
+    old = advisory.time.time() - advisory.RESULT_TTL - 1
+    os.utime(advisory._path(job_id), (old, old))
+    advisory._purge(advisory.time.time())
+    assert not os.path.exists(advisory._path(job_id))
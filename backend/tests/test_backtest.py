@@ -0,0 +1,100 @@
+# backend/tests/test_backtest.py
+# 벡터화 백테스트 vs 봉 단위 반복 기준 구현 (거래 결과, 한 번에 한 포지션 가중치 조합 평가)
+import numpy as np
+import pytest
+
+import indicators
+from backtest import COMPONENTS, STRATEGIES, component_matrix, evaluate, run_backtest, trade_outcomes, weight_grid
+from bench_indicators import synthetic
+
+
+def _outcomes_loop(df, mult, horizon):
+    close, high, low = (df[c].to_numpy(dtype=float) for c in ("Close", "High", "Low"))
+    atr = indicators.atr(high, low, close, 14)
+    T = len(close)
+    ret = np.zeros(T); win = np.zeros(T, bool); valid = np.zeros(T, bool); exit_at = np.arange(T) + horizon
+    for i in range(T):
+        if not np.isfinite(atr[i]): continue
+        tp, sl = close[i] + atr[i] * mult, max(close[i] - atr[i] * mult, 0.0)
+        exit_px = None
+        for j in range(i + 1, min(i + horizon, T - 1) + 1):
+            if low[j] <= sl: exit_px = sl; exit_at[i] = j; break          # 같은 봉에서 둘 다 닿으면 SL
+            if high[j] >= tp: exit_px = tp; exit_at[i] = j; win[i] = True; break
+        if exit_px is None:
+            if i + horizon > T - 1: continue              # 만기 전에 데이터가 끝남
+            exit_px = close[i + horizon]
+        ret[i] = exit_px / close[i] - 1; valid[i] = True
+    return ret, win, valid, exit_at
+
+
+def _evaluate_loop(S, V, ret, win, valid, exit_at, w, entry_score):
+    trades = hits = free = 0; total = mdd = 0.0; equity = peak = 1.0
+    for t in range(len(S)):
+        tot = (V[t] * 100) @ w
+        score = np.trunc(S[t] @ w / tot * 100) if tot > 0 else 50
+        if score < entry_score or not valid[t] or t < free: continue
+        free = exit_at[t]
+        trades += 1; hits += bool(win[t]); total += ret[t]
+        equity *= 1 + ret[t]; peak = max(peak, equity); mdd = max(mdd, 1 - equity / peak)
+    n = max(trades, 1)
+    return trades, hits / n, total / n, mdd
+
+
+@pytest.mark.parametrize("strategy", ["scalp", "swing", "long"])
+def test_trade_outcomes_match_loop(strategy):
+    df = synthetic(300, "B", seed=3)
+    _, mult, horizon = STRATEGIES[strategy]
+    for got, want in zip(trade_outcomes(df, mult, horizon), _outcomes_loop(df, mult, horizon)):
+        np.testing.assert_allclose(got, want, rtol=1e-12)
+
+
+def test_open_trades_at_end_are_excluded():
+    df = synthetic(120, "B")
+    _, _, valid, _ = trade_outcomes(df, 100, 20)   # TP/SL 에 닿지 않는 배수 -> 전부 만기 청산
+    assert not valid[-20:].any() and valid[14:-20].all()
+
+
+def test_evaluate_matches_per_combination_loop():
+    df = synthetic(400, "B", seed=5)
+    S, V = component_matrix(df)
+    outcomes = trade_outcomes(df, 2, 20)
+    W = weight_grid([0, 1, 2])[::17]
+    trades, hit, avg, mdd = evaluate(S, V, *outcomes, W, 60)
+    for g, w in enumerate(W):
+        t, h, a, m = _evaluate_loop(S, V, *outcomes, w, 60)
+        assert trades[g] == t
+        np.testing.assert_allclose([hit[g], avg[g], mdd[g]], [h, a, m], rtol=1e-9, atol=1e-12)
+
+
+def test_run_backtest_sweep_ranks_by_average_return():
+    df = synthetic(400, "B", seed=7)
+    weights = {c: 1.0 for c in COMPONENTS}
+    result = run_backtest(df, "swing", weights, entry_score=60, grid_values=[0, 1], top=5)
+    top = result["sweep"]["top"]
+    assert result["sweep"]["combinations"] == 2 ** len(COMPONENTS) - 1
+    assert all(r["trades"] > 0 for r in top)
+    assert [r["avg_return"] for r in top] == sorted((r["avg_return"] for r in top), reverse=True)
+    # 전부 1 인 조합은 기본 가중치 결과와 같아야 함
+    base = next((r for r in top if r["weights"] == weights), None)
+    if base is not None:
+        assert {k: base[k] for k in ("trades", "hit_rate", "avg_return")} == {k: result[k] for k in ("trades", "hit_rate", "avg_return")}
+
+
+@pytest.mark.parametrize("strategy", ["scalp", "swing", "long"])
+def test_one_position_at_a_time_bounds_drawdown(strategy):
+    # 겹치는 신호를 모두 더하면 낙폭이 100% 를 넘을 수 있었음 -> 한 포지션 복리 곡선은 0~100%
+    df = synthetic(490, "B", seed=11)
+    _, mult, horizon = STRATEGIES[strategy]
+    S, V = component_matrix(df)
+    ret, win, valid, exit_at = trade_outcomes(df, mult, horizon)
+    W = weight_grid([0, 1, 2])
+    trades, _, _, mdd = evaluate(S, V, ret, win, valid, exit_at, W, 0)   # 진입 기준 0 -> 매 봉 신호
+    assert ((mdd >= 0) & (mdd <= 1)).all()
+    assert trades.max() == _evaluate_loop(S, V, ret, win, valid, exit_at, W[0], 0)[0] < valid.sum()
+    result = run_backtest(df, strategy, {c: 1.0 for c in COMPONENTS}, entry_score=0)
+    assert 0 <= result["max_drawdown"] <= 100
+
+
+def test_too_many_combinations_is_rejected():
+    with pytest.raises(ValueError):
+        run_backtest(synthetic(120, "B"), "swing", {c: 1.0 for c in COMPONENTS}, grid_values=list(range(8)))
@@ -0,0 +1,58 @@
+# backend/tests/test_bar_store.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from bar_store import Bars, BarStore, trim_float
+
+
+def _frame(n=5, unit="ns", tz=None, freq="D"):
+    index = pd.date_range("2024-01-01", periods=n, freq=freq, tz=tz, unit=unit)
+    prices = np.arange(n, dtype=float) + 100.5
+    return pd.DataFrame({"Open": prices, "High": prices + 1, "Low": prices - 1, "Close": prices, "Volume": np.arange(n) * 1000}, index=index)
+
+
+@pytest.mark.parametrize("unit", ["s", "us", "ns"])
+@pytest.mark.parametrize("tz", [None, "Asia/Seoul", "America/New_York"])
+def test_round_trip_keeps_index(unit, tz):
+    df = _frame(unit=unit, tz=tz)
+    out = Bars.from_frame(df, {}).frame()
+    assert out.index.equals(df.index)
+    assert str(out.index.tz) == str(df.index.tz)
+    np.testing.assert_allclose(out["Close"].to_numpy(), df["Close"].to_numpy(), rtol=1e-6)
+    assert out["Volume"].tolist() == df["Volume"].tolist()
+
+
+def test_views_are_read_only():
+    out = Bars.from_frame(_frame(), {}).frame()
+    with pytest.raises(ValueError):
+        out["Close"].to_numpy()[-1] = 1.0
+
+
+def test_missing_volume_is_not_stored():
+    df = _frame(); df.loc[df.index[1], "Volume"] = np.nan
+    assert Bars.from_frame(df, {}) is None
+    assert BarStore().put("k", df, {}) is None
+
+
+def test_lru_eviction_within_budget():
+    size = Bars.from_frame(_frame(), {}).nbytes
+    store = BarStore(budget=size * 2)
+    store.put("a", _frame(), {}); store.put("b", _frame(), {})
+    store.get("a")                       # a 가 최근 사용 -> b 가 먼저 빠짐
+    store.put("c", _frame(), {})
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.nbytes <= store.budget and store.stats["evicted"] == 1
+
+
+def test_replacing_key_updates_size():
+    store = BarStore()
+    store.put("a", _frame(10), {}); store.put("a", _frame(5), {})
+    assert store.nbytes == Bars.from_frame(_frame(5), {}).nbytes
+
+
+@pytest.mark.parametrize("value", [187.23, 59293.07, 0.012345, 12345678.0, 1.5e-7, -3.25])
+def test_trim_float_drops_float32_noise(value):
+    stored = float(np.float32(value))
+    assert trim_float(stored) == value
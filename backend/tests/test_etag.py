@@ -0,0 +1,150 @@
+# backend/tests/test_etag.py
+# ETag / If-None-Match 304 + compact 응답 (업스트림은 bench_analyze 의 대역 사용, 네트워크 없음)
+import asyncio
+
+import httpx
+from starlette.requests import Request
+
+import bench_analyze
+from bar_store import trim_float
+from compact import data_version, not_modified
+
+
+def _request(headers):
+    return Request({"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_data_version_is_stable_and_weak():
+    a = data_version("analyze", {"b": 1, "a": [1.0, None]})
+    assert a == data_version("analyze", {"a": [1.0, None], "b": 1})
+    assert a != data_version("analyze", {"a": [1.5, None], "b": 1})
+    assert a.startswith('W/"')
+
+
+def test_not_modified_weak_comparison():
+    tag = data_version("x")
+    assert not_modified(_request({}), tag) is None
+    assert not_modified(_request({"If-None-Match": tag}), tag).status_code == 304
+    assert not_modified(_request({"If-None-Match": f'"other", {tag[2:]}'}), tag).status_code == 304
+    assert not_modified(_request({"If-None-Match": "*"}), tag).status_code == 304
+    assert not_modified(_request({"If-None-Match": '"other"'}), tag) is None
+
+
+def _run(main, scenario):
+    async def go():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await scenario(client)
+    return asyncio.run(go())
+
+
+def test_unchanged_analyze_returns_304_without_recompute(app_env):
+    main, _, _ = app_env
+
+    async def scenario(client):
+        first = await client.get("/analyze/AAPL")
+        again = await client.get("/analyze/AAPL", headers={"If-None-Match": first.headers["etag"]})
+        other = await client.get("/analyze/AAPL?w_rsi=2", headers={"If-None-Match": first.headers["etag"]})
+        return first, again, other
+
+    first, again, other = _run(main, scenario)
+    assert first.status_code == 200 and "error" not in first.json()
+    assert again.status_code == 304 and again.content == b""
+    assert "indicators" not in again.headers.get("server-timing", "")
+    assert other.status_code == 200 and other.headers["etag"] != first.headers["etag"]
+
+
+def test_etag_changes_when_advisory_finishes(app_env):
+    main, advisory, s = app_env
+    s.latency["gemini"] = 0.2
+    headers = {"gemini-api-key": "test", "gemini-model": "models/etag-finish"}
+
+    async def scenario(client):
+        pending = await client.get("/analyze/AAPL", headers=headers)
+        still = await client.get("/analyze/AAPL", headers={**headers, "If-None-Match": pending.headers["etag"]})
+        await bench_analyze.wait_advisories(advisory, timeout=10)
+        done = await client.get("/analyze/AAPL", headers={**headers, "If-None-Match": pending.headers["etag"]})
+        return pending, still, done
+
+    try:
+        pending, still, done = _run(main, scenario)
+    finally:
+        s.latency["gemini"] = 0.0
+    assert pending.json()["ai_job"]["status"] == "pending"
+    assert still.status_code == 304
+    assert done.status_code == 200 and done.json()["ai_job"]["status"] == "done"
+    assert done.headers["etag"] != pending.headers["etag"]
+
+
+def test_failed_advisory_is_resubmitted_instead_of_304(app_env, monkeypatch):
+    main, advisory, _ = app_env
+    calls = []
+
+    async def failing(api_key, model_name, prompt):
+        calls.append(model_name)
+        raise RuntimeError("quota")
+
+    monkeypatch.setattr(advisory.GEMINI, "generate", failing)
+    headers = {"gemini-api-key": "test", "gemini-model": "models/etag-error"}
+
+    async def scenario(client):
+        first = await client.get("/analyze/AAPL", headers=headers)
+        await bench_analyze.wait_advisories(advisory, timeout=10)
+        again = await client.get("/analyze/AAPL", headers={**headers, "If-None-Match": first.headers["etag"]})
+        await bench_analyze.wait_advisories(advisory, timeout=10)
+        return first, again
+
+    first, again = _run(main, scenario)
+    assert again.status_code == 200
+    assert len(calls) == 2
+
+
+def test_compact_returns_raw_numbers_and_gzip(app_env):
+    main, _, _ = app_env
+
+    async def scenario(client):
+        plain = await client.get("/analyze/005930.KS")
+        compact = await client.get("/analyze/005930.KS?compact=true", headers={"Accept-Encoding": "gzip"})
+        return plain, compact
+
+    plain, compact = _run(main, scenario)
+    body = compact.json()
+    assert isinstance(plain.json()["price"], str)
+    assert isinstance(body["price"], float) and isinstance(body["strategies"]["swing"]["tp"], float)
+    assert set(body["indicators"]) >= {"rsi", "sma20", "macd"}
+    assert compact.headers["content-encoding"] == "gzip"
+    assert compact.headers["etag"] != plain.headers["etag"]
+
+
+def test_screen_returns_304(app_env):
+    main, _, _ = app_env
+
+    async def scenario(client):
+        first = await client.get("/screen?tickers=AAPL,005930.KS")
+        again = await client.get("/screen?tickers=AAPL,005930.KS", headers={"If-None-Match": first.headers["etag"]})
+        return first, again
+
+    first, again = _run(main, scenario)
+    assert first.status_code == 200 and first.json()["count"] == 2
+    assert again.status_code == 304
+
+
+def _leaves(x):
+    if isinstance(x, dict):
+        for v in x.values(): yield from _leaves(v)
+    elif isinstance(x, list):
+        for v in x: yield from _leaves(v)
+    else:
+        yield x
+
+
+def test_raw_numbers_do_not_leak_float32_precision(app_env):
+    main, _, _ = app_env
+
+    async def scenario(client):
+        return (await client.get("/screen?tickers=AAPL,005930.KS")).json(), (await client.get("/analyze/AAPL?compact=true")).json()
+
+    screen, analyze = _run(main, scenario)
+    numbers = [r["price"] for r in screen["results"]] + [analyze["price"]]
+    numbers += [v for part in ("indicators", "strategies", "sr") for v in _leaves(analyze[part]) if isinstance(v, float)]
+    assert numbers and all(v == trim_float(v) for v in numbers)
@@ -0,0 +1,31 @@
+# backend/tests/test_executor.py
+# 블로킹 실행기 - 동기 제출(submit)도 대기열 상한/집계/요청 컨텍스트를 run 과 같게 적용
+import contextvars
+import threading
+
+import pytest
+
+from executor import BlockingExecutor, Overloaded
+
+REQUEST = contextvars.ContextVar("request", default=None)
+
+
+def test_submit_carries_context_and_releases_slot():
+    ex = BlockingExecutor(workers=2, max_pending=4)
+    REQUEST.set("req-1")
+    assert ex.submit(REQUEST.get).result(timeout=5) == "req-1"
+    assert ex.stats["submitted"] == 1
+    ex.pool.shutdown(wait=True)
+    assert ex.pending == 0
+
+
+def test_submit_rejects_when_saturated():
+    ex = BlockingExecutor(workers=1, max_pending=1)
+    gate = threading.Event()
+    held = ex.submit(gate.wait, 5)
+    assert ex.saturated()
+    with pytest.raises(Overloaded):
+        ex.submit(lambda: None)
+    gate.set(); held.result(timeout=5)
+    ex.pool.shutdown(wait=True)
+    assert ex.stats == {"submitted": 1, "rejected": 1} and ex.pending == 0
@@ -0,0 +1,26 @@
+# backend/tests/test_indicators.py
+# 지표 커널 vs pandas_ta 기준값 (pandas_ta 가 없으면 건너뜀)
+import numpy as np
+import pytest
+
+import indicators
+from bench_indicators import SERIES, synthetic
+from scoring import compute_indicators, compute_indicators_ta
+
+pytest.importorskip("pandas_ta")
+
+
+@pytest.mark.parametrize("bars,freq", [(bars, freq) for _, bars, freq in SERIES])
+def test_kernel_matches_pandas_ta(bars, freq):
+    df = synthetic(bars, freq)
+    fast, ref = compute_indicators(df), compute_indicators_ta(df)
+    for key in indicators.KEYS:
+        np.testing.assert_allclose(fast[key], ref[key], rtol=1e-9, atol=1e-8, equal_nan=True, err_msg=key)
+
+
+def test_fallback_with_missing_bars_has_every_key():
+    df = synthetic(120, "B")
+    df.iloc[50, df.columns.get_loc("Close")] = np.nan
+    ind = compute_indicators(df)
+    assert set(indicators.KEYS) <= set(ind)
+    assert len(ind["atr"]) == len(df)
@@ -0,0 +1,45 @@
+# backend/tests/test_kis_client.py
+# KIS 클라이언트 앱키별 표 - 임의 앱키가 계속 들어와도 MAX_KEYS 개까지만 보관
+import asyncio
+
+import kis_client
+from kis_client import KISClient
+
+
+class _Res:
+    def __init__(self, data): self.data = data
+
+    def json(self): return self.data
+
+
+class _TokenHttp:
+    # 발급 요청마다 새 토큰
+    def __init__(self): self.issued = 0
+
+    async def post(self, path, json):
+        self.issued += 1
+        return _Res({"access_token": f"token-{self.issued}", "expires_in": 2 * 60 * 60})
+
+
+def test_per_key_tables_are_bounded(monkeypatch):
+    monkeypatch.setattr(kis_client, "MAX_KEYS", 8)
+    client = KISClient(rate=10_000); client.http = _TokenHttp()
+
+    async def scenario():
+        for i in range(50):
+            await client.get_token(f"app{i}", "secret")
+            await client._per_key(client._limiters, client._key(f"app{i}"), lambda: kis_client.RateLimiter(client.rate)).acquire()
+        # 최근에 쓴 키는 남아 있음
+        return await client.get_token("app49", "secret")
+
+    token, _ = asyncio.run(scenario())
+    assert token == "token-50" and client.http.issued == 50
+    assert len(client._tokens) == len(client._limiters) == len(client._key_locks) == 8
+
+
+def test_expired_token_is_dropped():
+    client = KISClient(); client.http = _TokenHttp()
+    asyncio.run(client.get_token("app", "secret"))
+    key = client._key("app", "secret")
+    client._tokens[key] = ("old", 0)
+    assert client._cached_token(key) is None and key not in client._tokens
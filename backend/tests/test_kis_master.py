@@ -0,0 +1,98 @@
+# backend/tests/test_kis_master.py
+# KIS 종목 마스터(.mst 고정폭 레코드) 파싱 - 기존 라인별 디코딩과 같은 결과, 두 시장을 모두 받았을 때만 저장
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+
+def _record(code, name_bytes, tail=b"ST1000000000"):
+    # 단축코드 9 + 표준코드 12 + 한글명 40 + 뒤쪽 필드
+    return code.ljust(9).encode() + b"KR7005930003" + name_bytes.ljust(40) + tail
+
+
+def _line_by_line(content):
+    # 최적화 전 구현 (디코딩 오류가 난 라인은 건너뜀)
+    out = {}
+    for line in content.split(b"\n"):
+        if len(line) < 30: continue
+        try:
+            code = line[0:9].decode("ascii").strip(); name = line[21:61].decode("cp949").strip()
+        except UnicodeDecodeError:
+            continue
+        short_code = code[1:7] if len(code) >= 7 else code
+        if name and short_code: out[short_code] = name
+    return out
+
+
+def test_parse_matches_line_by_line_and_skips_undecodable(app_env):
+    main, _, _ = app_env
+    samsung = "삼성전자".encode("cp949")
+    truncated = ("가" * 19 + "A").encode("cp949") + b"\xb0"   # 40바이트 경계에서 2바이트 문자가 잘림
+    content = b"\n".join([
+        _record("005930", samsung),
+        _record("A000660", "SK하이닉스".encode("cp949")),
+        _record("123456", truncated, tail=b"\xa1" + b"ST100000000"),
+        _record("000270", b"\xff\xfe" + samsung),
+        _record("999999", b""),
+        b"short line",
+        b"",
+    ])
+    parsed = main.parse_kis_master(content)
+    assert parsed == _line_by_line(content)
+    assert parsed == {"005930": "삼성전자", "000660": "SK하이닉스"}
+
+
+class _Res:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code; self.content = content
+
+
+def _zipped(content):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf: zf.writestr("code.mst", content)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def master(app_env, tmp_path, monkeypatch):
+    main, _, _ = app_env
+    # apply_kis_master 가 바꾸는 전역 맵은 테스트가 끝나면 되돌림
+    for name in ("NAME_TO_CODE", "CODE_TO_NAME", "SEARCH_MAP", "SEARCH_INDEX"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    monkeypatch.setattr(main, "MASTER_SNAPSHOT", str(tmp_path / "kis_master.json"))
+    monkeypatch.setattr(main, "CACHE_ROOT", str(tmp_path))
+    kospi = _zipped(_record("005930", "삼성전자".encode("cp949")))
+
+    def serve(kosdaq_status):
+        kosdaq = _zipped(_record("035720", "카카오".encode("cp949")))
+        responses = {main.MASTER_URLS["kospi"]: _Res(200, kospi), main.MASTER_URLS["kosdaq"]: _Res(kosdaq_status, kosdaq)}
+        monkeypatch.setattr(main.requests, "get", lambda url, timeout=None: responses[url])
+    return main, serve
+
+
+def test_partial_master_is_not_persisted(master):
+    main, serve = master
+    serve(500)
+
+    main.apply_kis_master({"000660": "SK하이닉스"})
+    assert main.load_kis_master_data() is None
+    assert main.CODE_TO_NAME == {"000660": "SK하이닉스"}   # 기존 맵 유지
+    assert not os.path.exists(main.MASTER_SNAPSHOT)
+
+    main.apply_kis_master({})
+    assert main.load_kis_master_data() is None
+    assert main.CODE_TO_NAME == {"005930": "삼성전자"}     # 비어 있던 기동 직후에는 받은 시장만이라도 반영
+    assert not os.path.exists(main.MASTER_SNAPSHOT)
+
+
+def test_complete_master_is_applied_and_persisted(master):
+    main, serve = master
+    serve(200)
+    saved_at = main.load_kis_master_data()
+    assert saved_at is not None
+    assert main.CODE_TO_NAME == {"005930": "삼성전자", "035720": "카카오"}
+    with open(main.MASTER_SNAPSHOT, encoding="utf-8") as f:
+        assert json.load(f) == {"saved_at": saved_at, "codes": main.CODE_TO_NAME}
@@ -0,0 +1,30 @@
+# backend/tests/test_lifespan.py
+# 서버 기동/종료 - 백그라운드 스레드는 lifespan 에서만 시작, 종료 시 업스트림 연결 풀(KIS, Gemini)을 닫음
+import asyncio
+import threading
+
+from advisory import GeminiClient
+from kis_client import KISClient
+
+
+def test_lifespan_closes_http_clients(app_env, monkeypatch):
+    main, _, _ = app_env
+    kis, gemini = KISClient(), GeminiClient()
+    monkeypatch.setattr(main, "KIS", kis)
+    monkeypatch.setattr(main, "GEMINI", gemini)
+    monkeypatch.setattr(main, "init_kis_master", lambda: None)
+    monkeypatch.setattr(main.SNAPSHOT, "start", lambda: None)
+    monkeypatch.setattr(main.startup, "warm_up", lambda: None)
+
+    async def go():
+        async with main.lifespan(main.app):
+            assert not kis.http.is_closed and not gemini.http.is_closed
+
+    asyncio.run(go())
+    assert kis.http.is_closed and gemini.http.is_closed
+
+
+def test_import_starts_no_background_threads(app_env):
+    # spawn 프로세스 풀 자식이 main 을 다시 임포트해도 마스터 갱신/스냅샷 스레드가 생기지 않아야 함
+    names = {t.name for t in threading.enumerate()}
+    assert not names & {"kis-master", "universe-snapshot"}
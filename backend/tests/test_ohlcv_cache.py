@@ -0,0 +1,115 @@
+# backend/tests/test_ohlcv_cache.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import ohlcv_cache
+from bar_store import BarStore
+from ohlcv_cache import OHLCVCache
+
+
+def bars(end, periods, base=100.0):
+    index = pd.date_range(end=end, periods=periods, freq="D", tz="Asia/Seoul", unit="s")
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": np.full(periods, 1000)}, index=index)
+
+
+class Upstream:
+    # 전체 시세를 들고 있다가 period/start 요청에 맞게 잘라서 돌려줌
+    def __init__(self, df):
+        self.df = df; self.calls = []
+
+    def __call__(self, ticker, interval, period=None, start=None):
+        self.calls.append({"period": period, "start": start})
+        if isinstance(self.df, Exception): raise self.df
+        return self.df[self.df.index >= start].copy() if start is not None else self.df.copy()
+
+
+@pytest.fixture(params=["memory", "disk"])
+def make_cache(request, tmp_path):
+    # 메모리 저장소를 쓰는 경우 / 예산 0 으로 매번 Parquet 을 읽는 경우 둘 다 확인
+    budget = None if request.param == "memory" else 0
+    def make(fetch):
+        return OHLCVCache(fetch, cache_dir=str(tmp_path), memory=BarStore() if budget is None else BarStore(budget=budget))
+    return make
+
+
+TODAY = pd.Timestamp.now(tz="Asia/Seoul").normalize()
+
+
+def test_hit_within_ttl_does_not_fetch(make_cache):
+    up = Upstream(bars(TODAY, 30))
+    cache = make_cache(up)
+    first = cache.get("T", "1d", "1mo")
+    second = cache.get("T", "1d", "1mo")
+    assert len(up.calls) == 1 and cache.stats["hit"] == 1
+    assert second.index.equals(first.index)
+
+
+def test_expired_cache_merges_new_bars(make_cache, monkeypatch):
+    up = Upstream(bars(TODAY - pd.Timedelta(days=2), 20))
+    cache = make_cache(up)
+    cache.get("T", "1d", "1mo")
+
+    # 이틀 뒤: 마지막 봉 종가가 바뀌고 새 봉 2개가 생김
+    later = bars(TODAY, 22)
+    later.iloc[-3, later.columns.get_loc("Close")] = 555.0
+    up.df = later
+    monkeypatch.setattr(ohlcv_cache, "INTERVAL_TTL", {"1d": 0})
+    merged = cache.get("T", "1d", "1mo")
+
+    assert cache.stats["incremental"] == 1
+    assert up.calls[-1]["start"] == later.index[-4]   # 캐시의 마지막 2개 봉부터 다시 받음
+    assert merged.index.equals(later.index)
+    assert merged["Close"].iloc[-3] == 555.0
+    assert not merged.index.duplicated().any()
+
+
+def test_adjusted_history_triggers_full_refresh(make_cache, monkeypatch):
+    up = Upstream(bars(TODAY - pd.Timedelta(days=1), 20))
+    cache = make_cache(up)
+    cache.get("T", "1d", "1mo")
+
+    # 배당/분할로 과거 종가 전체가 바뀜 -> 겹치는 봉 비교로 감지
+    up.df = bars(TODAY, 21, base=50.0)
+    monkeypatch.setattr(ohlcv_cache, "INTERVAL_TTL", {"1d": 0})
+    df = cache.get("T", "1d", "1mo")
+
+    assert cache.stats["incremental"] == 0 and cache.stats["full"] == 2
+    assert up.calls[-1]["period"] == "1mo"
+    assert df["Close"].iloc[0] == 50.0
+
+
+def test_merge_trims_to_period(make_cache, monkeypatch):
+    up = Upstream(bars(TODAY - pd.Timedelta(days=10), 31))
+    cache = make_cache(up)
+    cache.get("T", "1d", "1mo")
+
+    up.df = bars(TODAY, 41)
+    monkeypatch.setattr(ohlcv_cache, "INTERVAL_TTL", {"1d": 0})
+    df = cache.get("T", "1d", "1mo")
+    assert df.index[0] >= TODAY - pd.Timedelta(days=ohlcv_cache.PERIOD_DAYS["1mo"])
+    assert df.index[-1] == TODAY
+
+
+def test_failed_refresh_returns_stale_cache(make_cache, monkeypatch):
+    up = Upstream(bars(TODAY, 20))
+    cache = make_cache(up)
+    first = cache.get("T", "1d", "1mo")
+
+    up.df = ConnectionError("offline")
+    monkeypatch.setattr(ohlcv_cache, "INTERVAL_TTL", {"1d": 0})
+    df = cache.get("T", "1d", "1mo")
+    assert cache.stats["stale"] == 1
+    assert df.index.equals(first.index)
+
+
+def test_peek_counts_misses_and_locks_are_released(make_cache):
+    up = Upstream(bars(TODAY, 30))
+    cache = make_cache(up)
+    assert cache.peek("T", "1d", "1mo") is None
+    cache.put("T", "1d", "1mo", up.df)
+    assert cache.peek("T", "1d", "1mo") is not None
+    cache.get("U", "1d", "1mo")
+    assert (cache.stats["hit"], cache.stats["miss"]) == (1, 2)
+    assert cache._locks == {}
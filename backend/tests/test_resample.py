@@ -0,0 +1,65 @@
+# backend/tests/test_resample.py
+import numpy as np
+import pandas as pd
+
+from resample import aggregate, derive_frames, plan_intervals
+
+
+def period_of(interval):
+    # main.get_period_by_interval 과 같은 규칙
+    if interval in ["1m", "2m", "5m"]: return "5d"
+    if interval in ["15m", "30m", "60m", "90m", "1h"]: return "1mo"
+    return "2y"
+
+
+def daily(start, days, tz="Asia/Seoul"):
+    index = pd.bdate_range(start, periods=days, tz=tz)
+    close = np.arange(1, days + 1, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close, "Volume": np.full(days, 10)}, index=index)
+
+
+def test_plan_downloads_base_and_derives_weekly():
+    fetch, derived = plan_intervals(["60m", "1d", "1wk"], period_of)
+    assert sorted(fetch) == ["1d", "60m"] and derived == {"1wk": "1d"}
+    # 원천을 받지 않으면 파생하지 않음, 기간이 짧은 원천(5m 5d -> 15m 1mo)도 파생하지 않음
+    assert plan_intervals(["1wk"], period_of) == (["1wk"], {})
+    assert plan_intervals(["5m", "15m"], period_of) == (["5m", "15m"], {})
+
+
+def test_weekly_bins_start_on_monday_in_exchange_tz():
+    df = daily("2024-01-03", 10)          # 수요일부터 2주 + 이틀
+    weekly = aggregate(df, "1wk", "005930.KS")
+    assert [d.strftime("%a %Y-%m-%d") for d in weekly.index] == ["Mon 2024-01-01", "Mon 2024-01-08", "Mon 2024-01-15"]
+    first = df.loc[:"2024-01-05"]
+    row = weekly.iloc[0]
+    assert row["Open"] == first["Open"].iloc[0] and row["Close"] == first["Close"].iloc[-1]
+    assert row["High"] == first["High"].max() and row["Low"] == first["Low"].min()
+    assert row["Volume"] == first["Volume"].sum()
+
+
+def test_utc_index_is_grouped_by_local_week():
+    # KST 월요일 00:00 = UTC 일요일 15:00 -> UTC 기준으로 자르면 전 주에 들어감
+    local = daily("2024-01-08", 5)
+    weekly = aggregate(local.tz_convert("UTC"), "1wk", "005930.KS")
+    assert len(weekly) == 1 and weekly.index[0] == pd.Timestamp("2024-01-08", tz="Asia/Seoul")
+
+
+def test_holiday_week_is_dropped():
+    df = daily("2024-01-01", 15, tz="America/New_York")
+    df = df[(df.index < "2024-01-08") | (df.index >= "2024-01-15")]   # 한 주 전체 휴장
+    weekly = aggregate(df, "1wk", "AAPL")
+    assert len(weekly) == 2 and not weekly["Close"].isna().any()
+
+
+def test_intraday_bins_anchor_at_session_open():
+    index = pd.date_range("2024-01-02 09:30", "2024-01-02 15:55", freq="5min", tz="America/New_York")
+    df = pd.DataFrame({"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 1}, index=index)
+    bars = aggregate(df, "15m", "AAPL")
+    assert bars.index[0] == pd.Timestamp("2024-01-02 09:30", tz="America/New_York")
+    assert (bars["Volume"] == 3).all() and len(bars) == 26
+
+
+def test_derive_frames_skips_missing_source():
+    frames = {"1d": daily("2024-01-01", 10)}
+    out = derive_frames(frames, {"1wk": "1d", "15m": "5m"}, "005930.KS")
+    assert list(out) == ["1wk"]
@@ -0,0 +1,37 @@
+# backend/tests/test_shared_cache.py
+# 공유 캐시 단일 비행 - 뒤따른 요청은 먼저 간 호출 결과를 받되 wait 초 넘게 묶이지 않음
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shared_cache import SharedCache
+
+
+def test_followers_share_one_call():
+    cache = SharedCache("t", ttl=60)
+    gate = threading.Event(); calls = []
+
+    def load():
+        calls.append(1); gate.wait(5)
+        return "v"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(cache.get_or_load, "k", load) for _ in range(4)]
+        while cache.coalesced < 3: time.sleep(0.001)
+        gate.set()
+        assert [f.result(timeout=5) for f in futures] == ["v"] * 4
+    assert calls == [1] and cache.stats()["hits"] == 0 and cache.coalesced == 3
+
+
+def test_follower_times_out_when_leader_hangs():
+    cache = SharedCache("t", ttl=60, wait=0.05)
+    gate = threading.Event()
+    leader = threading.Thread(target=cache.get_or_load, args=("k", gate.wait, 5))
+    leader.start()
+    while not cache._inflight: time.sleep(0.001)
+    with pytest.raises(TimeoutError):
+        cache.get_or_load("k", lambda: "never")
+    gate.set(); leader.join()
+    assert cache.stats()["timeouts"] == 1
@@ -0,0 +1,49 @@
+# backend/tests/test_snapshot.py
+# 전 종목 스냅샷 스케줄러 - 워커 간 잠금, 빈 종목 목록 재시도 (채점/다운로드는 대역)
+import pytest
+
+import snapshot
+from snapshot import UniverseSnapshot
+
+
+def _entry(ticker, score):
+    return {"ticker": ticker, "name": ticker, "score": score, "reasons": [], "trend_status": {"msg": ""}}
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path)
+
+
+@pytest.mark.skipif(snapshot.fcntl is None, reason="flock 없음")
+def test_only_one_process_schedules_and_others_follow(directory):
+    leader = UniverseSnapshot(dict, dict, directory=directory)
+    follower = UniverseSnapshot(dict, dict, directory=directory)
+    assert leader.acquire_scheduler()
+    assert not follower.acquire_scheduler()
+
+    leader._publish([_entry("A.KS", 80), _entry("B.KS", 60)], 1_700_000_000)
+    follower.refresh()
+    assert follower.current["version"] == leader.current["version"]
+    assert [e["ticker"] for e in follower.current["ranked"]] == ["A.KS", "B.KS"]
+
+    leader._lock_file.close()   # 스케줄러 프로세스 종료 -> 잠금 해제
+    assert follower.acquire_scheduler()
+
+
+def test_empty_universe_is_retried_with_backoff(directory, monkeypatch):
+    empty = [{}, {}, {}]   # KIS 마스터를 받는 동안
+
+    def universe():
+        return empty.pop() if empty else {"A.KS": "A"}
+
+    sleeps = []
+    monkeypatch.setattr(snapshot.time, "sleep", sleeps.append)
+    snap = UniverseSnapshot(universe, dict, directory=directory)
+    runs = []
+    monkeypatch.setattr(snap, "_safe_run", lambda: runs.append(snap.universe()))
+
+    snap._run_when_ready()
+    first, cap = snapshot.UNIVERSE_RETRY
+    assert sleeps == [first, first * 2, first * 4]
+    assert runs == [{"A.KS": "A"}]
@@ -0,0 +1,59 @@
+# backend/tests/test_streaming.py
+# 증분 지표(LiveIndicators) vs 배열 커널(indicators.compute) - 시드한 과거 봉 + 현재 봉 시세
+import numpy as np
+import pytest
+
+import indicators
+from bench_indicators import SERIES, synthetic
+from streaming import LiveIndicators
+
+
+def _kernel(df):
+    return indicators.compute(*(df[c].to_numpy(dtype=float) for c in ("High", "Low", "Close", "Volume")))
+
+
+def _last(df):
+    row = df.iloc[-1]
+    return float(row["High"]), float(row["Low"]), float(row["Close"]), float(row["Volume"])
+
+
+@pytest.mark.parametrize("bars,freq", [(bars, freq) for _, bars, freq in SERIES])
+def test_quote_matches_kernel_on_last_two_bars(bars, freq):
+    df = synthetic(bars, freq)
+    state = LiveIndicators.seed(df)
+    live, ref = state.quote(*_last(df)), _kernel(df)
+    assert set(live) == set(indicators.KEYS)
+    for key in indicators.KEYS:
+        np.testing.assert_allclose(live[key], ref[key][-2:], rtol=1e-9, atol=1e-8, equal_nan=True, err_msg=key)
+
+
+def test_quote_does_not_advance_state():
+    df = synthetic(120, "B")
+    state = LiveIndicators.seed(df)
+    h, l, c, v = _last(df)
+    state.quote(h * 1.05, l, c * 1.05, v * 2)
+    again, ref = state.quote(h, l, c, v), _kernel(df)
+    for key in indicators.KEYS:
+        np.testing.assert_allclose(again[key][-1], ref[key][-1], rtol=1e-9, atol=1e-8, equal_nan=True, err_msg=key)
+
+
+def test_short_history_is_nan_like_kernel():
+    df = synthetic(10, "B")
+    live, ref = LiveIndicators.seed(df).quote(*_last(df)), _kernel(df)
+    for key in ("sma20", "sma60", "rsi", "macd", "atr"):
+        np.testing.assert_array_equal(np.isnan(live[key]), np.isnan(ref[key][-2:]), err_msg=key)
+
+
+def test_matches_detects_new_bar_and_revised_history():
+    df = synthetic(120, "B")
+    state = LiveIndicators.seed(df)
+    assert state.matches(df)
+
+    tick = df.copy()
+    tick.iloc[-1, tick.columns.get_loc("Close")] *= 1.01
+    assert state.matches(tick)                      # 현재 봉 시세만 바뀜 -> 그대로 사용
+
+    assert not state.matches(synthetic(121, "B"))   # 새 봉
+    revised = df.copy()
+    revised.iloc[-2, revised.columns.get_loc("Close")] *= 0.5
+    assert not state.matches(revised)               # 수정주가로 과거가 바뀜
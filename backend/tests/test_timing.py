@@ -0,0 +1,66 @@
+# backend/tests/test_timing.py
+# 단계별 시간/메모리 기록 (tracemalloc 최고치는 한 번에 한 단계만 측정, 프로파일러는 이벤트 루프 밖 스레드만 등록)
+import asyncio
+import contextvars
+import threading
+import tracemalloc
+
+import pytest
+
+import timing
+
+
+@pytest.fixture
+def collected(monkeypatch):
+    seen = []
+    monkeypatch.setattr(timing, "LISTENERS", [lambda name, seconds, peak, error: seen.append((name, peak, error))])
+    return seen
+
+
+def test_stage_records_into_current_request(collected):
+    timings = timing.begin()
+    with timing.stage("fetch"): pass
+    with pytest.raises(KeyError):
+        with timing.stage("fetch"): raise KeyError
+    assert set(timings) == {"fetch"}
+    assert collected == [("fetch", None, False), ("fetch", None, True)]
+
+
+def test_nested_stage_does_not_reset_outer_peak(collected):
+    timing.begin()
+    tracemalloc.start()
+    try:
+        with timing.stage("outer"):
+            block = bytearray(4 * 1024 * 1024); del block
+            with timing.stage("inner"): pass
+    finally:
+        tracemalloc.stop()
+    peaks = {name: peak for name, peak, _ in collected}
+    assert peaks["inner"] is None
+    assert peaks["outer"] >= 4 * 1024 * 1024
+    assert not timing._PEAK_LOCK.locked()
+
+
+class _Session:
+    def __init__(self): self.entered = []
+
+    def enter(self): self.entered.append(threading.get_ident())
+
+    def exit(self): pass
+
+
+def test_profiler_registers_only_off_loop_threads(collected):
+    session = _Session()
+    timing.begin(profile=session)
+
+    async def on_loop():
+        with timing.stage("kis_api"): pass
+        # 실행기로 넘긴 작업 (컨텍스트 복사) 은 등록
+        await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, worker)
+
+    def worker():
+        with timing.stage("fetch"): pass
+        return threading.get_ident()
+
+    asyncio.run(on_loop())
+    assert len(session.entered) == 1 and session.entered[0] != threading.get_ident()
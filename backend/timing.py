@@ -0,0 +1,83 @@
+# backend/timing.py
+# 요청 처리 단계별 시간 측정 (fetch / indicators / scoring / ai + 업스트림 호출)
+# - with stage("fetch"): ... 로 감싸면 소요 시간을 현재 요청의 기록(contextvar)과 리스너에 전달
+# - 현재 요청 기록은 Server-Timing 헤더로, 리스너는 /metrics 히스토그램/벤치마크 집계로 사용
+# - tracemalloc 이 켜져 있으면 단계 안에서 늘어난 최대 메모리도 같이 전달 (벤치마크용)
+#   reset_peak 와 최고치는 프로세스 전체 값이라 한 번에 한 단계만 측정 (_PEAK_LOCK)
+#   -> 측정 중에 시작한 단계(중첩 단계, 다른 요청/스레드)는 peak=None, 다른 요청과 겹치지 않게 순차 실행할 때만 의미 있음
+import asyncio
+import contextvars
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_CURRENT = contextvars.ContextVar("stage_timings", default=None)
+_PROFILE = contextvars.ContextVar("stage_profile", default=None)
+_LOCK = threading.Lock()
+_PEAK_LOCK = threading.Lock()
+
+# fn(stage, seconds, peak_bytes_or_None, error) - 메트릭/벤치마크 수집기가 등록
+LISTENERS = []
+
+
+def begin(profile=None):
+    # 현재 컨텍스트에 빈 기록을 만들고 반환 (스레드풀로 넘어가도 같은 dict 를 공유)
+    # profile: 이 요청을 처리하는 스레드를 등록받을 프로파일러 세션 (profiler.Session)
+    timings = {}
+    _CURRENT.set(timings)
+    _PROFILE.set(profile)
+    return timings
+
+
+def current():
+    return _CURRENT.get()
+
+
+def record(name, seconds, peak=None, error=False):
+    timings = _CURRENT.get()
+    if timings is not None:
+        # 업스트림 호출은 여러 스레드에서 동시에 끝나므로 합산은 잠금 안에서
+        with _LOCK: timings[name] = timings.get(name, 0.0) + seconds
+    for fn in LISTENERS: fn(name, seconds, peak, error)
+
+
+def header(timings):
+    # Server-Timing: fetch;dur=12.3, kis_token;dur=80.1, ...
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+@contextmanager
+def stage(name):
+    profile = _PROFILE.get()
+    # 이벤트 루프 스레드는 동시에 다른 요청도 처리하므로 샘플 대상으로 등록하지 않음 (실행기/요청 전용 스레드만)
+    if profile is not None and _on_event_loop(): profile = None
+    if profile is not None: profile.enter()
+    # 다른 단계가 측정 중이면 그 최고치를 지우지 않도록 건너뜀
+    tracing = tracemalloc.is_tracing() and _PEAK_LOCK.acquire(blocking=False)
+    if tracing:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        if profile is not None: profile.exit()
+        peak = None
+        if tracing:
+            peak = tracemalloc.get_traced_memory()[1] - base
+            _PEAK_LOCK.release()
+        record(name, elapsed, peak, error)
@@ -98,6 +98,21 @@ function App() {
     });
   };
 
+  // AI 코멘트는 백그라운드 작업 -> 완료될 때까지 롱 폴링 후 결과에 채워 넣음
+  const pollAdvisory = async (jobId) => {
+    for (let i = 0; i < 8; i++) {
+      try {
+        const res = await axios.get(`${API_BASE_URL}/advisory/${jobId}`, { params: { wait: 15 } });
+        if (res.data.error || res.data.status !== "pending") {
+          setResult(prev => (prev && prev.ai_job && prev.ai_job.id === jobId)
+            ? { ...prev, ai_message: res.data.ai_message || res.data.error, ai_job: { id: jobId, status: res.data.status || "error" } }
+            : prev);
+          return;
+        }
+      } catch (e) { console.error(e); return; }
+    }
+  };
+
   const handleAnalyze = async (targetTicker = null) => {
     const searchTicker = targetTicker || ticker;
     if (!searchTicker) return;
@@ -137,6 +152,9 @@ function App() {
         setError(response.data.error);
       } else {
         setResult(response.data);
+        if (response.data.ai_job && response.data.ai_job.status === "pending") {
+          pollAdvisory(response.data.ai_job.id);
+        }
 
         const auth = response.data.auth_info;
         if (auth && auth.token) {
@@ -307,6 +325,12 @@ function App() {
 
       {result && (
         <div className="w-full max-w-2xl space-y-6 animate-fade-in-up">
+            {!result.ai_message && result.ai_job && result.ai_job.status === "pending" && (
+               <div className="bg-gradient-to-r from-indigo-900/80 to-purple-900/80 p-5 rounded-xl border border-indigo-500/30 shadow-lg flex gap-4 items-center">
+                   <div className="text-3xl bg-indigo-500/20 p-2 rounded-full animate-pulse">🤖</div>
+                   <p className="text-sm text-indigo-200">AI 애널리스트가 분석 중입니다...</p>
+               </div>
+            )}
             {result.ai_message && (
                <div className="bg-gradient-to-r from-indigo-900/80 to-purple-900/80 p-5 rounded-xl border border-indigo-500/30 shadow-lg flex gap-4 items-start">
                    <div className="text-3xl bg-indigo-500/20 p-2 rounded-full">🤖</div>